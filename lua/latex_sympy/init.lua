@@ -10,6 +10,14 @@ local DEFAULT_CONFIG = {
   notify_info = false,
   server_start_mode = "on_demand", -- "on_demand" | "on_activate"
   timeout_ms = 5000,
+  numerical_prec = 15, -- significant digits for :LatexSympyNumerical
+  op_workers = 1, -- worker processes for :LatexSympyOp (0 runs ops in the server process)
+  simplify_budget_ms = 4000, -- simplify returns its best form so far after this long (0: unlimited)
+  server_mode = "threaded", -- "threaded" | "prefork"
+  transport = "http", -- "http" (curl per request) | "stdio" (JSON-RPC over the server job's stdin/stdout) | "unix"
+  socket_path = nil, -- unix transport socket; nil uses a per-instance path under stdpath("run")
+  result_cache = false, -- keep :LatexSympyOp results on disk; true uses stdpath("cache"), or a file path
+  result_cache_size = 4096,
   preview_before_apply = false,
   preview_max_chars = 160,
   drop_stale_results = true,
@@ -29,6 +37,9 @@ local DEFAULT_CONFIG = {
   notify_success_max_chars = 120,
 }
 
+-- Extra curl time for /op so the server's time-budget error arrives before curl gives up.
+local OP_TIMEOUT_GRACE_MS = 1000
+
 local OP_NAMES = {
   perm_group = true,
   prufer = true,
@@ -76,6 +87,7 @@ local OP_NAMES = {
   powsimp = true,
   apart = true,
   subs = true,
+  eval_grid = true,
   solveset = true,
   linsolve = true,
   nonlinsolve = true,
@@ -183,23 +195,28 @@ local OP_ARGS_HINTS = {
   optics = "lens <k=v> <k=v> | mirror <k=v> <k=v> | refraction <incident> <n1> <n2>",
   pauli = "simplify",
   dist = "<kind> <name> <params...>",
-  solveset = "[var] [domain]",
-  solve = "[var ...]",
+  solveset = "[var] [domain] [numeric] [prec=N]",
+  solve = "[var ...] [numeric] [prec=N]",
   solve_system = "[var ...]",
   diff = "[var] [order] | x 2 y 1",
-  integrate = "[var] [lower] [upper]",
+  integrate = "[var] [lower] [upper] [strategy=race] [budget_ms=N]",
   limit = "<var> <point> [dir]",
   series = "<var> <point> <order>",
-  nsolve = "<var> <guess> [guess2]",
+  nsolve = "<var> <guess> [guess2] | <var> interval=[a,b] [starts=N]",
   dsolve = "[func]",
   rsolve = "[func]",
   diophantine = "[var ...]",
   linsolve = "[var ...]",
   nonlinsolve = "[var ...]",
   charpoly = "[var]",
+  eigenvals = "[numeric] [prec=N]",
+  eigenvects = "[numeric] [prec=N]",
+  svd = "[numeric] [prec=N]",
+  qr = "[numeric] [prec=N]",
   primerange = "<start> <stop>",
   apart = "[var]",
   subs = "<symbol>=<value> [<symbol>=<value> ...]",
+  eval_grid = "<var>=<a:b:n|linspace(a,b,n)|arange(a,b,h)|[v,...]> ... | points=(x,y);... [backend=numpy|mpmath] [prec=N] [format=latex|json]",
 }
 
 local OP_DESCRIPTIONS = {
@@ -249,6 +266,7 @@ local OP_DESCRIPTIONS = {
   powsimp = "Power simplification",
   apart = "Partial fraction decomposition",
   subs = "Substitute symbols with values",
+  eval_grid = "Table of values over a grid or point list",
   solveset = "Solve equation as a symbolic set",
   linsolve = "Solve linear equation system",
   nonlinsolve = "Solve nonlinear equation system",
@@ -299,6 +317,7 @@ local OP_REQUIRES_ARGS = {
   limit = true,
   series = true,
   nsolve = true,
+  eval_grid = true,
   primerange = true,
 }
 
@@ -342,6 +361,7 @@ local PICKER_GUIDED_ARGS_SCHEMA = {
       { key = "var", prompt = "variable", optional = true },
       { key = "lower", prompt = "lower bound (optional)", optional = true },
       { key = "upper", prompt = "upper bound (optional)", optional = true },
+      { key = "options", prompt = "options (e.g. strategy=race budget_ms=5000; optional)", optional = true, split = true },
     },
   },
   limit = {
@@ -387,7 +407,7 @@ local PICKER_GUIDED_ARGS_SCHEMA = {
   nsolve = {
     fields = {
       { key = "var", prompt = "variable", optional = false },
-      { key = "guess", prompt = "initial guess", optional = false },
+      { key = "guess", prompt = "initial guess (or interval=[a,b] starts=N)", optional = false, split = true },
       { key = "guess2", prompt = "second guess (optional)", optional = true },
     },
   },
@@ -417,6 +437,12 @@ local PICKER_GUIDED_ARGS_SCHEMA = {
       { key = "assignments", prompt = "assignments (e.g. x=2 y=3)", optional = false, split = true },
     },
   },
+  eval_grid = {
+    fields = {
+      { key = "ranges", prompt = "ranges or points (e.g. x=0:1:5 y=[1,2], or points=(0,1);(1,2))", optional = false, split = true },
+      { key = "options", prompt = "options (e.g. backend=mpmath prec=30 format=json; optional)", optional = true, split = true },
+    },
+  },
   div = {
     fields = {
       { key = "var", prompt = "variable (optional)", optional = true },
@@ -559,6 +585,18 @@ local function coerce_positive_int(value, fallback)
   return num
 end
 
+local function coerce_nonnegative_int(value, fallback)
+  local num = tonumber(value)
+  if not num then
+    return fallback
+  end
+  num = math.floor(num)
+  if num < 0 then
+    return fallback
+  end
+  return num
+end
+
 local function normalize_mode(mode)
   if mode == "on_activate" then
     return "on_activate"
@@ -566,6 +604,41 @@ local function normalize_mode(mode)
   return "on_demand"
 end
 
+local function normalize_server_mode(mode)
+  if mode == "prefork" then
+    return mode
+  end
+  return "threaded"
+end
+
+local function normalize_transport(transport)
+  if transport == "stdio" or transport == "unix" then
+    return transport
+  end
+  return "http"
+end
+
+local function normalize_result_cache(value)
+  if value == true then
+    return true
+  end
+  if type(value) == "string" and vim.trim(value) ~= "" then
+    return value
+  end
+  return false
+end
+
+local function resolve_result_cache_path()
+  local value = current_config.result_cache
+  if type(value) == "string" then
+    return vim.fn.fnamemodify(value, ":p")
+  end
+  if value == true then
+    return vim.fn.stdpath("cache") .. "/latex_sympy/results.sqlite3"
+  end
+  return ""
+end
+
 local function normalize_keymap_prefix(prefix)
   if type(prefix) ~= "string" then
     return DEFAULT_CONFIG.keymap_prefix
@@ -646,6 +719,15 @@ local pending_server_callbacks = {}
 local last_server_stderr = ""
 local auto_install_triggered = false
 
+-- stdio/unix transports: JSON-RPC requests waiting for a reply, keyed by id.
+local rpc_next_id = 0
+local rpc_pending = {}
+local rpc_stdout_partial = ""
+-- unix transport: the open socket connection, reused by every request.
+local rpc_pipe = nil
+-- unix transport: a server started by another editor instance already serves socket_path.
+local attached_to_shared_server = false
+
 local current_config = clone(DEFAULT_CONFIG)
 local configured = false
 local activated_for_tex = false
@@ -760,8 +842,188 @@ local function system_async(cmd, args, on_exit)
   })
 end
 
+local uv = vim.uv or vim.loop
+
 local function is_server_running()
-  return server_job_id ~= nil and server_job_id > 0
+  return attached_to_shared_server or (server_job_id ~= nil and server_job_id > 0)
+end
+
+local function uses_stdio_transport()
+  return current_config.transport == "stdio"
+end
+
+local function uses_unix_transport()
+  return current_config.transport == "unix"
+end
+
+local function resolve_socket_path()
+  if type(current_config.socket_path) == "string" and current_config.socket_path ~= "" then
+    return vim.fn.fnamemodify(current_config.socket_path, ":p")
+  end
+  local ok, run_dir = pcall(vim.fn.stdpath, "run")
+  if not ok or type(run_dir) ~= "string" or run_dir == "" then
+    run_dir = vim.fn.fnamemodify(vim.fn.tempname(), ":h")
+  end
+  return string.format("%s/latex_sympy-%d.sock", run_dir, vim.fn.getpid())
+end
+
+-- Job stdout arrives in chunks: the first item continues the previous partial line and the
+-- last item is the start of the next one.
+local function split_rpc_chunks(partial, data)
+  local lines = {}
+  for index, chunk in ipairs(data or {}) do
+    if index == 1 then
+      partial = partial .. chunk
+    else
+      table.insert(lines, partial)
+      partial = chunk
+    end
+  end
+  return lines, partial
+end
+
+local function finish_rpc_request(id, reply)
+  local pending = rpc_pending[id]
+  if not pending then
+    return
+  end
+  rpc_pending[id] = nil
+
+  if type(reply) ~= "table" then
+    pending.on_error(normalize_error("Invalid JSON from server"))
+    return
+  end
+  if type(reply.error) == "table" then
+    pending.on_error(normalize_error(reply.error.message))
+    return
+  end
+
+  local result = reply.result
+  if type(result) ~= "table" then
+    pending.on_error(normalize_error("Invalid JSON from server"))
+    return
+  end
+  if result.error and result.error ~= "" then
+    pending.on_error(normalize_error(result.error))
+    return
+  end
+  pending.on_success((result.data ~= nil) and result.data or result)
+end
+
+local function handle_rpc_stdout(data)
+  local lines
+  lines, rpc_stdout_partial = split_rpc_chunks(rpc_stdout_partial, data)
+  for _, line in ipairs(lines) do
+    if vim.trim(line) ~= "" then
+      local ok, reply = pcall(json_decode, line)
+      if ok and type(reply) == "table" and reply.id ~= nil then
+        vim.schedule(function()
+          finish_rpc_request(reply.id, reply)
+        end)
+      end
+    end
+  end
+end
+
+local function fail_rpc_requests(message)
+  local pending_requests = rpc_pending
+  rpc_pending = {}
+  rpc_stdout_partial = ""
+  for _, pending in pairs(pending_requests) do
+    vim.schedule(function()
+      pending.on_error(normalize_error(message))
+    end)
+  end
+end
+
+local function close_rpc_pipe(connection, message)
+  if rpc_pipe == connection then
+    rpc_pipe = nil
+  end
+  if connection and not connection.pipe:is_closing() then
+    connection.pipe:close()
+  end
+  if attached_to_shared_server and server_job_id == nil then
+    -- The shared server went away; the next request starts or finds a server again.
+    attached_to_shared_server = false
+    server_ready = false
+  end
+  fail_rpc_requests(message)
+end
+
+local function open_rpc_pipe()
+  local connection = { pipe = uv.new_pipe(false), connected = false, queue = {} }
+  rpc_pipe = connection
+  connection.pipe:connect(resolve_socket_path(), function(connect_err)
+    if connect_err then
+      close_rpc_pipe(connection, "Server is not reachable")
+      return
+    end
+    connection.connected = true
+    for _, line in ipairs(connection.queue) do
+      connection.pipe:write(line)
+    end
+    connection.queue = {}
+    connection.pipe:read_start(function(read_err, chunk)
+      if read_err or not chunk then
+        close_rpc_pipe(connection, "Server is not reachable")
+        return
+      end
+      local parts = vim.split(chunk, "\n", { plain = true })
+      vim.schedule(function()
+        if rpc_pipe == connection then
+          handle_rpc_stdout(parts)
+        end
+      end)
+    end)
+  end)
+  return connection
+end
+
+local function rpc_send(line)
+  if uses_unix_transport() then
+    local connection = rpc_pipe or open_rpc_pipe()
+    if connection.connected then
+      connection.pipe:write(line)
+    else
+      table.insert(connection.queue, line)
+    end
+    return true
+  end
+  local ok, sent = pcall(vim.fn.chansend, server_job_id, line)
+  return ok and sent ~= 0
+end
+
+local function rpc_request(path, body_payload, on_success, on_error, request_opts)
+  if uses_stdio_transport() and not is_server_running() then
+    if on_error then
+      vim.schedule(function()
+        on_error("Server is not reachable")
+      end)
+    end
+    return
+  end
+
+  rpc_next_id = rpc_next_id + 1
+  local id = rpc_next_id
+  rpc_pending[id] = {
+    on_success = on_success or function() end,
+    on_error = on_error or function() end,
+  }
+
+  local message = { jsonrpc = "2.0", id = id, method = (path:gsub("^/", "")) }
+  if body_payload ~= nil then
+    message.params = body_payload
+  end
+  if not rpc_send(json_encode(message) .. "\n") then
+    finish_rpc_request(id, { error = { message = "Server is not reachable" } })
+    return
+  end
+
+  local timeout = coerce_positive_int((request_opts or {}).timeout_ms, DEFAULT_CONFIG.timeout_ms)
+  vim.defer_fn(function()
+    finish_rpc_request(id, { error = { message = "Request timed out" } })
+  end, timeout)
 end
 
 local function flush_server_callbacks(ok, message)
@@ -780,6 +1042,15 @@ local function flush_server_callbacks(ok, message)
 end
 
 local function probe_server_health(on_result)
+  if uses_stdio_transport() or uses_unix_transport() then
+    rpc_request("/health", nil, function(data)
+      on_result(data == "ok")
+    end, function()
+      on_result(false)
+    end, { timeout_ms = 1000 })
+    return
+  end
+
   local url = string.format("http://127.0.0.1:%d/health", current_config.port)
   local args = { "-sS", "--max-time", "1", url }
   system_async("curl", args, function(code, stdout, _)
@@ -856,7 +1127,20 @@ local function start_server_process()
     env = {
       LATEX_SYMPY_PORT = tostring(current_config.port),
       LATEX_SYMPY_ENABLE_PYTHON = current_config.enable_python_eval and "1" or "0",
+      LATEX_SYMPY_OP_WORKERS = tostring(current_config.op_workers),
+      LATEX_SYMPY_SIMPLIFY_BUDGET_MS = tostring(current_config.simplify_budget_ms),
+      LATEX_SYMPY_SERVER = current_config.server_mode,
+      LATEX_SYMPY_TRANSPORT = current_config.transport,
+      LATEX_SYMPY_SOCKET = uses_unix_transport() and resolve_socket_path() or nil,
+      LATEX_SYMPY_RESULT_CACHE = resolve_result_cache_path(),
+      LATEX_SYMPY_RESULT_CACHE_SIZE = tostring(current_config.result_cache_size),
+      LATEX_SYMPY_RESULT_MEMORY_CACHE_SIZE = current_config.result_cache and "256" or "0",
     },
+    on_stdout = function(_, data)
+      if uses_stdio_transport() then
+        handle_rpc_stdout(data)
+      end
+    end,
     on_stderr = function(_, data)
       if not data then
         return
@@ -873,6 +1157,11 @@ local function start_server_process()
       server_job_id = nil
       server_ready = false
       server_starting = false
+      if rpc_pipe then
+        close_rpc_pipe(rpc_pipe, "Server is not reachable")
+      else
+        fail_rpc_requests("Server is not reachable")
+      end
 
       if stopped_intentionally then
         return
@@ -913,21 +1202,41 @@ local function ensure_server_running(callback)
   end
 
   server_starting = true
-  local ok, err = start_server_process()
-  if not ok then
-    server_starting = false
-    flush_server_callbacks(false, err)
+
+  local function start_and_wait()
+    local ok, err = start_server_process()
+    if not ok then
+      server_starting = false
+      flush_server_callbacks(false, err)
+      return
+    end
+
+    wait_for_server_ready(function(ready_ok, ready_err)
+      server_starting = false
+      server_ready = ready_ok
+      if not ready_ok then
+        M.stop_server({ silent = true, skip_flush = true })
+      end
+      flush_server_callbacks(ready_ok, ready_err)
+    end)
+  end
+
+  if uses_unix_transport() and not is_server_running() then
+    -- Another editor instance may already serve this socket; share its server.
+    probe_server_health(function(shared_ok)
+      if not shared_ok then
+        start_and_wait()
+        return
+      end
+      attached_to_shared_server = true
+      server_starting = false
+      server_ready = true
+      flush_server_callbacks(true)
+    end)
     return
   end
 
-  wait_for_server_ready(function(ready_ok, ready_err)
-    server_starting = false
-    server_ready = ready_ok
-    if not ready_ok then
-      M.stop_server({ silent = true, skip_flush = true })
-    end
-    flush_server_callbacks(ready_ok, ready_err)
-  end)
+  start_and_wait()
 end
 
 local function timeout_seconds_string(timeout_ms)
@@ -990,16 +1299,24 @@ local function http_request(method, path, body_payload, on_success, on_error, re
   end)
 end
 
+local function server_request(method, path, body_payload, on_success, on_error, request_opts)
+  if uses_stdio_transport() or uses_unix_transport() then
+    rpc_request(path, body_payload, on_success, on_error, request_opts)
+    return
+  end
+  http_request(method, path, body_payload, on_success, on_error, request_opts)
+end
+
 local function post_data(path, data, on_success, on_error, request_opts)
-  http_request("POST", path, { data = data }, on_success, on_error, request_opts)
+  server_request("POST", path, { data = data }, on_success, on_error, request_opts)
 end
 
 local function post_json(path, payload, on_success, on_error, request_opts)
-  http_request("POST", path, payload, on_success, on_error, request_opts)
+  server_request("POST", path, payload, on_success, on_error, request_opts)
 end
 
 local function get(path, on_success, on_error, request_opts)
-  http_request("GET", path, nil, on_success, on_error, request_opts)
+  server_request("GET", path, nil, on_success, on_error, request_opts)
 end
 
 local function get_visual_range_or_lines(opts)
@@ -1241,7 +1558,7 @@ local function run_range_request(opts, request_sender, apply_result, meta)
       end
       LOG.error(normalize_error(request_error))
       cleanup_range_marks(range)
-    end)
+    end, request_token)
   end)
 end
 
@@ -1270,6 +1587,33 @@ local function parse_bool_token(value)
   return nil
 end
 
+-- Moves `numeric`, `numeric=<bool>` and `prec=N` tokens into params; returns the other tokens.
+local function take_numeric_args(op, args, params)
+  local rest = {}
+  for _, value in ipairs(args) do
+    local token = vim.trim(tostring(value or ""))
+    local key, raw = string.match(string.lower(token), "^([%a_]+)=(.+)$")
+    if string.lower(token) == "numeric" then
+      params.numeric = true
+    elseif key == "numeric" then
+      local parsed = parse_bool_token(raw)
+      if parsed == nil then
+        return nil, op .. " expects numeric=true|false"
+      end
+      params.numeric = parsed
+    elseif key == "prec" then
+      local prec = parse_int(raw)
+      if not prec or prec <= 0 then
+        return nil, op .. " prec must be a positive integer"
+      end
+      params.prec = prec
+    else
+      table.insert(rest, token)
+    end
+  end
+  return rest
+end
+
 local function parse_operation_args(op_name, args)
   local op = string.lower(tostring(op_name or ""))
   if not OP_NAMES[op] then
@@ -1499,7 +1843,7 @@ local function parse_operation_args(op_name, args)
     return params
   end
 
-  if op == "jordan" or op == "svd" or op == "cholesky" then
+  if op == "jordan" or op == "cholesky" then
     if count ~= 0 then
       return nil, op .. " does not accept extra arguments"
     end
@@ -1659,6 +2003,16 @@ local function parse_operation_args(op_name, args)
     return params
   end
 
+  if op == "simplify" and count == 1 then
+    local raw = string.match(string.lower(vim.trim(args[1] or "")), "^budget_ms=(.+)$")
+    local budget = raw and parse_int(raw)
+    if not budget or budget < 0 then
+      return nil, "simplify expects: [budget_ms=N]"
+    end
+    params.budget_ms = budget
+    return params
+  end
+
   if op == "simplify" or op == "trigsimp" or op == "ratsimp" or op == "powsimp" then
     if count ~= 0 then
       return nil, op .. " does not accept extra arguments"
@@ -1700,9 +2054,49 @@ local function parse_operation_args(op_name, args)
     return params
   end
 
+  if op == "eval_grid" then
+    local usage = "eval_grid expects: <var>=<values> ... | points=... [backend=numpy|mpmath] [prec=N] [format=latex|json]"
+    local grid = {}
+    for _, value in ipairs(args) do
+      local key, raw = string.match(vim.trim(tostring(value or "")), "^([^=]+)=(.+)$")
+      if not key then
+        return nil, usage
+      end
+      key = vim.trim(key)
+      local option = string.lower(key)
+      if option == "points" then
+        params.points = raw
+      elseif option == "vars" then
+        params.vars = vim.split(raw, ",", { trimempty = true })
+      elseif option == "backend" or option == "format" then
+        params[option] = string.lower(raw)
+      elseif option == "prec" then
+        local prec = parse_int(raw)
+        if not prec or prec <= 0 then
+          return nil, "eval_grid prec must be a positive integer"
+        end
+        params.prec = prec
+      else
+        table.insert(grid, { var = key, values = raw })
+      end
+    end
+    if #grid > 0 then
+      params.grid = grid
+    end
+    if (params.grid == nil) == (params.points == nil) then
+      return nil, usage
+    end
+    return params
+  end
+
   if op == "solveset" then
+    local rest, err = take_numeric_args(op, args, params)
+    if not rest then
+      return nil, err
+    end
+    args, count = rest, #rest
     if count > 2 then
-      return nil, "solveset expects: [var] [domain]"
+      return nil, "solveset expects: [var] [domain] [numeric] [prec=N]"
     end
     if count == 1 then
       local maybe_domain = string.upper(vim.trim(args[1] or ""))
@@ -1769,7 +2163,18 @@ local function parse_operation_args(op_name, args)
     return params
   end
 
-  if op == "eigenvects" or op == "nullspace" or op == "lu" or op == "qr" or op == "mat_solve" or op == "isprime" or op == "factorint" then
+  if op == "eigenvals" or op == "eigenvects" or op == "svd" or op == "qr" then
+    local rest, err = take_numeric_args(op, args, params)
+    if not rest then
+      return nil, err
+    end
+    if #rest > 0 then
+      return nil, op .. " expects: [numeric] [prec=N]"
+    end
+    return params
+  end
+
+  if op == "nullspace" or op == "lu" or op == "mat_solve" or op == "isprime" or op == "factorint" then
     if count ~= 0 then
       return nil, op .. " does not accept extra arguments"
     end
@@ -1777,6 +2182,11 @@ local function parse_operation_args(op_name, args)
   end
 
   if op == "solve" then
+    local rest, err = take_numeric_args(op, args, params)
+    if not rest then
+      return nil, err
+    end
+    args, count = rest, #rest
     if count == 1 then
       params.var = args[1]
       return params
@@ -1802,14 +2212,38 @@ local function parse_operation_args(op_name, args)
   end
 
   if op == "nsolve" then
-    if count ~= 2 and count ~= 3 then
-      return nil, "nsolve expects: <var> <guess> [guess2]"
+    local usage = "nsolve expects: <var> <guess> [guess2] | <var> interval=[a,b] [starts=N]"
+    local guesses = {}
+    for index = 2, count do
+      local token = vim.trim(tostring(args[index] or ""))
+      local key, raw = string.match(token, "^(%a+)=(.+)$")
+      if key == "interval" then
+        params.interval = raw
+      elseif key == "starts" then
+        local starts = parse_int(raw)
+        if not starts or starts < 2 then
+          return nil, "nsolve starts must be an integer >= 2"
+        end
+        params.starts = starts
+      else
+        table.insert(guesses, token)
+      end
+    end
+    if count < 1 then
+      return nil, usage
     end
     params.var = args[1]
-    params.guess = args[2]
-    if count == 3 then
-      params.guess2 = args[3]
+    if params.interval ~= nil then
+      if #guesses > 0 then
+        return nil, usage
+      end
+      return params
+    end
+    if params.starts ~= nil or (#guesses ~= 1 and #guesses ~= 2) then
+      return nil, usage
     end
+    params.guess = guesses[1]
+    params.guess2 = guesses[2]
     return params
   end
 
@@ -1886,6 +2320,26 @@ local function parse_operation_args(op_name, args)
   end
 
   if op == "integrate" then
+    local rest = {}
+    for _, value in ipairs(args) do
+      local token = vim.trim(tostring(value or ""))
+      local key, raw = string.match(string.lower(token), "^([%a_]+)=(.+)$")
+      if key == "strategy" then
+        if raw ~= "default" and raw ~= "race" then
+          return nil, "integrate expects strategy=default|race"
+        end
+        params.strategy = raw
+      elseif key == "budget_ms" then
+        local budget = parse_int(raw)
+        if not budget or budget <= 0 then
+          return nil, "integrate budget_ms must be a positive integer"
+        end
+        params.budget_ms = budget
+      else
+        table.insert(rest, token)
+      end
+    end
+    args, count = rest, #rest
     if count == 0 then
       return params
     end
@@ -1912,7 +2366,7 @@ local function parse_operation_args(op_name, args)
       end
       return params
     end
-    return nil, "integrate expects: [var] [lower] [upper] or repeated triplets"
+    return nil, "integrate expects: [var] [lower] [upper] or repeated triplets, with optional strategy=race budget_ms=N"
   end
 
   if op == "limit" then
@@ -1967,11 +2421,17 @@ local function run_operation(op_name, params, opts)
   local payload = {
     op = op,
     params = normalize_params_for_payload(params or {}),
+    timeout_ms = current_config.timeout_ms,
   }
 
-  run_range_request(opts, function(range, on_success, on_error)
+  run_range_request(opts, function(range, on_success, on_error, request_token)
     payload.data = range.text
-    post_json("/op", payload, on_success, on_error, { timeout_ms = current_config.timeout_ms })
+    payload.request_id = tostring(request_token)
+    if current_config.drop_stale_results then
+      -- The server aborts a still-running op from this buffer once a newer one arrives.
+      payload.cancel_group = "buffer:" .. tostring(range.buf)
+    end
+    post_json("/op", payload, on_success, on_error, { timeout_ms = current_config.timeout_ms + OP_TIMEOUT_GRACE_MS })
   end, function(range, result)
     if mode == "append" then
       insert_after_range(range, " = " .. result)
@@ -1981,6 +2441,128 @@ local function run_operation(op_name, params, opts)
   end, { success_context = "op " .. op })
 end
 
+local function line_ranges_from_selection(opts)
+  local range, err = get_visual_range_or_lines(opts)
+  if not range then
+    return nil, err
+  end
+  cleanup_range_marks(range)
+
+  local ranges = {}
+  local lines = vim.api.nvim_buf_get_lines(range.buf, range.start_row, range.end_row + 1, false)
+  for offset, line in ipairs(lines) do
+    if vim.trim(line) ~= "" then
+      local row = range.start_row + offset - 1
+      table.insert(ranges, {
+        buf = range.buf,
+        start_row = row,
+        start_col = 0,
+        end_row = row,
+        end_col = #line,
+        start_mark = vim.api.nvim_buf_set_extmark(range.buf, ns_id, row, 0, { right_gravity = false }),
+        end_mark = vim.api.nvim_buf_set_extmark(range.buf, ns_id, row, #line, { right_gravity = true }),
+        text = line,
+      })
+    end
+  end
+
+  if #ranges == 0 then
+    return nil, "No non-empty lines in selection."
+  end
+  return ranges
+end
+
+local function run_operation_lines(op_name, params, opts)
+  local op = string.lower(tostring(op_name or ""))
+  if not OP_NAMES[op] then
+    LOG.error("Unknown op: " .. tostring(op_name))
+    return
+  end
+
+  local ranges, err = line_ranges_from_selection(opts)
+  if not ranges then
+    LOG.error(err)
+    return
+  end
+
+  local mode = apply_mode_from_bang(opts)
+  local buf = ranges[1].buf
+  local request_token = mark_request_for_buffer(buf)
+  local normalized_params = normalize_params_for_payload(params or {})
+  local items = {}
+  for _, range in ipairs(ranges) do
+    table.insert(items, { op = op, params = normalized_params, data = range.text })
+  end
+  local payload = {
+    items = items,
+    timeout_ms = current_config.timeout_ms,
+    request_id = tostring(request_token),
+  }
+  if current_config.drop_stale_results then
+    payload.cancel_group = "buffer:" .. tostring(buf)
+  end
+
+  local function cleanup_all()
+    for _, range in ipairs(ranges) do
+      cleanup_range_marks(range)
+    end
+  end
+
+  with_server(function()
+    -- Items run one after another on the server, each within timeout_ms.
+    local request_timeout_ms = current_config.timeout_ms * #items + OP_TIMEOUT_GRACE_MS
+    post_json("/op/batch", payload, function(results)
+      if is_stale_request(buf, request_token) or type(results) ~= "table" then
+        cleanup_all()
+        return
+      end
+
+      local rendered = {}
+      for index = 1, #ranges do
+        local item = results[index] or {}
+        if item.error == nil or item.error == "" then
+          table.insert(rendered, tostring(item.data))
+        end
+      end
+
+      request_preview_approval(table.concat(rendered, "; "), function(should_apply)
+        if is_stale_request(buf, request_token) or not should_apply then
+          cleanup_all()
+          return
+        end
+
+        local failures = 0
+        local first_error = nil
+        for index, range in ipairs(ranges) do
+          local item = results[index] or {}
+          if item.error ~= nil and item.error ~= "" then
+            failures = failures + 1
+            first_error = first_error or item.error
+            cleanup_range_marks(range)
+          elseif mode == "append" then
+            insert_after_range(range, " = " .. tostring(item.data))
+          else
+            replace_range(range, tostring(item.data))
+          end
+        end
+
+        if failures > 0 then
+          LOG.error(string.format("op %s failed on %d of %d lines: %s", op, failures, #ranges, normalize_error(first_error)))
+        end
+        if failures < #ranges then
+          notify_success_result("op " .. op .. " per line", table.concat(rendered, "; "))
+        end
+      end)
+    end, function(request_error)
+      cleanup_all()
+      if is_stale_request(buf, request_token) then
+        return
+      end
+      LOG.error(normalize_error(request_error))
+    end, { timeout_ms = request_timeout_ms })
+  end)
+end
+
 local TRANSFORM_ACTIONS = {
   equal = {
     path = "/latex",
@@ -1996,6 +2578,9 @@ local TRANSFORM_ACTIONS = {
   },
   numerical = {
     path = "/numerical",
+    payload = function(text)
+      return { data = text, prec = current_config.numerical_prec }
+    end,
     apply = function(range, data)
       replace_range(range, tostring(data))
     end,
@@ -2028,7 +2613,12 @@ local function run_transform(action_name, opts)
   end
 
   run_range_request(opts, function(range, on_success, on_error)
-    post_data(action.path, range.text, on_success, on_error, { timeout_ms = current_config.timeout_ms })
+    local request_opts = { timeout_ms = current_config.timeout_ms }
+    if action.payload then
+      post_json(action.path, action.payload(range.text), on_success, on_error, request_opts)
+    else
+      post_data(action.path, range.text, on_success, on_error, request_opts)
+    end
   end, function(range, result)
     action.apply(range, result)
   end, { success_context = "core " .. action_name })
@@ -2145,6 +2735,7 @@ local function command_names()
     "LatexSympyOp",
     "LatexSympyPick",
     "LatexSympyRepeat",
+    "LatexSympyOpLines",
     "LatexSympySolve",
     "LatexSympyDiff",
     "LatexSympyIntegrate",
@@ -3002,6 +3593,18 @@ local function create_commands()
     desc = "Run advanced SymPy operation on selected LaTeX",
   })
 
+  vim.api.nvim_create_user_command("LatexSympyOpLines", function(opts)
+    M.op_lines(opts)
+  end, {
+    range = true,
+    bang = true,
+    nargs = "+",
+    complete = function(arg_lead)
+      return completion_for_ops(arg_lead)
+    end,
+    desc = "Run advanced SymPy operation on each selected line in one request",
+  })
+
   vim.api.nvim_create_user_command("LatexSympyPick", function(opts)
     M.pick(opts)
   end, {
@@ -3142,6 +3745,30 @@ function M.setup(opts)
   if opts.timeout_ms ~= nil then
     next_config.timeout_ms = coerce_positive_int(opts.timeout_ms, DEFAULT_CONFIG.timeout_ms)
   end
+  if opts.numerical_prec ~= nil then
+    next_config.numerical_prec = coerce_positive_int(opts.numerical_prec, DEFAULT_CONFIG.numerical_prec)
+  end
+  if opts.op_workers ~= nil then
+    next_config.op_workers = coerce_nonnegative_int(opts.op_workers, DEFAULT_CONFIG.op_workers)
+  end
+  if opts.simplify_budget_ms ~= nil then
+    next_config.simplify_budget_ms = coerce_nonnegative_int(opts.simplify_budget_ms, DEFAULT_CONFIG.simplify_budget_ms)
+  end
+  if opts.server_mode ~= nil then
+    next_config.server_mode = normalize_server_mode(opts.server_mode)
+  end
+  if opts.transport ~= nil then
+    next_config.transport = normalize_transport(opts.transport)
+  end
+  if opts.socket_path ~= nil then
+    next_config.socket_path = (opts.socket_path ~= false and opts.socket_path ~= "") and opts.socket_path or nil
+  end
+  if opts.result_cache ~= nil then
+    next_config.result_cache = normalize_result_cache(opts.result_cache)
+  end
+  if opts.result_cache_size ~= nil then
+    next_config.result_cache_size = coerce_nonnegative_int(opts.result_cache_size, DEFAULT_CONFIG.result_cache_size)
+  end
   if opts.preview_before_apply ~= nil then
     next_config.preview_before_apply = opts.preview_before_apply
   end
@@ -3209,7 +3836,14 @@ function M.setup(opts)
   local needs_restart = is_server_running() and (
     next_config.python ~= current_config.python or
     next_config.port ~= current_config.port or
-    next_config.enable_python_eval ~= current_config.enable_python_eval
+    next_config.enable_python_eval ~= current_config.enable_python_eval or
+    next_config.op_workers ~= current_config.op_workers or
+    next_config.simplify_budget_ms ~= current_config.simplify_budget_ms or
+    next_config.server_mode ~= current_config.server_mode or
+    next_config.transport ~= current_config.transport or
+    next_config.socket_path ~= current_config.socket_path or
+    next_config.result_cache ~= current_config.result_cache or
+    next_config.result_cache_size ~= current_config.result_cache_size
   )
 
   current_config = next_config
@@ -3251,11 +3885,16 @@ function M.stop_server(opts)
   local silent = type(opts) == "table" and opts.silent
   local skip_flush = type(opts) == "table" and opts.skip_flush
 
-  if is_server_running() then
+  if server_job_id ~= nil and server_job_id > 0 then
     intentional_stop = true
     vim.fn.jobstop(server_job_id)
     server_job_id = nil
   end
+  -- A shared server keeps running for its other clients; only the connection is dropped.
+  attached_to_shared_server = false
+  if rpc_pipe then
+    close_rpc_pipe(rpc_pipe, "Server stopped")
+  end
 
   server_ready = false
   server_starting = false
@@ -3320,6 +3959,26 @@ function M.op(opts)
   run_operation(op_name, params, normalized_opts)
 end
 
+function M.op_lines(opts)
+  local normalized_opts = normalize_trailing_bang_opts(opts)
+  local fargs = normalized_opts.fargs or {}
+  if #fargs < 1 then
+    LOG.error("Usage: :LatexSympyOpLines[!] {op} [args]")
+    return
+  end
+  local op_name = string.lower(fargs[1])
+  local args = {}
+  for index = 2, #fargs do
+    table.insert(args, fargs[index])
+  end
+  local params, err = parse_operation_args(op_name, args)
+  if not params then
+    LOG.error(err)
+    return
+  end
+  run_operation_lines(op_name, params, normalized_opts)
+end
+
 function M.pick(opts)
   open_picker(opts or {})
 end
@@ -3415,13 +4074,19 @@ end
 function M.status()
   local lines = {
     string.format("Activated for tex: %s", tostring(activated_for_tex)),
-    string.format("Server: %s", is_server_running() and "Running" or "Stopped"),
+    string.format("Server: %s", attached_to_shared_server and "Running (shared)" or (is_server_running() and "Running" or "Stopped")),
     string.format("Port: %s", tostring(current_config.port)),
     string.format("Python: %s", tostring(current_config.python)),
     string.format("Auto install: %s", tostring(current_config.auto_install)),
     string.format("Server start mode: %s", tostring(current_config.server_start_mode)),
     string.format("Python eval enabled: %s", tostring(current_config.enable_python_eval)),
     string.format("Timeout (ms): %s", tostring(current_config.timeout_ms)),
+    string.format("Op workers: %s", tostring(current_config.op_workers)),
+    string.format("Simplify budget (ms): %s", tostring(current_config.simplify_budget_ms)),
+    string.format("Server mode: %s", tostring(current_config.server_mode)),
+    string.format("Transport: %s", tostring(current_config.transport)),
+    string.format("Socket path: %s", uses_unix_transport() and resolve_socket_path() or "n/a"),
+    string.format("Result cache: %s", current_config.result_cache and resolve_result_cache_path() or "off"),
     string.format("Preview before apply: %s", tostring(current_config.preview_before_apply)),
     string.format("Drop stale results: %s", tostring(current_config.drop_stale_results)),
     string.format("Notify info: %s", tostring(current_config.notify_info)),
@@ -3459,6 +4124,11 @@ function M._reset_state_for_tests()
   pending_server_callbacks = {}
   last_server_stderr = ""
   auto_install_triggered = false
+  rpc_next_id = 0
+  rpc_pending = {}
+  rpc_stdout_partial = ""
+  rpc_pipe = nil
+  attached_to_shared_server = false
 
   request_token_counter = 0
   latest_request_token_by_buf = {}
@@ -3472,6 +4142,14 @@ function M._reset_state_for_tests()
   trailing_bang_hint_notified = false
 end
 
+function M._split_rpc_chunks_for_tests(partial, data)
+  return split_rpc_chunks(partial, data)
+end
+
+function M._server_request_for_tests(method, path, body_payload, on_success, on_error)
+  server_request(method, path, body_payload, on_success, on_error)
+end
+
 function M._is_activated_for_tests()
   return activated_for_tex
 end
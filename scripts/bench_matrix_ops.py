@@ -0,0 +1,103 @@
+"""Compare generic Matrix methods with the DomainMatrix fast paths in server.py.
+
+Usage: python3 scripts/bench_matrix_ops.py [--sizes 10,20,40,60] [--seed 1] [--repeat 3]
+       [--density 0.1]
+
+Each row times one operation on a random integer (ZZ) or rational (QQ)
+matrix; ``mat_solve`` uses a mostly-zero matrix with the
+given density of off-diagonal entries.  The generic Matrix timing is skipped
+past ``GENERIC_LIMITS`` because ``Matrix.rank`` takes tens of seconds from
+20x20 upwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import server  # noqa: E402
+
+sp = server.sp
+
+GENERIC_LIMITS = {"det": 60, "rank": 16, "mat_solve": 60}
+
+
+def _random_matrix(size: int, rational: bool, rng: random.Random, density: float = 1.0):
+    def entry(i, j):
+        if i != j and rng.random() >= density:
+            return sp.Integer(0)
+        if rational:
+            return sp.Rational(rng.randint(-9, 9), rng.randint(1, 3))
+        return sp.Integer(rng.randint(-9, 9))
+
+    return sp.Matrix(size, size, entry)
+
+
+def _rank_deficient(matrix):
+    # Repeat the first row so rank has to detect the dependency.
+    rows = matrix.tolist()
+    rows[-1] = list(rows[0])
+    return sp.Matrix(rows)
+
+
+def _cases(matrix, sparse):
+    deficient = _rank_deficient(matrix)
+    rhs = sparse * sp.Matrix([index % 5 - 2 for index in range(sparse.cols)])
+    augmented = server.DomainMatrix.from_Matrix(sparse.row_join(rhs))
+    return [
+        ("det", lambda: matrix.det(), lambda: server._op_det(matrix, {})),
+        ("rank", lambda: deficient.rank(), lambda: server._op_rank(deficient, {})),
+        (
+            "mat_solve",
+            lambda: sparse.gauss_jordan_solve(rhs),
+            lambda: server._domain_matrix_gauss_jordan_solve(augmented),
+        ),
+    ]
+
+
+def _timed(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,20,40,60")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of N runs")
+    parser.add_argument("--density", type=float, default=0.1, help="off-diagonal fill of the sparse matrices")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    print(f"{'op':<10} {'domain':<6} {'n':>3} {'generic_s':>10} {'fast_s':>10} {'speedup':>8}")
+    for size in sizes:
+        for rational in (False, True):
+            matrix = _random_matrix(size, rational, rng)
+            sparse = _random_matrix(size, rational, rng, args.density)
+            for name, generic, fast in _cases(matrix, sparse):
+                fast_result, fast_seconds = _timed(fast, args.repeat)
+                generic_text, speedup = "skipped", ""
+                if size <= GENERIC_LIMITS[name]:
+                    generic_result, generic_seconds = _timed(generic, args.repeat)
+                    if generic_result != fast_result:
+                        print(f"mismatch: {name} n={size}", file=sys.stderr)
+                        return 1
+                    generic_text = f"{generic_seconds:.4f}"
+                    speedup = f"{generic_seconds / max(fast_seconds, 1e-9):.1f}x"
+                domain = "QQ" if rational else "ZZ"
+                print(f"{name:<10} {domain:<6} {size:>3} {generic_text:>10} {fast_seconds:>10.4f} {speedup:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
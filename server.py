@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
+import importlib
+import itertools
+import json
+import linecache
+import multiprocessing
+import multiprocessing.connection
 import os
+import re
+import signal
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Optional
 
-import latex2sympy2
+_IMPORT_STARTED = time.perf_counter()
 import sympy as sp
-from flask import Flask, jsonify, request
+import mpmath
+_SYMPY_IMPORTED = time.perf_counter()
+import latex2sympy2
 from latex2sympy2 import (
     latex,
     latex2latex,
@@ -15,26 +36,75 @@ from latex2sympy2 import (
     var,
     variances,
 )
+_LATEX2SYMPY_IMPORTED = time.perf_counter()
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+_FLASK_IMPORTED = time.perf_counter()
 from sympy.combinatorics import Permutation, PermutationGroup
 from sympy.combinatorics.graycode import GrayCode, bin_to_gray, gray_to_bin
 from sympy.combinatorics.prufer import Prufer
+from sympy.core.assumptions import check_assumptions
+from sympy.core.sorting import default_sort_key
 from sympy.functions.combinatorial.numbers import nC, nP
 from sympy.geometry import Circle, Ellipse, Line, Point, Polygon, Ray, Segment
 from sympy.geometry.entity import GeometryEntity
 from sympy.geometry.util import intersection
-from sympy.physics import optics as sp_optics
-from sympy.physics import paulialgebra as sp_pauli
-from sympy.physics import quantum as sp_quantum
-from sympy.physics.units import util as units_util
+from sympy.polys.matrices import DomainMatrix
 from sympy.utilities.iterables import subsets as iter_subsets
 from sympy import MatrixBase, apart, expand, expand_trig, factor, powsimp, ratsimp, simplify, trigsimp
-import sympy.physics.units as sp_units
-import sympy.stats as sp_stats
 
 app = Flask(__name__)
 
 IS_REAL = False
 ENABLE_PYTHON_EVAL = os.getenv("LATEX_SYMPY_ENABLE_PYTHON", "0") == "1"
+PARSE_CACHE_SIZE = max(0, int(os.getenv("LATEX_SYMPY_PARSE_CACHE_SIZE", "256")))
+# SQLite file that keeps /op results across server restarts (empty disables).
+RESULT_CACHE_PATH = os.getenv("LATEX_SYMPY_RESULT_CACHE", "").strip()
+RESULT_CACHE_SIZE = max(0, int(os.getenv("LATEX_SYMPY_RESULT_CACHE_SIZE", "4096")))
+# In-memory /op result tier, checked before the file (0 disables; works without the file cache).
+RESULT_MEMORY_CACHE_SIZE = max(0, int(os.getenv("LATEX_SYMPY_RESULT_MEMORY_CACHE_SIZE", "0")))
+# Bump when the key or row layout changes; older cache files are emptied on open.
+RESULT_CACHE_SCHEMA = 1
+# Worker processes for /op (0 runs operations in the server process, without time budgets).
+OP_WORKERS = max(0, int(os.getenv("LATEX_SYMPY_OP_WORKERS", "0")))
+# Budget for /op requests that do not send `timeout_ms` (0 means unlimited).
+OP_TIMEOUT_MS = max(0, int(os.getenv("LATEX_SYMPY_OP_TIMEOUT_MS", "0")))
+# "threaded": a thread per request (as Flask's app.run did); "prefork": threaded, with at least
+# one pre-started op worker process per CPU.
+SERVER_MODES = ("threaded", "prefork")
+SERVER_MODE = os.getenv("LATEX_SYMPY_SERVER", "threaded").strip().lower()
+# "http": listen on LATEX_SYMPY_PORT; "stdio": line-delimited JSON-RPC 2.0 on stdin/stdout;
+# "unix": the same JSON-RPC over connections to a Unix socket at LATEX_SYMPY_SOCKET.
+TRANSPORTS = ("http", "unix", "stdio")
+TRANSPORT = os.getenv("LATEX_SYMPY_TRANSPORT", "http").strip().lower()
+# Requests a stdio or unix socket connection works on at once.
+JSONRPC_THREADS = 8
+# eigenvals/eigenvects/svd/qr: significant digits of numeric results when `prec` is not
+# given (NumPy float64 when available), the irreducible charpoly degree and the qr size
+# from which the exact path is skipped automatically.
+NUMERIC_LINALG_DEFAULT_DIGITS = 15
+NUMERIC_LINALG_AUTO_DEGREE = 3
+# /numerical: significant digits when the request does not send `prec`.
+NUMERICAL_DEFAULT_DIGITS = 15
+# eval_grid: backends, output formats, and the most points one request may evaluate.
+EVAL_GRID_BACKENDS = ("numpy", "mpmath")
+EVAL_GRID_FORMATS = ("latex", "json")
+EVAL_GRID_MAX_POINTS = 10000
+# nsolve interval mode: default and largest number of starting points.
+NSOLVE_DEFAULT_STARTS = 32
+NSOLVE_MAX_STARTS = 1000
+# Lambdified callables shared by eval_grid and nsolve, kept per (backend, variables, expression)
+# (0 disables), and the cap on their generated source in bytes.
+LAMBDIFY_CACHE_SIZE = max(0, int(os.getenv("LATEX_SYMPY_LAMBDIFY_CACHE_SIZE", "64")))
+LAMBDIFY_CACHE_BYTES = max(0, int(os.getenv("LATEX_SYMPY_LAMBDIFY_CACHE_BYTES", str(4 * 1024 * 1024))))
+# simplify and the /numerical simplify fallback: time budget in ms when the request does not
+# send `budget_ms` (0 means unlimited), and the cheap rewrites tried, in order, before full simplify.
+SIMPLIFY_BUDGET_MS = max(0, int(os.getenv("LATEX_SYMPY_SIMPLIFY_BUDGET_MS", "0")))
+SIMPLIFY_LADDER = ("cancel", "together", "factor_terms", "trigsimp", "powsimp", "radsimp")
+# integrate: strategies, and the sympy methods strategy=race runs side by side (risch only for
+# indefinite integrals; numeric quadrature joins as a fallback when every bound is numeric).
+INTEGRATE_STRATEGIES = ("default", "race")
+INTEGRATE_RACE_METHODS = ("risch", "meijerg", "manual", "heurisch")
 SOLVESET_DOMAINS = {
     "C": sp.S.Complexes,
     "R": sp.S.Reals,
@@ -54,6 +124,13 @@ REGISTERED_SYMBOLS: dict[str, sp.Symbol] = {}
 REGISTERED_SYMBOL_ASSUMPTIONS: dict[str, dict[str, bool]] = {}
 REGISTERED_RANDOM_VARIABLES: dict[str, Any] = {}
 
+# Bumped whenever parse-relevant session state (variances, registries, IS_REAL) changes.
+STATE_VERSION = 0
+# latex2sympy stores `x = ...` assignments and `A \in ...` definitions in its variances map.
+STATE_ASSIGNMENT_PATTERN = re.compile(r"=|\\in(?![a-zA-Z])")
+FRACTION_MACROS = (r"\frac", r"\dfrac", r"\tfrac")
+BINDING_EXPRESSION_TYPES = (sp.Derivative, sp.Integral, sp.Sum, sp.Product, sp.Limit, sp.Subs, sp.Lambda)
+
 SYMPIFY_BASE_LOCALS: dict[str, Any] = {
     "Point": Point,
     "Line": Line,
@@ -62,14 +139,381 @@ SYMPIFY_BASE_LOCALS: dict[str, Any] = {
     "Ellipse": Ellipse,
     "Circle": Circle,
     "Polygon": Polygon,
-    "Pauli": sp_pauli.Pauli,
 }
-SYMPIFY_UNIT_LOCALS: dict[str, Any] = {
-    name: value for name, value in vars(sp_units).items() if not name.startswith("_")
+# Names resolved from their (slow to import) module only when the input mentions them.
+SYMPIFY_LAZY_LOCALS: dict[str, tuple[str, str]] = {
+    "Pauli": ("sympy.physics.paulialgebra", "Pauli"),
 }
 
+# Milliseconds spent importing the heavy dependencies, eagerly at startup and lazily per domain module.
+STARTUP_IMPORT_MS: dict[str, float] = {
+    "sympy": round((_SYMPY_IMPORTED - _IMPORT_STARTED) * 1000, 3),
+    "latex2sympy2": round((_LATEX2SYMPY_IMPORTED - _SYMPY_IMPORTED) * 1000, 3),
+    "flask": round((_FLASK_IMPORTED - _LATEX2SYMPY_IMPORTED) * 1000, 3),
+}
+LAZY_IMPORT_MS: dict[str, float] = {}
+_LAZY_IMPORT_LOCK = threading.Lock()
+# Guards session state (variances, registries, IS_REAL, STATE_VERSION) for concurrent requests.
+STATE_LOCK = threading.RLock()
+_REQUEST_LOCAL = threading.local()
+_UNIT_LOCALS: Optional[dict[str, Any]] = None
+# Merged sympify namespaces keyed by (STATE_VERSION, include_units, lazy names used).
+_SYMPIFY_LOCALS_CACHE: dict[tuple[int, bool, tuple[str, ...]], dict[str, Any]] = {}
+
+
+class _LRUCache:
+    """Thread-safe, size-bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Any, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class _LambdifyRegistry:
+    """LRU of lambdified callables, bounded by entry count and generated source size.
+
+    lambdify also keeps each generated source in ``linecache`` for tracebacks and never
+    releases it; evicting an entry drops that copy, so a long-running server does not
+    accumulate one per expression it has ever compiled.
+    """
+
+    def __init__(self, max_size: int, max_bytes: int):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        # key -> (callable, source filename, weight in bytes)
+        self._entries: OrderedDict[Any, tuple[Callable, str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expression: Any, symbols: tuple[Any, ...], backend: str) -> Callable:
+        key = (backend, symbols, expression)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        func = sp.lambdify(symbols, expression, modules=backend)
+        filename = func.__code__.co_filename
+        source = linecache.cache.get(filename)
+        weight = source[0] if source else len(str(expression))
+        if self.max_size <= 0 or weight > self.max_bytes:
+            linecache.cache.pop(filename, None)
+            return func
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (func, filename, weight)
+                self._bytes += weight
+            while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+                _, (_, evicted_filename, evicted_weight) = self._entries.popitem(last=False)
+                self._bytes -= evicted_weight
+                self.evictions += 1
+                linecache.cache.pop(evicted_filename, None)
+        return func
+
+    def clear(self):
+        with self._lock:
+            for _, filename, _ in self._entries.values():
+                linecache.cache.pop(filename, None)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class _ResultCache:
+    """SQLite-backed store of rendered /op results with least-recently-used eviction."""
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Several servers (one per editor) may share the file; SQLite serializes their writes.
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version == RESULT_CACHE_SCHEMA:
+            return
+        self._db.execute("DROP TABLE IF EXISTS results")
+        self._db.execute("CREATE TABLE results (key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX results_last_used ON results (last_used)")
+        self._db.execute(f"PRAGMA user_version = {RESULT_CACHE_SCHEMA}")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, result: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, result, last_used) VALUES (?, ?, ?)",
+                (key, result, time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "path": self.path,
+                "schema": RESULT_CACHE_SCHEMA,
+                "size": size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_CACHE_MISS = object()
+# (STATE_VERSION, variance replacements, registry replacements by symbol name)
+_STATE_SUBSTITUTIONS: tuple[int, dict[Any, Any], dict[str, Any]] = (-1, {}, {})
+PARSE_CACHE = _LRUCache(PARSE_CACHE_SIZE)
+
+# Remembers inputs that latex2sympy rejected, so the fallback parser is tried first.
+PARSER_SYMPIFY = "sympify"
+PARSER_INVALID = "invalid"
+PARSER_CHOICE_CACHE = _LRUCache(PARSE_CACHE_SIZE)
+# (key kind, selection text, STATE_VERSION) -> canonical result-cache form of the selection.
+CANONICAL_KEY_CACHE = _LRUCache(PARSE_CACHE_SIZE)
+RESULT_MEMORY_CACHE = _LRUCache(RESULT_MEMORY_CACHE_SIZE)
+LAMBDIFY_REGISTRY = _LambdifyRegistry(LAMBDIFY_CACHE_SIZE, LAMBDIFY_CACHE_BYTES)
+FALLBACK_STATS = {"latex_failures": 0, "latex_skipped": 0, "sympify_parses": 0, "invalid_skipped": 0}
+_FALLBACK_STATS_LOCK = threading.Lock()
+
+
+def _count_fallback(name: str):
+    with _FALLBACK_STATS_LOCK:
+        FALLBACK_STATS[name] += 1
+
+
+def _lazy_module(name: str):
+    if name in LAZY_IMPORT_MS:
+        return importlib.import_module(name)
+    with _LAZY_IMPORT_LOCK:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        LAZY_IMPORT_MS.setdefault(name, round((time.perf_counter() - started) * 1000, 3))
+    return module
+
+
+def _unit_locals() -> dict[str, Any]:
+    global _UNIT_LOCALS
+    if _UNIT_LOCALS is None:
+        units = _lazy_module("sympy.physics.units")
+        _UNIT_LOCALS = {name: value for name, value in vars(units).items() if not name.startswith("_")}
+    return _UNIT_LOCALS
+
+
+def _clear_state_caches():
+    global _STATE_SUBSTITUTIONS
+    PARSE_CACHE.clear()
+    PARSER_CHOICE_CACHE.clear()
+    CANONICAL_KEY_CACHE.clear()
+    _SYMPIFY_LOCALS_CACHE.clear()
+    _STATE_SUBSTITUTIONS = (-1, {}, {})
+
+
+def _bump_state_version():
+    global STATE_VERSION
+    with STATE_LOCK:
+        STATE_VERSION += 1
+        _clear_state_caches()
+
+
+def _export_session_state() -> dict[str, Any]:
+    with STATE_LOCK:
+        return _snapshot_session_state()
+
+
+def _snapshot_session_state() -> dict[str, Any]:
+    return {
+        "version": STATE_VERSION,
+        "is_real": IS_REAL,
+        "variances": dict(variances),
+        # `/reset` rebinds latex2sympy's maps, so they may no longer be the server's `variances`.
+        "parser_variances": None if latex2sympy2.variances is variances else dict(latex2sympy2.variances),
+        "parser_var": dict(latex2sympy2.var),
+        "symbols": dict(REGISTERED_SYMBOLS),
+        "symbol_assumptions": {name: dict(value) for name, value in REGISTERED_SYMBOL_ASSUMPTIONS.items()},
+        "random_variables": dict(REGISTERED_RANDOM_VARIABLES),
+    }
+
+
+def _parser_state_snapshot() -> tuple[dict[Any, Any], dict[Any, Any]]:
+    return dict(latex2sympy2.variances), dict(latex2sympy2.var)
+
 
-def _success(data: Any):
+def _parser_state_delta(before: tuple[dict[Any, Any], dict[Any, Any]]) -> dict[str, dict[Any, Any]]:
+    """Entries an op added or replaced in latex2sympy's maps since ``before`` (assignments)."""
+    return {
+        name: {key: value for key, value in current.items() if previous.get(key, _CACHE_MISS) is not value}
+        for name, current, previous in (
+            ("variances", latex2sympy2.variances, before[0]),
+            ("var", latex2sympy2.var, before[1]),
+        )
+    }
+
+
+def _merge_parser_state(delta: dict[str, dict[Any, Any]]):
+    # Only the op's own assignments; registries and IS_REAL may have changed meanwhile.
+    with STATE_LOCK:
+        latex2sympy2.variances.update(delta["variances"])
+        latex2sympy2.var.update(delta["var"])
+        _bump_state_version()
+
+
+def _import_session_state(state: dict[str, Any]):
+    with STATE_LOCK:
+        _restore_session_state(state)
+
+
+def _restore_session_state(state: dict[str, Any]):
+    global IS_REAL, STATE_VERSION
+    IS_REAL = state["is_real"]
+    set_real(True if IS_REAL else None)
+    variances.clear()
+    variances.update(state["variances"])
+    if state["parser_variances"] is None:
+        latex2sympy2.variances = variances
+    else:
+        if latex2sympy2.variances is variances:
+            latex2sympy2.variances = {}
+        latex2sympy2.variances.clear()
+        latex2sympy2.variances.update(state["parser_variances"])
+    latex2sympy2.var.clear()
+    latex2sympy2.var.update(state["parser_var"])
+    for registry, key in (
+        (REGISTERED_SYMBOLS, "symbols"),
+        (REGISTERED_SYMBOL_ASSUMPTIONS, "symbol_assumptions"),
+        (REGISTERED_RANDOM_VARIABLES, "random_variables"),
+    ):
+        registry.clear()
+        registry.update(state[key])
+    STATE_VERSION = state["version"]
+    _clear_state_caches()
+
+
+def _may_assign_state(text: str) -> bool:
+    return STATE_ASSIGNMENT_PATTERN.search(text) is not None
+
+
+def _sync_frac_type(text: str):
+    # latex2sympy remembers the fraction macro of the last parsed input and reuses it
+    # when rendering; replay that on cache hits so output keeps the same macro. The
+    # macro is also kept per thread, so concurrent requests do not render with each
+    # other's choice.
+    for macro in FRACTION_MACROS:
+        if macro in text:
+            latex2sympy2.frac_type = macro
+    _REQUEST_LOCAL.frac_type = latex2sympy2.frac_type
+
+
+def _apply_request_fraction_macro(result: str) -> str:
+    macro = getattr(_REQUEST_LOCAL, "frac_type", None)
+    if macro is None:
+        return result
+    for candidate in FRACTION_MACROS:
+        result = result.replace(candidate, macro)
+    return result
+
+
+def _report_op_meta(**values: Any):
+    """Add ``values`` to the ``meta`` of the response for the op running on this thread."""
+    meta = getattr(_REQUEST_LOCAL, "op_meta", None)
+    if meta is None:
+        meta = _REQUEST_LOCAL.op_meta = {}
+    meta.update(values)
+
+
+def _render_latex(value: Any) -> str:
+    return _apply_request_fraction_macro(latex(value))
+
+
+def _copy_if_mutable(value: Any) -> Any:
+    if isinstance(value, (sp.MutableDenseMatrix, sp.MutableSparseMatrix)):
+        return value.copy()
+    return value
+
+
+def _success(data: Any, *, meta: Optional[dict[str, Any]] = None):
+    if meta is not None:
+        return jsonify({"data": data, "error": "", "meta": meta})
     return jsonify({"data": data, "error": ""})
 
 
@@ -97,6 +541,29 @@ def _coerce_data_value(payload: dict[str, Any]) -> tuple[Optional[str], Optional
     return value, None
 
 
+def _parse_operation_fields(payload: dict[str, Any]) -> tuple[Optional[tuple[str, str, dict[str, Any]]], Optional[str]]:
+    data, data_err = _coerce_data_value(payload)
+    if data_err:
+        return None, data_err
+
+    op_name = payload.get("op")
+    if not isinstance(op_name, str) or op_name.strip() == "":
+        return None, "Missing 'op' field"
+
+    params = payload.get("params", {})
+    if params is None:
+        params = {}
+    elif isinstance(params, list):
+        if len(params) == 0:
+            params = {}
+        else:
+            return None, "'params' must be an object"
+    elif not isinstance(params, dict):
+        return None, "'params' must be an object"
+
+    return (data, op_name, params), None
+
+
 def _get_request_data() -> tuple[Optional[str], Optional[str]]:
     payload, err = _get_request_payload()
     if err:
@@ -104,68 +571,202 @@ def _get_request_data() -> tuple[Optional[str], Optional[str]]:
     return _coerce_data_value(payload)
 
 
-def _build_sympify_locals(*, include_units: bool = False) -> dict[str, Any]:
-    locals_map: dict[str, Any] = dict(SYMPIFY_BASE_LOCALS)
-    locals_map.update(REGISTERED_SYMBOLS)
-    locals_map.update(REGISTERED_RANDOM_VARIABLES)
-    if include_units:
-        locals_map.update(SYMPIFY_UNIT_LOCALS)
-    return locals_map
+class _ReadOnlyLocals(dict):
+    """Sympify namespace shared between calls; any mutation is a bug."""
 
+    def _readonly(self, *_: Any, **__: Any):
+        raise TypeError("sympify locals are read-only")
 
-def _apply_registered_symbols(expression: Any):
-    free_symbols = getattr(expression, "free_symbols", set())
-    if not free_symbols:
+    __setitem__ = __delitem__ = _readonly
+    clear = popitem = setdefault = update = _readonly
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        # parse_expr always pops its internal placeholder key; allow no-op pops only.
+        if key in self:
+            self._readonly()
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+
+def _build_sympify_locals(text: str, *, include_units: bool = False) -> dict[str, Any]:
+    lazy_names = tuple(name for name in SYMPIFY_LAZY_LOCALS if name in text)
+    with STATE_LOCK:
+        key = (STATE_VERSION, include_units, lazy_names)
+        locals_map = _SYMPIFY_LOCALS_CACHE.get(key)
+        if locals_map is not None:
+            return locals_map
+
+        merged: dict[str, Any] = dict(SYMPIFY_BASE_LOCALS)
+        for name in lazy_names:
+            module_name, attribute = SYMPIFY_LAZY_LOCALS[name]
+            merged[name] = getattr(_lazy_module(module_name), attribute)
+        merged.update(REGISTERED_SYMBOLS)
+        merged.update(REGISTERED_RANDOM_VARIABLES)
+        if include_units:
+            merged.update(_unit_locals())
+
+        locals_map = _ReadOnlyLocals(merged)
+        _SYMPIFY_LOCALS_CACHE[key] = locals_map
+        return locals_map
+
+
+def _replace_registered_names(expression: Any, name_map: dict[str, Any]):
+    free_symbols = getattr(expression, "free_symbols", None)
+    if not free_symbols or not name_map:
         return expression
     replacements = {
-        symbol: REGISTERED_SYMBOLS[symbol.name]
+        symbol: name_map[symbol.name]
         for symbol in free_symbols
-        if symbol.name in REGISTERED_SYMBOLS
+        if getattr(symbol, "name", None) in name_map and name_map[symbol.name] != symbol
     }
     if not replacements:
         return expression
-    return expression.subs(replacements)
+    return expression.xreplace(replacements)
 
 
-def _apply_registered_random_variables(expression: Any):
-    free_symbols = getattr(expression, "free_symbols", set())
+def _state_substitution_maps() -> tuple[dict[Any, Any], dict[str, Any]]:
+    global _STATE_SUBSTITUTIONS
+    version, variance_map, name_map = _STATE_SUBSTITUTIONS
+    if version == STATE_VERSION:
+        return variance_map, name_map
+
+    with STATE_LOCK:
+        version = STATE_VERSION
+        # Random variables win over plain registered symbols with the same name, and
+        # variance values see registry replacements, matching the old pass order.
+        name_map = dict(REGISTERED_SYMBOLS)
+        name_map.update(REGISTERED_RANDOM_VARIABLES)
+        variance_map = {key: _replace_registered_names(value, name_map) for key, value in variances.items()}
+        _STATE_SUBSTITUTIONS = (version, variance_map, name_map)
+    return variance_map, name_map
+
+
+def _apply_state_substitutions(expression: Any, *, include_variances: bool = True):
+    free_symbols = getattr(expression, "free_symbols", None)
     if not free_symbols:
         return expression
-    replacements = {
-        symbol: REGISTERED_RANDOM_VARIABLES[symbol.name]
-        for symbol in free_symbols
-        if symbol.name in REGISTERED_RANDOM_VARIABLES
-    }
+
+    variance_map, name_map = _state_substitution_maps()
+    if not include_variances:
+        variance_map = {}
+
+    replacements: dict[Any, Any] = {}
+    for symbol in free_symbols:
+        if symbol in variance_map:
+            replacements[symbol] = variance_map[symbol]
+            continue
+        name = getattr(symbol, "name", None)
+        if name in name_map and name_map[name] != symbol:
+            replacements[symbol] = name_map[name]
     if not replacements:
         return expression
+
+    # xreplace is purely structural: it does not re-evaluate the tree, so matrix values
+    # (``A^{-1}`` must become the inverse) and bound variables inside derivatives,
+    # integrals, sums, ... replaced by a non-symbol value still need subs.
+    if any(isinstance(value, MatrixBase) for value in replacements.values()):
+        return expression.subs(replacements)
+    renames_only = all(isinstance(value, sp.Symbol) for value in replacements.values())
+    if renames_only or not expression.has(*BINDING_EXPRESSION_TYPES):
+        return expression.xreplace(replacements)
     return expression.subs(replacements)
 
 
 def _sympify_with_locals(text: str, *, include_units: bool = False):
-    return sp.sympify(text, locals=_build_sympify_locals(include_units=include_units))
+    if not isinstance(text, str):
+        return text
+    return sp.sympify(text, locals=_build_sympify_locals(text, include_units=include_units))
+
+
+def _latex2sympy(text: str):
+    # latex2sympy writes into its variances map while parsing: assignments, and a MatrixSymbol
+    # alias whenever the input mentions a matrix variable.  Parsing under the state lock keeps
+    # concurrent snapshots and merges from iterating a half-updated map.
+    with STATE_LOCK:
+        return latex2sympy(text)
+
+
+def _parse_expression_uncached(text: str):
+    expression = _latex2sympy(text)
+    _sync_frac_type(text)
+    if not isinstance(expression, (sp.Basic, MatrixBase)):
+        raise ValueError(f"Could not parse expression: {text}")
+    return _apply_state_substitutions(expression)
 
 
 def _parse_expression(text: str):
-    expression = latex2sympy(text).subs(variances)
-    expression = _apply_registered_symbols(expression)
-    expression = _apply_registered_random_variables(expression)
+    if not isinstance(text, str):
+        # Pipeline stages hand over the previous stage's SymPy result as-is.
+        return text
+    if _may_assign_state(text):
+        # latex2sympy writes assignments straight into its variances map.
+        with STATE_LOCK:
+            try:
+                return _parse_expression_uncached(text)
+            finally:
+                _bump_state_version()
+
+    key = (text, STATE_VERSION)
+    cached = PARSE_CACHE.get(key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        _sync_frac_type(text)
+        return _copy_if_mutable(cached)
+
+    expression = _parse_expression_uncached(text)
+    PARSE_CACHE.put(key, _copy_if_mutable(expression))
+    return expression
+
+
+def _parse_sympify_expression(text: str):
+    if not isinstance(text, str):
+        return text
+    key = (PARSER_SYMPIFY, text, STATE_VERSION)
+    cached = PARSE_CACHE.get(key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return _copy_if_mutable(cached)
+
+    expression = _apply_state_substitutions(_sympify_with_locals(text), include_variances=False)
+    PARSE_CACHE.put(key, _copy_if_mutable(expression))
     return expression
 
 
 def _parse_expression_with_fallback(text: str):
-    try:
-        return _parse_expression(text)
-    except Exception:
+    if not isinstance(text, str):
+        return text
+    parser = PARSER_CHOICE_CACHE.get(text)
+    if parser == PARSER_INVALID:
+        _count_fallback("invalid_skipped")
+        raise ValueError(f"Could not parse expression: {text}")
+
+    if parser == PARSER_SYMPIFY:
+        _count_fallback("latex_skipped")
+    else:
         try:
-            expression = _sympify_with_locals(text)
-            expression = _apply_registered_symbols(expression)
-            expression = _apply_registered_random_variables(expression)
-            return expression
-        except Exception as exc:
-            raise ValueError(f"Could not parse expression: {text}") from exc
+            return _parse_expression(text)
+        except Exception:
+            _count_fallback("latex_failures")
+
+    try:
+        expression = _parse_sympify_expression(text)
+    except Exception as exc:
+        PARSER_CHOICE_CACHE.put(text, PARSER_INVALID)
+        raise ValueError(f"Could not parse expression: {text}") from exc
+
+    _count_fallback("sympify_parses")
+    PARSER_CHOICE_CACHE.put(text, PARSER_SYMPIFY)
+    return expression
+
+
+def _equation_and_expression(value: Any):
+    if isinstance(value, sp.Equality):
+        return value, value.lhs - value.rhs
+    return sp.Eq(value, 0), value
 
 
 def _parse_equation_or_zero_expression(text: str):
+    if not isinstance(text, str):
+        return _equation_and_expression(text)
     if "=" in text:
         lhs_text, rhs_text = text.split("=", 1)
         if lhs_text.strip() == "" or rhs_text.strip() == "":
@@ -182,6 +783,8 @@ def _parse_equation_or_zero_expression(text: str):
 
 
 def _parse_equation_or_zero_expression_with_fallback(text: str):
+    if not isinstance(text, str):
+        return _equation_and_expression(text)
     if "=" in text:
         lhs_text, rhs_text = text.split("=", 1)
         if lhs_text.strip() == "" or rhs_text.strip() == "":
@@ -206,7 +809,7 @@ def _parse_symbol(name: Any) -> Optional[sp.Symbol]:
         return None
 
     try:
-        parsed = latex2sympy(text)
+        parsed = _latex2sympy(text)
         if isinstance(parsed, sp.Symbol):
             return parsed
     except Exception:
@@ -263,7 +866,7 @@ def _parse_function_target(value: Any):
         return None
 
     try:
-        return latex2sympy(text)
+        return _latex2sympy(text)
     except Exception:
         try:
             return sp.sympify(text)
@@ -272,6 +875,10 @@ def _parse_function_target(value: Any):
 
 
 def _split_equation_inputs(text: str) -> list[str]:
+    if isinstance(text, (list, tuple)):
+        return list(text)
+    if not isinstance(text, str):
+        return [text]
     parts: list[str] = []
     normalized = text.replace("\r\n", "\n").replace("\r", "\n")
     for line in normalized.split("\n"):
@@ -580,6 +1187,381 @@ def _as_matrix(expression):
     raise ValueError("Operation requires matrix input")
 
 
+def _rational_domain_matrix(matrix, *, square: bool = False):
+    """Return ``matrix`` over ZZ/QQ when every entry is an explicit rational.
+
+    ``Matrix.det`` and ``Matrix.rank`` still work on generic SymPy entries
+    (rank takes tens of seconds at 20x20), while DomainMatrix runs
+    fraction-free elimination over ZZ/QQ.  Returns ``None`` when the fast
+    path does not apply so callers fall back to the Matrix method, which also
+    owns the error messages for bad shapes.
+    """
+    if matrix.rows == 0 or matrix.cols == 0:
+        return None
+    if square and matrix.rows != matrix.cols:
+        return None
+    if not all(getattr(entry, "is_Rational", False) for entry in matrix):
+        return None
+    return DomainMatrix.from_Matrix(matrix)
+
+
+def _domain_matrix_gauss_jordan_solve(augmented):
+    """``Matrix.gauss_jordan_solve`` for a rational augmented matrix ``[A|b]``.
+
+    Elimination runs on the sparse DomainMatrix over QQ, and the solution is
+    read from the nonzero entries of the reduced rows.  Returns the same
+    ``(solution, params)`` pair, with free parameters named ``tau0, tau1, ...``.
+    """
+    unknowns = augmented.shape[1] - 1
+    reduced, pivots = augmented.to_field().rref()
+    if pivots and pivots[-1] == unknowns:
+        raise ValueError("Linear system has no solution")
+
+    pivot_set = set(pivots)
+    free_columns = [column for column in range(unknowns) if column not in pivot_set]
+    params = {column: sp.Symbol(f"tau{index}") for index, column in enumerate(free_columns)}
+    to_sympy = reduced.domain.to_sympy
+    solution = sp.zeros(unknowns, 1)
+    for column, param in params.items():
+        solution[column, 0] = param
+
+    reduced_rows = reduced.to_sdm()
+    for row, pivot in enumerate(pivots):
+        entries = reduced_rows.get(row, {})
+        value = to_sympy(entries[unknowns]) if unknowns in entries else sp.S.Zero
+        for column, entry in entries.items():
+            if column in params:
+                value -= to_sympy(entry) * params[column]
+        solution[pivot, 0] = value
+    return solution, sp.Matrix(len(free_columns), 1, [params[column] for column in free_columns])
+
+
+def _symbolic_linalg_is_expensive(op_name: str, matrix) -> bool:
+    """Predict whether exact ``eigenvals``/``eigenvects``/``svd``/``qr`` is slow or unreadable.
+
+    Float entries make exact radicals meaningless; apart from that ``qr`` stays
+    exact unless ``numeric``/``prec`` asks otherwise.  For rational eigen/svd input the
+    characteristic polynomial (of ``A^H A`` for ``svd``) is factored over QQ:
+    an irreducible factor of degree 3 or more means Cardano-style nested roots
+    or ``CRootOf`` results, and symbolic SVDs of that kind run for minutes.
+    Irrational constants (``sqrt(2)``, ``pi``) count as expensive from 3x3.
+    """
+    if matrix.rows == 0 or matrix.cols == 0 or matrix.free_symbols:
+        return False
+    if any(entry.has(sp.Float) for entry in matrix):
+        return True
+    if op_name == "qr":
+        # Exact Gram-Schmidt stays fast at any size; numeric QR is opt-in.
+        return False
+
+    target = matrix
+    if op_name == "svd":
+        target = matrix.H * matrix if matrix.cols <= matrix.rows else matrix * matrix.H
+    elif not matrix.is_square:
+        return False
+    domain_matrix = _rational_domain_matrix(target, square=True)
+    if domain_matrix is None:
+        return target.rows >= NUMERIC_LINALG_AUTO_DEGREE
+    to_sympy = domain_matrix.domain.to_sympy
+    charpoly = sp.Poly([to_sympy(coefficient) for coefficient in domain_matrix.charpoly()], sp.Dummy("x"))
+    _, factors = charpoly.factor_list()
+    return any(factor.degree() >= NUMERIC_LINALG_AUTO_DEGREE for factor, _ in factors)
+
+
+def _numeric_linalg_mode(op_name: str, matrix, params: dict[str, Any]) -> tuple[bool, Optional[int]]:
+    """Return ``(numeric, digits)`` for ``eigenvals``/``eigenvects``/``svd``/``qr``.
+
+    ``numeric`` forces either path, ``prec`` alone implies numeric mode, and
+    without either the op goes numeric when the exact path looks expensive.
+    ``digits`` is ``None`` for the float64 default.
+    """
+    digits = None
+    if params.get("prec") is not None:
+        digits = _parse_positive_int(params.get("prec"), "prec")
+
+    if params.get("numeric") is not None:
+        numeric = _parse_bool_value(params.get("numeric"), "numeric")
+        if not numeric and digits is not None:
+            raise ValueError(f"{op_name} prec requires numeric mode")
+    else:
+        numeric = digits is not None or _symbolic_linalg_is_expensive(op_name, matrix)
+
+    if numeric and matrix.free_symbols:
+        raise ValueError(f"{op_name} numeric mode requires a matrix without free symbols")
+    return numeric, digits
+
+
+class _NumericLinalg:
+    """Numeric matrix routines on NumPy float64, or mpmath at a requested precision.
+
+    Results come back as SymPy numbers rounded to ``digits`` significant
+    digits.  Components below the tolerance (relative to the largest entry) are
+    dropped, so ``10^{-17} i`` round-off does not turn real results complex.
+    """
+
+    def __init__(self, matrix, digits: Optional[int]):
+        self.numpy = None
+        if digits is None:
+            try:
+                self.numpy = _lazy_module("numpy")
+            except ImportError:
+                pass
+        self.digits = digits or NUMERIC_LINALG_DEFAULT_DIGITS
+        self.rows, self.cols = matrix.shape
+        self.hermitian = matrix.is_square and matrix.is_hermitian is True
+
+        if self.numpy is not None:
+            self.array = self.numpy.array([complex(entry.evalf(17)) for entry in matrix]).reshape(matrix.shape)
+            if not self.array.imag.any():
+                self.array = self.array.real
+            scale = float(self.numpy.abs(self.array).max())
+            self.tolerance = max(scale, 1.0) * 10.0 ** (3 - self.digits)
+            return
+
+        self.ctx = mpmath.MPContext()
+        # Guard digits keep round-off well below the rounded result.
+        self.ctx.dps = self.digits + 10
+        self.array = self.ctx.matrix(self.rows, self.cols)
+        scale = self.ctx.one
+        for row in range(self.rows):
+            for column in range(self.cols):
+                real, imag = matrix[row, column].evalf(self.ctx.dps).as_real_imag()
+                value = self.ctx.convert(real)
+                if imag != 0:
+                    value = self.ctx.mpc(value, self.ctx.convert(imag))
+                self.array[row, column] = value
+                scale = max(scale, abs(value))
+        self.tolerance = scale * self.ctx.mpf(10) ** (3 - self.digits)
+
+    def number(self, value) -> Any:
+        parts = []
+        for part in (value.real, value.imag):
+            if abs(part) <= self.tolerance:
+                parts.append(sp.S.Zero)
+            elif self.numpy is not None:
+                parts.append(sp.Float(f"{float(part):.{self.digits}g}", self.digits))
+            else:
+                parts.append(sp.Float(self.ctx.nstr(part, self.digits), self.digits))
+        return parts[0] + parts[1] * sp.I
+
+    def matrix(self, rows: int, cols: int, entry: Callable[[int, int], Any]) -> Any:
+        return sp.Matrix(rows, cols, lambda row, column: self.number(entry(row, column)))
+
+    def eigen(self, vectors: bool) -> tuple[list, list[list]]:
+        basis = None
+        if self.numpy is not None:
+            linalg = self.numpy.linalg
+            if vectors:
+                values, basis = linalg.eigh(self.array) if self.hermitian else linalg.eig(self.array)
+            else:
+                values = linalg.eigvalsh(self.array) if self.hermitian else linalg.eigvals(self.array)
+        elif self.hermitian:
+            if vectors:
+                values, basis = self.ctx.eigh(self.array)
+            else:
+                values = self.ctx.eigh(self.array, eigvals_only=True)
+        elif vectors:
+            values, basis = self.ctx.eig(self.array)
+        else:
+            values = self.ctx.eig(self.array, right=False)
+
+        columns = []
+        if basis is not None:
+            for column in range(self.rows):
+                columns.append([basis[row, column] for row in range(self.rows)])
+        return [values[index] for index in range(self.rows)], columns
+
+    def svd(self) -> tuple[Any, Any, Any]:
+        if self.numpy is not None:
+            u, singular, vh = self.numpy.linalg.svd(self.array, full_matrices=False)
+        else:
+            u, singular, vh = self.ctx.svd(self.array, full_matrices=False, compute_uv=True)
+        # Keep the compact shape of Matrix.singular_value_decomposition (nonzero values only).
+        keep = [index for index in range(min(self.rows, self.cols)) if abs(singular[index]) > self.tolerance]
+        u_matrix = self.matrix(self.rows, len(keep), lambda row, column: u[row, keep[column]])
+        s_matrix = sp.diag(*[self.number(singular[index]) for index in keep])
+        v_matrix = self.matrix(self.cols, len(keep), lambda row, column: vh[keep[column], row].conjugate())
+        return u_matrix, s_matrix, v_matrix
+
+    def qr(self) -> tuple[Any, Any]:
+        if self.numpy is not None:
+            q, r = self.numpy.linalg.qr(self.array)
+        else:
+            q, r = self.ctx.qr(self.array, mode="skinny")
+        size = min(self.rows, self.cols)
+        # Householder QR leaves the signs free; match SymPy's non-negative R diagonal.
+        phases = []
+        for index in range(size):
+            pivot = r[index, index]
+            phases.append(pivot / abs(pivot) if abs(pivot) > self.tolerance else 1)
+        q_matrix = self.matrix(self.rows, size, lambda row, column: q[row, column] * phases[column])
+        r_matrix = self.matrix(size, self.cols, lambda row, column: r[row, column] * phases[row].conjugate())
+        return q_matrix, r_matrix
+
+
+def _numeric_eigen_groups(linalg: _NumericLinalg, vectors: bool) -> list[tuple[Any, int, list]]:
+    """Group numeric eigenpairs by rounded eigenvalue, shaped like ``Matrix.eigenvects``."""
+    values, columns = linalg.eigen(vectors)
+    groups: dict[Any, tuple[int, list]] = {}
+    for index, value in enumerate(values):
+        key = linalg.number(value)
+        count, basis = groups.get(key, (0, []))
+        if vectors:
+            vector = columns[index]
+            # Fix the free phase so the largest component is real and positive.
+            pivot = max(vector, key=abs)
+            phase = pivot / abs(pivot)
+            basis = basis + [sp.Matrix([linalg.number(component / phase) for component in vector])]
+        groups[key] = (count + 1, basis)
+    return [(value, count, basis) for value, (count, basis) in groups.items()]
+
+
+def _has_symbolic_residue(value: Any) -> bool:
+    if isinstance(value, MatrixBase):
+        return any(_has_symbolic_residue(entry) for entry in value)
+    if not getattr(value, "is_number", False):
+        return True
+    return value.has(sp.Integral, sp.Derivative, sp.Sum, sp.Product, sp.Limit)
+
+
+def _helper_context() -> Optional[Any]:
+    """Return the multiprocessing context for budgeted and raced helpers, or ``None``.
+
+    Helpers fork from a single-threaded forkserver (itself started with fork+exec), never
+    from the threaded server, and the preload keeps sympy and this module imported so a
+    helper starts in milliseconds once the forkserver runs.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _helper_main(connection: Any, target: Callable[..., None], args: tuple[Any, ...]):
+    # The requesting process never writes, so the connection turns readable only once it
+    # closes its end or dies (killed op worker, cancelled request); the helper follows it.
+    def watch():
+        try:
+            connection.poll(None)
+        finally:
+            os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
+    target(connection, *args)
+
+
+def _start_child(context: Any, target: Callable[..., None], *args: Any) -> tuple[Any, Any]:
+    """Run ``target(connection, *args)`` in a helper process; return the connection and the process.
+
+    ``start`` returns once the helper is forked, so the first call pays the forkserver
+    startup before any deadline is taken.  The helper sends its results over the connection.
+    """
+    connection, child_connection = context.Pipe()
+    process = context.Process(target=_helper_main, args=(child_connection, target, args), daemon=True)
+    process.start()
+    child_connection.close()
+    return connection, process
+
+
+def _stop_child(connection: Any, process: Any):
+    process.kill()
+    process.join()
+    connection.close()
+
+
+def _simplify_ladder(connection: Any, expression: Any):
+    # Send every candidate that beats the best so far, then full simplify as the final answer.
+    best, best_ops = expression, sp.count_ops(expression)
+    for name in SIMPLIFY_LADDER:
+        try:
+            candidate = getattr(sp, name)(best)
+            ops = sp.count_ops(candidate)
+        except Exception:
+            continue
+        if ops < best_ops:
+            best, best_ops = candidate, ops
+            connection.send((name, best))
+    try:
+        connection.send(("simplify", simplify(expression)))
+    except Exception as exc:
+        connection.send(("error", str(exc) or type(exc).__name__))
+
+
+def _parse_simplify_budget(value: Any) -> int:
+    if value is None:
+        return SIMPLIFY_BUDGET_MS
+    budget_ms = _parse_int_value(value, "budget_ms")
+    if budget_ms < 0:
+        raise ValueError("budget_ms must not be negative")
+    return budget_ms
+
+
+def _budgeted_simplify(expression: Any, budget_ms: int) -> Any:
+    """``simplify`` that returns the best form found when ``budget_ms`` runs out (0: unlimited).
+
+    The ladder runs in a helper process so the deadline also holds inside ``simplify`` itself;
+    the outcome is reported as ``meta.simplify`` (``status`` ``final`` or ``budget_limited``,
+    and the ``stage`` that produced the result; budget-limited results are marked ``partial``
+    and kept out of the result cache).
+    """
+    context = _helper_context()
+    if budget_ms <= 0 or not isinstance(expression, sp.Basic) or context is None:
+        return simplify(expression)
+
+    best, stage = expression, None
+    connection, process = _start_child(context, _simplify_ladder, expression)
+    deadline = time.perf_counter() + budget_ms / 1000
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not connection.poll(remaining):
+                break
+            try:
+                name, value = connection.recv()
+            except EOFError:
+                break
+            if name == "error":
+                raise ValueError(value)
+            best, stage = value, name
+            if name == "simplify":
+                break
+    finally:
+        _stop_child(connection, process)
+
+    final = stage == "simplify"
+    _report_op_meta(simplify={"status": "final" if final else "budget_limited", "stage": stage})
+    if not final:
+        _report_op_meta(partial=True)
+    return best
+
+
+def _evaluate_numerically(
+    expression: Any, values: dict[Any, Any], digits: int, budget_ms: int = 0
+) -> tuple[Any, str]:
+    """Evaluate for /numerical, escalating only while the result is not a plain number.
+
+    ``evalf`` (mpmath underneath) handles numeric input directly, including
+    integrals and sums by quadrature and numeric summation.  Expressions that
+    keep unevaluated objects go through ``doit``, and ``simplify`` (within
+    ``budget_ms``) only runs when free symbols remain that might still cancel.
+    Returns the value and the path taken: ``"evalf"``, ``"doit"``, or
+    ``"simplify"``.
+    """
+    try:
+        result = expression.evalf(digits, subs=values)
+    except Exception:
+        result = None
+    if result is not None and not _has_symbolic_residue(result):
+        return result, "evalf"
+
+    expanded = expression.doit().doit()
+    result = expanded.evalf(digits, subs=values)
+    if not _has_symbolic_residue(result):
+        return result, "doit"
+    return _budgeted_simplify(expanded, budget_ms).evalf(digits, subs=values), "simplify"
+
+
 def _to_latex(value: Any) -> str:
     if isinstance(value, dict):
         parts = []
@@ -595,36 +1577,37 @@ def _to_latex(value: Any) -> str:
         return "{" + ", ".join(items) + "}"
 
     try:
-        return latex(value)
+        return _render_latex(value)
     except Exception:
         return str(value)
 
 
-def _op_simplify(data: str, params: dict[str, Any]) -> str:
-    _ensure_allowed_params(params, "simplify", set())
+def _op_simplify(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "simplify", {"budget_ms"})
+    budget_ms = _parse_simplify_budget(params.get("budget_ms"))
     expression = _parse_expression(data)
-    return _to_latex(simplify(expression))
+    return _budgeted_simplify(expression, budget_ms)
 
 
-def _op_trigsimp(data: str, params: dict[str, Any]) -> str:
+def _op_trigsimp(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "trigsimp", set())
     expression = _parse_expression(data)
-    return _to_latex(trigsimp(expression))
+    return trigsimp(expression)
 
 
-def _op_ratsimp(data: str, params: dict[str, Any]) -> str:
+def _op_ratsimp(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "ratsimp", set())
     expression = _parse_expression(data)
-    return _to_latex(ratsimp(expression))
+    return ratsimp(expression)
 
 
-def _op_powsimp(data: str, params: dict[str, Any]) -> str:
+def _op_powsimp(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "powsimp", set())
     expression = _parse_expression(data)
-    return _to_latex(powsimp(expression))
+    return powsimp(expression)
 
 
-def _op_apart(data: str, params: dict[str, Any]) -> str:
+def _op_apart(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "apart", {"var"})
     expression = _parse_expression(data)
     symbol = _parse_symbol_param(params.get("var"), "var")
@@ -634,19 +1617,312 @@ def _op_apart(data: str, params: dict[str, Any]) -> str:
     else:
         result = apart(expression, symbol)
 
-    return _to_latex(result)
+    return result
 
 
-def _op_subs(data: str, params: dict[str, Any]) -> str:
+def _op_subs(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "subs", {"assignments"})
     expression = _parse_expression(data)
     substitutions = _parse_substitution_assignments(params)
     result = expression.subs(substitutions)
-    return _to_latex(result)
+    return result
+
+
+_GRID_CALL_PATTERN = re.compile(r"^(linspace|arange)\((.*)\)$", re.IGNORECASE)
+# Plain decimal literals; LaTeX would read `1e-5` as `1 \cdot e - 5`.
+_GRID_DECIMAL_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
 
 
-def _op_solveset(data: str, params: dict[str, Any]) -> str:
-    _ensure_allowed_params(params, "solveset", {"var", "domain"})
+def _parse_grid_number(value: Any, name: str, real: bool = False) -> Any:
+    text = str(value).strip()
+    number = sp.Rational(text) if _GRID_DECIMAL_PATTERN.match(text) else _parse_point(text)
+    if not getattr(number, "is_number", False) or (real and number.is_extended_real is False):
+        kind = "a real number" if real else "a number"
+        raise ValueError(f"eval_grid value for {name} must be {kind}: {value}")
+    return number
+
+
+def _parse_grid_axis(name: str, spec: Any) -> tuple[str, tuple[Any, ...], int]:
+    """Parse one axis as ``(kind, args, count)``; backends build the actual values."""
+    if isinstance(spec, list):
+        values = tuple(_parse_grid_number(item, name) for item in spec)
+        return "values", values, len(values)
+
+    text = str(spec).strip()
+    call = _GRID_CALL_PATTERN.match(text)
+    if call is not None:
+        kind, args = call.group(1).lower(), call.group(2).split(",")
+    elif ":" in text:
+        kind, args = "linspace", text.split(":")
+    elif text.startswith("[") and text.endswith("]"):
+        values = tuple(_parse_grid_number(item, name) for item in text[1:-1].split(","))
+        return "values", values, len(values)
+    else:
+        return "values", (_parse_grid_number(text, name),), 1
+
+    if kind == "linspace":
+        if len(args) != 3:
+            raise ValueError(f"eval_grid {name} expects linspace(start, stop, count) or start:stop:count")
+        start, stop = (_parse_grid_number(arg, name, real=True) for arg in args[:2])
+        count = _parse_positive_int(args[2].strip(), f"{name} point count")
+        return "linspace", (start, stop), count
+
+    if len(args) not in (2, 3):
+        raise ValueError(f"eval_grid {name} expects arange(start, stop[, step])")
+    start, stop = (_parse_grid_number(arg, name, real=True) for arg in args[:2])
+    step = _parse_grid_number(args[2], name, real=True) if len(args) == 3 else sp.S.One
+    if step == 0:
+        raise ValueError(f"eval_grid {name} step must be non-zero")
+    # Like numpy.arange, the stop value is excluded.
+    count = int(sp.ceiling((stop - start) / step))
+    if count <= 0:
+        raise ValueError(f"eval_grid {name} range is empty")
+    return "arange", (start, step), count
+
+
+def _parse_grid_points(value: Any, width: int) -> list[tuple[str, tuple[Any, ...], int]]:
+    if isinstance(value, list):
+        rows = [item if isinstance(item, list) else [item] for item in value]
+    else:
+        # "(0,1);(1,2)" or, for one variable, "0;0.5;1".
+        rows = [part.strip().strip("()").split(",") for part in str(value).split(";") if part.strip()]
+    if len(rows) == 0:
+        raise ValueError("eval_grid 'points' must not be empty")
+    if len(rows) > EVAL_GRID_MAX_POINTS:
+        raise ValueError(f"eval_grid is limited to {EVAL_GRID_MAX_POINTS} points")
+
+    points = []
+    for index, row in enumerate(rows, start=1):
+        if len(row) != width:
+            raise ValueError(f"eval_grid point #{index} must have {width} coordinate(s)")
+        points.append(tuple(_parse_grid_number(item, f"point #{index}") for item in row))
+    # Explicit points are evaluated column-wise, without a cartesian product.
+    return [("values", column, len(points)) for column in zip(*points)]
+
+
+def _bind_mpmath_context(func: Callable, ctx: Any) -> Callable:
+    # The cached callable looks its functions up in the global mpmath namespace; rebinding the
+    # compiled code to a private context keeps concurrent requests off the shared `mp.dps`.
+    namespace = dict(func.__globals__)
+    namespace.update({name: getattr(ctx, name) for name in func.__code__.co_names if hasattr(ctx, name)})
+    return types.FunctionType(func.__code__, namespace)
+
+
+def _eval_grid_numpy(func: Callable, axes: list, product: bool, digits: int) -> tuple[list, list]:
+    numpy = _lazy_module("numpy")
+    arrays = []
+    for kind, args, count in axes:
+        if kind == "linspace":
+            array = numpy.linspace(float(args[0]), float(args[1]), count)
+        elif kind == "arange":
+            array = float(args[0]) + float(args[1]) * numpy.arange(count)
+        else:
+            array = numpy.array([complex(value) for value in args])
+            array = array.real if not array.imag.any() else array
+        arrays.append(array)
+    if product:
+        arrays = [mesh.ravel() for mesh in numpy.meshgrid(*arrays, indexing="ij")]
+
+    with numpy.errstate(all="ignore"):
+        values = numpy.broadcast_to(numpy.asarray(func(*arrays)), arrays[0].shape)
+        if not numpy.iscomplexobj(values) and numpy.isnan(values).any():
+            # sqrt(-1), log(-1), ... are NaN on float input; retry those points over complex numbers.
+            retried = numpy.broadcast_to(numpy.asarray(func(*(array.astype(complex) for array in arrays))), values.shape)
+            values = numpy.where(numpy.isnan(values), retried, values)
+    return [array.tolist() for array in arrays], values.tolist()
+
+
+def _eval_grid_mpmath(func: Callable, axes: list, product: bool, digits: int) -> tuple[list, list]:
+    ctx = mpmath.MPContext()
+    ctx.dps = digits + 10
+    func = _bind_mpmath_context(func, ctx)
+
+    def convert(value):
+        real, imag = value.evalf(ctx.dps).as_real_imag()
+        if imag == 0:
+            return ctx.convert(real)
+        return ctx.mpc(ctx.convert(real), ctx.convert(imag))
+
+    columns = []
+    for kind, args, count in axes:
+        if kind == "linspace":
+            columns.append(ctx.linspace(convert(args[0]), convert(args[1]), count))
+        elif kind == "arange":
+            start, step = convert(args[0]), convert(args[1])
+            columns.append([start + step * index for index in range(count)])
+        else:
+            columns.append([convert(value) for value in args])
+    if product:
+        columns = [list(column) for column in zip(*itertools.product(*columns))]
+
+    values = []
+    for point in zip(*columns):
+        try:
+            values.append(ctx.convert(func(*point)))
+        except (ZeroDivisionError, ValueError):
+            values.append(ctx.nan)
+    return columns, values
+
+
+def _grid_number_text(part: Any, digits: int) -> str:
+    # Both backends format through mpmath's raw formatter so float64 and mpf cells read the same.
+    raw = part._mpf_ if hasattr(part, "_mpf_") else mpmath.libmp.from_float(float(part))
+    mantissa, marker, exponent = mpmath.libmp.to_str(raw, digits).partition("e")
+    return mantissa.removesuffix(".0") + marker + exponent
+
+
+def _grid_number_latex(text: str) -> str:
+    text = text.lstrip("+")
+    magnitude = text.lstrip("-")
+    if magnitude == "nan":
+        return "\\text{NaN}"
+    if magnitude == "inf":
+        return "-\\infty" if text.startswith("-") else "\\infty"
+    mantissa, _, exponent = text.partition("e")
+    if exponent:
+        return f"{mantissa} \\cdot 10^{{{int(exponent)}}}"
+    return mantissa
+
+
+def _grid_cell_latex(parts: list[str]) -> str:
+    if len(parts) == 1:
+        return _grid_number_latex(parts[0])
+    real, imag = (_grid_number_latex(part) for part in parts)
+    if float(parts[0]) == 0:
+        return f"{imag} i"
+    if imag.startswith("-"):
+        return f"{real} - {imag[1:]} i"
+    return f"{real} + {imag} i"
+
+
+def _grid_cell_json(parts: list[str]) -> str:
+    # Rounded decimal text is emitted as-is so mpmath results keep their digits.
+    texts = ["null" if text.lstrip("+-") in {"nan", "inf"} else text for text in parts]
+    if len(texts) == 1:
+        return texts[0]
+    return '{"re":' + texts[0] + ',"im":' + texts[1] + "}"
+
+
+def _op_eval_grid(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "eval_grid", {"grid", "points", "vars", "backend", "prec", "format"})
+    expression = _parse_expression(data)
+    if not isinstance(expression, sp.Expr) or isinstance(expression, MatrixBase):
+        raise ValueError("eval_grid expects a scalar expression")
+
+    grid = params.get("grid")
+    if (grid is None) == (params.get("points") is None):
+        raise ValueError("eval_grid expects either 'grid' or 'points'")
+
+    if grid is not None:
+        if not isinstance(grid, list) or len(grid) == 0:
+            raise ValueError("eval_grid 'grid' must be a non-empty array of {var, values}")
+        symbols, axes = [], []
+        for index, axis in enumerate(grid, start=1):
+            if not isinstance(axis, dict) or "var" not in axis or "values" not in axis:
+                raise ValueError(f"eval_grid axis #{index} must include 'var' and 'values'")
+            symbol = _parse_symbol(axis["var"])
+            if symbol is None:
+                raise ValueError(f"eval_grid axis #{index} has an invalid variable")
+            symbols.append(symbol)
+            axes.append(_parse_grid_axis(symbol.name, axis["values"]))
+        size = 1
+        for _, _, count in axes:
+            size *= count
+        if size > EVAL_GRID_MAX_POINTS:
+            raise ValueError(f"eval_grid is limited to {EVAL_GRID_MAX_POINTS} points")
+    else:
+        symbols = _parse_symbol_list(params.get("vars"), "vars")
+        if not symbols:
+            symbols = sorted(expression.free_symbols, key=lambda symbol: symbol.name)
+        if not symbols:
+            raise ValueError("eval_grid could not infer variables; pass explicit vars")
+        axes = _parse_grid_points(params.get("points"), len(symbols))
+
+    if len(set(symbols)) != len(symbols):
+        raise ValueError("eval_grid variables must be distinct")
+    missing = sorted(expression.free_symbols - set(symbols), key=lambda symbol: symbol.name)
+    if missing:
+        raise ValueError("eval_grid needs values for: " + ", ".join(symbol.name for symbol in missing))
+
+    backend = str(params.get("backend", "")).strip().lower()
+    digits = NUMERICAL_DEFAULT_DIGITS
+    if params.get("prec") is not None:
+        digits = _parse_positive_int(params.get("prec"), "prec")
+        backend = backend or "mpmath"
+        if backend != "mpmath":
+            raise ValueError("prec requires the mpmath backend")
+    if backend == "":
+        try:
+            _lazy_module("numpy")
+            backend = "numpy"
+        except ImportError:
+            backend = "mpmath"
+    if backend not in EVAL_GRID_BACKENDS:
+        raise ValueError("eval_grid backend must be one of: " + ", ".join(EVAL_GRID_BACKENDS))
+
+    output = str(params.get("format", "latex")).strip().lower()
+    if output not in EVAL_GRID_FORMATS:
+        raise ValueError("eval_grid format must be one of: " + ", ".join(EVAL_GRID_FORMATS))
+
+    func = LAMBDIFY_REGISTRY.get(expression, tuple(symbols), backend)
+    evaluate = _eval_grid_numpy if backend == "numpy" else _eval_grid_mpmath
+    columns, values = evaluate(func, axes, grid is not None, digits)
+    rows = [
+        [
+            [_grid_number_text(value.real, digits)] if value.imag == 0
+            else [_grid_number_text(value.real, digits), _grid_number_text(value.imag, digits)]
+            for value in row
+        ]
+        for row in zip(*columns, values)
+    ]
+
+    if output == "json":
+        names = ",".join(json.dumps(symbol.name) for symbol in symbols)
+        body = ",".join("[" + ",".join(_grid_cell_json(cell) for cell in row) + "]" for row in rows)
+        return '{"vars":[' + names + '],"rows":[' + body + "]}"
+
+    # The selection's own text heads the value column; a pipeline stage hands over an object.
+    label = data.strip() if isinstance(data, str) else _to_latex(expression)
+    header = " & ".join([_to_latex(symbol) for symbol in symbols] + [label])
+    lines = [" & ".join(_grid_cell_latex(cell) for cell in row) for row in rows]
+    return (
+        "\\begin{array}{" + "c" * len(symbols) + "|c} " + header + " \\\\ \\hline "
+        + " \\\\ ".join(lines) + " \\end{array}"
+    )
+
+
+def _univariate_polynomial(expression: Any, symbol: sp.Symbol) -> Optional[sp.Poly]:
+    # Integer/rational coefficients only; other domains keep the general solvers.
+    if not isinstance(expression, sp.Expr) or expression.free_symbols != {symbol}:
+        return None
+    try:
+        poly = sp.Poly(expression, symbol)
+    except sp.PolynomialError:
+        return None
+    if poly.degree() < 1 or not (poly.domain.is_ZZ or poly.domain.is_QQ):
+        return None
+    return poly
+
+
+def _polynomial_roots(poly: sp.Poly) -> list[Any]:
+    """Distinct roots as ``sp.solve`` builds them: radicals where possible, else ``CRootOf``."""
+    found = sp.roots(poly, cubics=True, quartics=True, quintics=True)
+    if sum(found.values()) < poly.degree():
+        return list(dict.fromkeys(poly.all_roots()))
+    return list(found)
+
+
+def _polynomial_numeric_mode(params: dict[str, Any]) -> tuple[bool, int]:
+    numeric = _parse_bool_value(params["numeric"], "numeric") if params.get("numeric") is not None else False
+    digits = NUMERICAL_DEFAULT_DIGITS
+    if params.get("prec") is not None:
+        digits = _parse_positive_int(params.get("prec"), "prec")
+        numeric = True
+    return numeric, digits
+
+
+def _op_solveset(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "solveset", {"var", "domain", "numeric", "prec"})
     equation, expression = _parse_equation_or_zero_expression(data)
     symbol = _symbol_from_params_or_default(params, equation.free_symbols)
     if symbol is None:
@@ -655,11 +1931,26 @@ def _op_solveset(data: str, params: dict[str, Any]) -> str:
         raise ValueError("No variable found for solveset")
 
     domain = _parse_solveset_domain(params.get("domain"))
+    numeric, digits = _polynomial_numeric_mode(params)
+    poly = _univariate_polynomial(expression, symbol)
+    if numeric and poly is None:
+        raise ValueError("numeric roots require a univariate polynomial with rational coefficients")
+    if poly is not None and domain in (sp.S.Complexes, sp.S.Reals):
+        real = domain is sp.S.Reals
+        if numeric:
+            roots = [root for root in poly.nroots(n=digits) if not real or root.is_real]
+        elif real:
+            # Real-root isolation: exact, with CRootOf for factors that have no radical form.
+            roots = poly.real_roots()
+        else:
+            roots = _polynomial_roots(poly)
+        return sp.FiniteSet(*roots)
+
     result = sp.solveset(expression, symbol, domain=domain)
-    return _to_latex(result)
+    return result
 
 
-def _op_linsolve(data: str, params: dict[str, Any]) -> str:
+def _op_linsolve(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "linsolve", {"vars"})
     if len(_split_equation_inputs(data)) == 0:
         raise ValueError("linsolve requires at least one equation")
@@ -671,10 +1962,10 @@ def _op_linsolve(data: str, params: dict[str, Any]) -> str:
         raise ValueError("linsolve could not infer variables; pass explicit vars")
 
     result = sp.linsolve(expressions, tuple(symbols))
-    return _to_latex(result)
+    return result
 
 
-def _op_nonlinsolve(data: str, params: dict[str, Any]) -> str:
+def _op_nonlinsolve(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "nonlinsolve", {"vars"})
     if len(_split_equation_inputs(data)) == 0:
         raise ValueError("nonlinsolve requires at least one equation")
@@ -686,12 +1977,12 @@ def _op_nonlinsolve(data: str, params: dict[str, Any]) -> str:
         raise ValueError("nonlinsolve could not infer variables; pass explicit vars")
 
     result = sp.nonlinsolve(expressions, tuple(symbols))
-    return _to_latex(result)
+    return result
 
 
-def _op_rsolve(data: str, params: dict[str, Any]) -> str:
+def _op_rsolve(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "rsolve", {"func"})
-    if "=" in data:
+    if isinstance(data, str) and "=" in data:
         equation, _ = _parse_equation_or_zero_expression_with_fallback(data)
         recurrence = equation
     else:
@@ -703,10 +1994,10 @@ def _op_rsolve(data: str, params: dict[str, Any]) -> str:
     else:
         result = sp.rsolve(recurrence, func)
 
-    return _to_latex(result)
+    return result
 
 
-def _op_diophantine(data: str, params: dict[str, Any]) -> str:
+def _op_diophantine(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "diophantine", {"vars"})
     equation_inputs = _split_equation_inputs(data)
     if len(equation_inputs) != 1:
@@ -721,10 +2012,10 @@ def _op_diophantine(data: str, params: dict[str, Any]) -> str:
             result = sp.diophantine(expression)
     else:
         result = sp.diophantine(expression)
-    return _to_latex(result)
+    return result
 
 
-def _op_solve(data: str, params: dict[str, Any]) -> str:
+def _op_solve(data: str, params: dict[str, Any]) -> Any:
     equation, expression = _parse_equation_or_zero_expression(data)
     symbols = _parse_symbol_list(params.get("vars"), "vars")
     if not symbols:
@@ -740,14 +2031,26 @@ def _op_solve(data: str, params: dict[str, Any]) -> str:
             raise ValueError("No variable found for solve")
         symbols = [default]
 
+    numeric, digits = _polynomial_numeric_mode(params)
+    poly = _univariate_polynomial(expression, symbols[0]) if len(symbols) == 1 else None
+    if numeric and poly is None:
+        raise ValueError("numeric roots require a univariate polynomial with rational coefficients")
+    if poly is not None:
+        symbol = symbols[0]
+        if numeric:
+            return poly.nroots(n=digits)
+        # Same filtering and order as sp.solve, without its general preprocessing and checks.
+        roots = [root for root in _polynomial_roots(poly) if check_assumptions(root, **symbol.assumptions0) is not False]
+        return sorted(roots, key=lambda root: default_sort_key({symbol: root}))
+
     if len(symbols) == 1:
         result = sp.solve(equation, symbols[0])
     else:
         result = sp.solve(equation, symbols, dict=True)
-    return _to_latex(result)
+    return result
 
 
-def _op_diff(data: str, params: dict[str, Any]) -> str:
+def _op_diff(data: str, params: dict[str, Any]) -> Any:
     expression = _parse_expression(data)
     chain = params.get("chain")
     if chain is not None:
@@ -765,7 +2068,7 @@ def _op_diff(data: str, params: dict[str, Any]) -> str:
             if symbol is None:
                 raise ValueError("No variable found for differentiation")
             result = sp.diff(result, symbol, order)
-        return _to_latex(result)
+        return result
 
     order = _parse_positive_int(params.get("order", 1), "order")
     symbol = _symbol_from_params_or_default(params, expression.free_symbols)
@@ -773,11 +2076,105 @@ def _op_diff(data: str, params: dict[str, Any]) -> str:
         raise ValueError("No variable found for differentiation")
 
     result = sp.diff(expression, symbol, order)
-    return _to_latex(result)
+    return result
+
+
+def _integrate_with_method(expression: Any, integration_args: list[Any], method: str) -> Any:
+    if method == "numeric":
+        return sp.Integral(expression, *integration_args).evalf()
+    return sp.integrate(expression, *integration_args, **{method: True})
+
+
+def _integrate_racer(connection: Any, expression: Any, integration_args: list[Any], method: str):
+    try:
+        reply = (True, _integrate_with_method(expression, integration_args, method))
+    except Exception as exc:
+        reply = (False, str(exc) or type(exc).__name__)
+    connection.send(reply)
 
 
-def _op_integrate(data: str, params: dict[str, Any]) -> str:
+def _race_integrate(expression: Any, integration_args: list[Any], budget_ms: Optional[int]) -> Any:
+    context = _helper_context()
+    if context is None:
+        raise ValueError("integrate strategy=race needs a platform with the forkserver start method")
+
+    integral = sp.Integral(expression, *integration_args)
+    definite = all(isinstance(arg, tuple) for arg in integration_args)
+    methods = [method for method in INTEGRATE_RACE_METHODS if not (definite and method == "risch")]
+    if definite and not integral.free_symbols:
+        methods.append("numeric")
+
+    started = time.perf_counter()
+    racers = {}
+    report: dict[str, dict[str, Any]] = {}
+    winner: Optional[tuple[str, Any]] = None
+    numeric = None
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 3)
+
+    try:
+        for method in methods:
+            connection, process = _start_child(context, _integrate_racer, expression, integration_args, method)
+            racers[connection] = (method, process)
+
+        # Timings and the budget count from when every racer runs, not from the forkserver start.
+        started = time.perf_counter()
+        deadline = None if budget_ms is None else started + budget_ms / 1000
+        while racers and winner is None:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            ready = multiprocessing.connection.wait(list(racers), remaining)
+            if not ready:
+                _report_op_meta(partial=True)
+                break
+            for connection in ready:
+                method, process = racers.pop(connection)
+                try:
+                    ok, value = connection.recv()
+                except EOFError:
+                    ok, value = False, "racer exited without a result"
+                _stop_child(connection, process)
+
+                entry = {"ms": elapsed_ms()}
+                if not ok:
+                    entry.update(status="failed", error=value)
+                elif method == "numeric":
+                    entry["status"] = "numeric"
+                    numeric = value
+                elif value.has(sp.Integral):
+                    entry["status"] = "no_closed_form"
+                else:
+                    entry["status"] = "closed_form"
+                    if winner is None:
+                        winner = (method, value)
+                report[method] = entry
+    finally:
+        for connection, (method, process) in racers.items():
+            _stop_child(connection, process)
+            report[method] = {"ms": elapsed_ms(), "status": "cancelled"}
+
+    if winner is None and numeric is not None:
+        winner = ("numeric", numeric)
+    _report_op_meta(
+        race={
+            "winner": winner[0] if winner is not None else None,
+            "methods": {method: report[method] for method in methods if method in report},
+        }
+    )
+    return winner[1] if winner is not None else integral
+
+
+def _op_integrate(data: str, params: dict[str, Any]) -> Any:
     expression = _parse_expression(data)
+    strategy = str(params.get("strategy", "default")).strip().lower()
+    if strategy not in INTEGRATE_STRATEGIES:
+        raise ValueError(f"integrate strategy must be one of: {', '.join(INTEGRATE_STRATEGIES)}")
+    budget_ms = params.get("budget_ms")
+    if budget_ms is not None:
+        if strategy != "race":
+            raise ValueError("integrate budget_ms only applies to strategy=race")
+        budget_ms = _parse_positive_int(budget_ms, "budget_ms")
+
     bounds = params.get("bounds")
     if bounds is not None:
         if not isinstance(bounds, list) or len(bounds) == 0:
@@ -804,52 +2201,151 @@ def _op_integrate(data: str, params: dict[str, Any]) -> str:
                 integration_args.append((symbol, _parse_point(lower), _parse_point(upper)))
             else:
                 integration_args.append(symbol)
+    else:
+        symbol = _symbol_from_params_or_default(params, expression.free_symbols)
+        if symbol is None:
+            raise ValueError("No variable found for integration")
 
-        result = sp.integrate(expression, *integration_args)
-        return _to_latex(result)
+        lower = params.get("lower")
+        upper = params.get("upper")
 
-    symbol = _symbol_from_params_or_default(params, expression.free_symbols)
-    if symbol is None:
-        raise ValueError("No variable found for integration")
+        has_lower = lower is not None
+        has_upper = upper is not None
 
-    lower = params.get("lower")
-    upper = params.get("upper")
+        if has_lower or has_upper:
+            if not (has_lower and has_upper):
+                raise ValueError("Definite integration requires both lower and upper bounds")
+            integration_args = [(symbol, _parse_point(lower), _parse_point(upper))]
+        else:
+            integration_args = [symbol]
 
-    has_lower = lower is not None
-    has_upper = upper is not None
+    if strategy == "race":
+        return _race_integrate(expression, integration_args, budget_ms)
+    return sp.integrate(expression, *integration_args)
 
-    if has_lower or has_upper:
-        if not (has_lower and has_upper):
-            raise ValueError("Definite integration requires both lower and upper bounds")
-        result = sp.integrate(expression, (symbol, _parse_point(lower), _parse_point(upper)))
-    else:
-        result = sp.integrate(expression, symbol)
 
-    return _to_latex(result)
+def _parse_nsolve_interval(value: Any) -> tuple[Any, Any]:
+    items = value if isinstance(value, list) else str(value).strip().strip("[]()").split(",")
+    if len(items) != 2:
+        raise ValueError("nsolve interval expects [a, b]")
+    lower, upper = (_parse_grid_number(item, "interval", real=True) for item in items)
+    if not lower < upper:
+        raise ValueError("nsolve interval expects a < b")
+    return lower, upper
 
 
-def _op_nsolve(data: str, params: dict[str, Any]) -> str:
+def _sample_on_grid(expression: Any, symbol: sp.Symbol, points: list[Any], ctx: Any, func: Callable) -> list[Any]:
+    # One vectorized NumPy call when available; mpmath point by point otherwise.
+    try:
+        numpy = _lazy_module("numpy")
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        vectorized = LAMBDIFY_REGISTRY.get(expression, (symbol,), "numpy")
+        with numpy.errstate(all="ignore"):
+            grid = numpy.array([float(point) for point in points])
+            values = numpy.broadcast_to(numpy.asarray(vectorized(grid)), grid.shape)
+        return [float(value) if numpy.isreal(value) else float("nan") for value in values]
+
+    values = []
+    for point in points:
+        try:
+            value = func(point)
+            values.append(float(value) if ctx.im(value) == 0 else float("nan"))
+        except (ZeroDivisionError, ValueError):
+            values.append(float("nan"))
+    return values
+
+
+def _nsolve_interval(expression: Any, symbol: sp.Symbol, lower: Any, upper: Any, starts: int) -> list[Any]:
+    """All real roots found in [lower, upper] from ``starts`` evenly spaced starting points.
+
+    A sign change between neighbouring points is refined with a bracketing solver.  Local minima
+    of ``|f|`` seed modified Newton, which finds roots of even multiplicity that never change sign.
+    """
+    ctx = mpmath.MPContext()
+    func = _bind_mpmath_context(LAMBDIFY_REGISTRY.get(expression, (symbol,), "mpmath"), ctx)
+    a, b = ctx.convert(lower.evalf(ctx.dps)), ctx.convert(upper.evalf(ctx.dps))
+    points = ctx.linspace(a, b, starts)
+    values = _sample_on_grid(expression, symbol, points, ctx, func)
+    magnitudes = [abs(value) if value == value else float("inf") for value in values]
+
+    attempts = []
+    for index, value in enumerate(values):
+        if value == 0:
+            attempts.append((points[index], None))
+            continue
+        if index + 1 < len(values) and value * values[index + 1] < 0:
+            attempts.append(((points[index], points[index + 1]), "anderson"))
+        left = magnitudes[index - 1] if index > 0 else float("inf")
+        right = magnitudes[index + 1] if index + 1 < len(values) else float("inf")
+        if magnitudes[index] < float("inf") and magnitudes[index] <= left and magnitudes[index] <= right:
+            attempts.append((points[index], "mnewton"))
+
+    tolerance = ctx.mpf(10) ** (5 - ctx.dps)
+    roots = []
+    for start, solver in attempts:
+        if solver is None:
+            roots.append(start)
+            continue
+        try:
+            root = ctx.findroot(func, start, solver=solver)
+        except (ZeroDivisionError, ValueError, TypeError):
+            continue
+        if abs(ctx.im(root)) > tolerance:
+            continue
+        root = ctx.re(root)
+        if a - tolerance <= root <= b + tolerance:
+            roots.append(root)
+
+    distinct = []
+    for root in sorted(roots):
+        if not distinct or abs(root - distinct[-1]) > tolerance * max(1, abs(root)):
+            distinct.append(root)
+    return [sp.Float(root) for root in distinct]
+
+
+def _op_nsolve(data: str, params: dict[str, Any]) -> Any:
     _, expression = _parse_equation_or_zero_expression(data)
 
     symbol = _parse_symbol(params.get("var"))
     if symbol is None:
-        raise ValueError("nsolve expects: nsolve <var> <guess> [guess2]")
+        raise ValueError("nsolve expects: nsolve <var> <guess> [guess2] | nsolve <var> interval=[a,b] [starts=N]")
+
+    if params.get("interval") is not None:
+        if "guess" in params or "guess2" in params:
+            raise ValueError("nsolve takes either a guess or an interval")
+        if expression.free_symbols != {symbol}:
+            raise ValueError("nsolve expects an expression in the one variable it solves for")
+        lower, upper = _parse_nsolve_interval(params.get("interval"))
+        starts = _parse_positive_int(params.get("starts", NSOLVE_DEFAULT_STARTS), "starts")
+        if not 2 <= starts <= NSOLVE_MAX_STARTS:
+            raise ValueError(f"starts must be between 2 and {NSOLVE_MAX_STARTS}")
+        poly = _univariate_polynomial(expression, symbol)
+        if poly is not None:
+            # Isolating the real roots exactly finds every one, however close together.
+            roots = dict.fromkeys(poly.real_roots())
+            return [sp.Float(root.evalf(NUMERICAL_DEFAULT_DIGITS)) for root in roots if lower <= root <= upper]
+        return _nsolve_interval(expression, symbol, lower, upper, starts)
 
     if "guess" not in params:
         raise ValueError("nsolve requires an initial guess")
     guess = _parse_point(params.get("guess"))
 
     guess2_value = params.get("guess2")
-    if guess2_value is not None:
-        guess2 = _parse_point(guess2_value)
-        result = sp.nsolve(expression, symbol, (guess, guess2))
-    else:
-        result = sp.nsolve(expression, symbol, guess)
+    starting = guess if guess2_value is None else (guess, _parse_point(guess2_value))
+    if expression.free_symbols != {symbol}:
+        raise ValueError("nsolve expects an expression in the one variable it solves for")
 
-    return _to_latex(result)
+    # Same findroot call as sp.nsolve, but the compiled callable comes from the shared registry
+    # (sp.nsolve lambdifies on every call) and runs in a private context at the default precision.
+    ctx = mpmath.MPContext()
+    func = _bind_mpmath_context(LAMBDIFY_REGISTRY.get(expression, (symbol,), "mpmath"), ctx)
+    result = sp.sympify(ctx.findroot(func, starting))
+    return result
 
 
-def _op_dsolve(data: str, params: dict[str, Any]) -> str:
+def _op_dsolve(data: str, params: dict[str, Any]) -> Any:
     equation, _ = _parse_equation_or_zero_expression_with_fallback(data)
     func = _parse_function_target(params.get("func"))
 
@@ -858,10 +2354,10 @@ def _op_dsolve(data: str, params: dict[str, Any]) -> str:
     else:
         result = sp.dsolve(equation, func=func)
 
-    return _to_latex(result)
+    return result
 
 
-def _op_solve_system(data: str, params: dict[str, Any]) -> str:
+def _op_solve_system(data: str, params: dict[str, Any]) -> Any:
     if len(_split_equation_inputs(data)) == 0:
         raise ValueError("solve_system requires at least one equation")
     equations, _, all_symbols = _parse_equation_system(data)
@@ -873,10 +2369,10 @@ def _op_solve_system(data: str, params: dict[str, Any]) -> str:
         raise ValueError("solve_system could not infer variables; pass explicit vars")
 
     result = sp.solve(equations, symbols, dict=True)
-    return _to_latex(result)
+    return result
 
 
-def _op_limit(data: str, params: dict[str, Any]) -> str:
+def _op_limit(data: str, params: dict[str, Any]) -> Any:
     expression = _parse_expression(data)
 
     symbol = _parse_symbol(params.get("var"))
@@ -892,10 +2388,10 @@ def _op_limit(data: str, params: dict[str, Any]) -> str:
         raise ValueError("limit direction must be one of '+', '-', '+-'")
 
     result = sp.limit(expression, symbol, _parse_point(point_value), dir=direction)
-    return _to_latex(result)
+    return result
 
 
-def _op_series(data: str, params: dict[str, Any]) -> str:
+def _op_series(data: str, params: dict[str, Any]) -> Any:
     expression = _parse_expression(data)
 
     symbol = _parse_symbol(params.get("var"))
@@ -913,70 +2409,87 @@ def _op_series(data: str, params: dict[str, Any]) -> str:
     result = sp.series(expression, symbol, _parse_point(point_value), order)
     if hasattr(result, "removeO"):
         result = result.removeO()
-    return _to_latex(result)
+    return result
 
 
-def _op_det(data: str, _: dict[str, Any]) -> str:
+def _op_det(data: str, _: dict[str, Any]) -> Any:
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.det())
+    domain_matrix = _rational_domain_matrix(matrix, square=True)
+    if domain_matrix is not None:
+        return domain_matrix.domain.to_sympy(domain_matrix.det())
+    return matrix.det()
 
 
-def _op_inv(data: str, _: dict[str, Any]) -> str:
+def _op_inv(data: str, _: dict[str, Any]) -> Any:
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.inv())
+    return matrix.inv()
 
 
-def _op_transpose(data: str, _: dict[str, Any]) -> str:
+def _op_transpose(data: str, _: dict[str, Any]) -> Any:
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.T)
+    return matrix.T
 
 
-def _op_rank(data: str, _: dict[str, Any]) -> str:
+def _op_rank(data: str, _: dict[str, Any]) -> Any:
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.rank())
+    domain_matrix = _rational_domain_matrix(matrix)
+    if domain_matrix is not None:
+        return domain_matrix.rank()
+    return matrix.rank()
 
 
-def _op_eigenvals(data: str, _: dict[str, Any]) -> str:
+def _op_eigenvals(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "eigenvals", {"numeric", "prec"})
     matrix = _as_matrix(_parse_expression(data))
+    numeric, digits = _numeric_linalg_mode("eigenvals", matrix, params)
+    if numeric and matrix.is_square and matrix.rows:
+        groups = _numeric_eigen_groups(_NumericLinalg(matrix, digits), vectors=False)
+        return {value: count for value, count, _ in groups}
     eigen_map = matrix.eigenvals()
-    return _to_latex(eigen_map)
+    return eigen_map
 
 
-def _op_eigenvects(data: str, params: dict[str, Any]) -> str:
-    _ensure_allowed_params(params, "eigenvects", set())
+def _op_eigenvects(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "eigenvects", {"numeric", "prec"})
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.eigenvects())
+    numeric, digits = _numeric_linalg_mode("eigenvects", matrix, params)
+    if numeric and matrix.is_square and matrix.rows:
+        return _numeric_eigen_groups(_NumericLinalg(matrix, digits), vectors=True)
+    return matrix.eigenvects()
 
 
-def _op_nullspace(data: str, params: dict[str, Any]) -> str:
+def _op_nullspace(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "nullspace", set())
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.nullspace())
+    return matrix.nullspace()
 
 
-def _op_charpoly(data: str, params: dict[str, Any]) -> str:
+def _op_charpoly(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "charpoly", {"var"})
     matrix = _as_matrix(_parse_expression(data))
     symbol = _parse_symbol_param(params.get("var"), "var")
     if symbol is None:
         symbol = sp.Symbol("lambda")
 
-    return _to_latex(matrix.charpoly(symbol).as_expr())
+    return matrix.charpoly(symbol).as_expr()
 
 
-def _op_lu(data: str, params: dict[str, Any]) -> str:
+def _op_lu(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "lu", set())
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.LUdecomposition())
+    return matrix.LUdecomposition()
 
 
-def _op_qr(data: str, params: dict[str, Any]) -> str:
-    _ensure_allowed_params(params, "qr", set())
+def _op_qr(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "qr", {"numeric", "prec"})
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.QRdecomposition())
+    numeric, digits = _numeric_linalg_mode("qr", matrix, params)
+    if numeric and matrix.rows and matrix.cols:
+        return _NumericLinalg(matrix, digits).qr()
+    return matrix.QRdecomposition()
 
 
-def _op_mat_solve(data: str, params: dict[str, Any]) -> str:
+def _op_mat_solve(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "mat_solve", set())
     matrix = _as_matrix(_parse_expression(data))
     if matrix.cols < 2:
@@ -987,39 +2500,43 @@ def _op_mat_solve(data: str, params: dict[str, Any]) -> str:
     if coefficients.rows == 0 or coefficients.cols == 0:
         raise ValueError("mat_solve expects a non-empty augmented matrix [A|b]")
 
+    domain_matrix = _rational_domain_matrix(matrix)
     try:
-        solution, free_params = coefficients.gauss_jordan_solve(rhs)
+        if domain_matrix is not None:
+            solution, free_params = _domain_matrix_gauss_jordan_solve(domain_matrix)
+        else:
+            solution, free_params = coefficients.gauss_jordan_solve(rhs)
     except Exception as exc:
         raise ValueError(f"mat_solve failed: {exc}") from exc
 
     if getattr(free_params, "rows", 0) > 0:
-        return _to_latex({ "solution": solution, "params": free_params })
-    return _to_latex(solution)
+        return { "solution": solution, "params": free_params }
+    return solution
 
 
-def _op_isprime(data: str, params: dict[str, Any]) -> str:
+def _op_isprime(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "isprime", set())
     number = _parse_integer_expression(data, "isprime")
     return str(bool(sp.isprime(number)))
 
 
-def _op_factorint(data: str, params: dict[str, Any]) -> str:
+def _op_factorint(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "factorint", set())
     number = _parse_integer_expression(data, "factorint")
-    return _to_latex(sp.factorint(number))
+    return sp.factorint(number)
 
 
-def _op_primerange(_: str, params: dict[str, Any]) -> str:
+def _op_primerange(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "primerange", {"start", "stop"})
     if "start" not in params or "stop" not in params:
         raise ValueError("primerange expects: <start> <stop>")
 
     start = _parse_int_value(params.get("start"), "start")
     stop = _parse_int_value(params.get("stop"), "stop")
-    return _to_latex(list(sp.primerange(start, stop)))
+    return list(sp.primerange(start, stop))
 
 
-def _op_perm_group(data: str, params: dict[str, Any]) -> str:
+def _op_perm_group(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "perm_group", {"action", "point"})
     action = str(params.get("action", "")).strip().lower()
     if action not in PERM_GROUP_ACTIONS:
@@ -1029,11 +2546,11 @@ def _op_perm_group(data: str, params: dict[str, Any]) -> str:
     group = PermutationGroup(*generators)
 
     if action == "order":
-        return _to_latex(group.order())
+        return group.order()
     if action == "orbits":
         orbits = [sorted(int(item) for item in orbit) for orbit in group.orbits()]
         orbits.sort(key=lambda orbit: (len(orbit), orbit))
-        return _to_latex(orbits)
+        return orbits
     if action == "is_transitive":
         return str(bool(group.is_transitive()))
 
@@ -1043,13 +2560,13 @@ def _op_perm_group(data: str, params: dict[str, Any]) -> str:
     if point < 0:
         raise ValueError("point must be non-negative")
     stabilizer = group.stabilizer(point)
-    return _to_latex({
+    return {
         "order": stabilizer.order(),
         "generators": [list(gen.array_form) for gen in stabilizer.generators],
-    })
+    }
 
 
-def _op_prufer(data: str, params: dict[str, Any]) -> str:
+def _op_prufer(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "prufer", {"action", "n"})
     action = str(params.get("action", "")).strip().lower()
     if action not in PRUFER_ACTIONS:
@@ -1060,15 +2577,15 @@ def _op_prufer(data: str, params: dict[str, Any]) -> str:
             raise ValueError("prufer encode expects: encode <n>")
         n_value = _parse_positive_int(params.get("n"), "n")
         edges = _parse_prufer_edges(data)
-        return _to_latex(Prufer.to_prufer(edges, n_value))
+        return Prufer.to_prufer(edges, n_value)
 
     if "n" in params and params.get("n") is not None:
         raise ValueError("prufer decode does not accept n")
     code = _parse_prufer_code(data)
-    return _to_latex(Prufer.to_tree(code))
+    return Prufer.to_tree(code)
 
 
-def _op_gray(_: str, params: dict[str, Any]) -> str:
+def _op_gray(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "gray", {"action", "value"})
     action = str(params.get("action", "")).strip().lower()
     if action not in GRAY_ACTIONS:
@@ -1087,7 +2604,7 @@ def _op_gray(_: str, params: dict[str, Any]) -> str:
     return str(gray_to_bin(token))
 
 
-def _op_div(data: str, params: dict[str, Any]) -> str:
+def _op_div(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "div", {"var"})
     left, right = _parse_two_expressions(data, "div")
     symbol = _parse_symbol_param(params.get("var"), "var")
@@ -1100,10 +2617,10 @@ def _op_div(data: str, params: dict[str, Any]) -> str:
         quotient, remainder = sp.div(left, right)
     else:
         quotient, remainder = sp.div(left, right, symbol)
-    return _to_latex({"quotient": quotient, "remainder": remainder})
+    return {"quotient": quotient, "remainder": remainder}
 
 
-def _op_gcd(data: str, params: dict[str, Any]) -> str:
+def _op_gcd(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "gcd", {"var"})
     left, right = _parse_two_expressions(data, "gcd")
     symbol = _parse_symbol_param(params.get("var"), "var")
@@ -1111,10 +2628,10 @@ def _op_gcd(data: str, params: dict[str, Any]) -> str:
         result = sp.gcd(left, right)
     else:
         result = sp.gcd(left, right, symbol)
-    return _to_latex(result)
+    return result
 
 
-def _op_sqf(data: str, params: dict[str, Any]) -> str:
+def _op_sqf(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "sqf", {"var"})
     expression = _parse_expression(data)
     symbol = _parse_symbol_param(params.get("var"), "var")
@@ -1122,10 +2639,10 @@ def _op_sqf(data: str, params: dict[str, Any]) -> str:
         result = sp.sqf(expression)
     else:
         result = sp.sqf(expression, symbol)
-    return _to_latex(result)
+    return result
 
 
-def _op_groebner(data: str, params: dict[str, Any]) -> str:
+def _op_groebner(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "groebner", {"vars", "order"})
     variables = _parse_symbol_list(params.get("vars"), "vars")
     if len(variables) == 0:
@@ -1139,17 +2656,17 @@ def _op_groebner(data: str, params: dict[str, Any]) -> str:
 
     polynomials = _parse_expression_list(data, "groebner")
     basis = sp.groebner(polynomials, *variables, order=order)
-    return _to_latex(list(basis.polys))
+    return list(basis.polys)
 
 
-def _op_resultant(data: str, params: dict[str, Any]) -> str:
+def _op_resultant(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "resultant", {"var"})
     symbol = _parse_required_symbol_param(params, "var", "resultant")
     left, right = _parse_two_expressions(data, "resultant")
-    return _to_latex(sp.resultant(left, right, symbol))
+    return sp.resultant(left, right, symbol)
 
 
-def _op_summation(data: str, params: dict[str, Any]) -> str:
+def _op_summation(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "summation", {"var", "lower", "upper"})
     expression = _parse_expression(data)
     symbol = _parse_required_symbol_param(params, "var", "summation")
@@ -1157,10 +2674,10 @@ def _op_summation(data: str, params: dict[str, Any]) -> str:
         raise ValueError("summation expects: <var> <lower> <upper>")
     lower = _parse_point(params.get("lower"))
     upper = _parse_point(params.get("upper"))
-    return _to_latex(sp.summation(expression, (symbol, lower, upper)))
+    return sp.summation(expression, (symbol, lower, upper))
 
 
-def _op_product(data: str, params: dict[str, Any]) -> str:
+def _op_product(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "product", {"var", "lower", "upper"})
     expression = _parse_expression(data)
     symbol = _parse_required_symbol_param(params, "var", "product")
@@ -1168,47 +2685,47 @@ def _op_product(data: str, params: dict[str, Any]) -> str:
         raise ValueError("product expects: <var> <lower> <upper>")
     lower = _parse_point(params.get("lower"))
     upper = _parse_point(params.get("upper"))
-    return _to_latex(sp.product(expression, (symbol, lower, upper)))
+    return sp.product(expression, (symbol, lower, upper))
 
 
-def _op_binomial(_: str, params: dict[str, Any]) -> str:
+def _op_binomial(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "binomial", {"n", "k"})
     if "n" not in params or "k" not in params:
         raise ValueError("binomial expects: <n> <k>")
     n = _parse_int_value(params.get("n"), "n")
     k = _parse_int_value(params.get("k"), "k")
-    return _to_latex(sp.binomial(n, k))
+    return sp.binomial(n, k)
 
 
-def _op_perm(_: str, params: dict[str, Any]) -> str:
+def _op_perm(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "perm", {"n", "k"})
     if "n" not in params:
         raise ValueError("perm expects: <n> [k]")
     n = _parse_int_value(params.get("n"), "n")
     if "k" in params and params.get("k") is not None:
         k = _parse_int_value(params.get("k"), "k")
-        return _to_latex(nP(n, k))
-    return _to_latex(sp.factorial(n))
+        return nP(n, k)
+    return sp.factorial(n)
 
 
-def _op_comb(_: str, params: dict[str, Any]) -> str:
+def _op_comb(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "comb", {"n", "k"})
     if "n" not in params or "k" not in params:
         raise ValueError("comb expects: <n> <k>")
     n = _parse_int_value(params.get("n"), "n")
     k = _parse_int_value(params.get("k"), "k")
-    return _to_latex(nC(n, k))
+    return nC(n, k)
 
 
-def _op_partition(_: str, params: dict[str, Any]) -> str:
+def _op_partition(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "partition", {"n"})
     if "n" not in params:
         raise ValueError("partition expects: <n>")
     n = _parse_int_value(params.get("n"), "n")
-    return _to_latex(sp.partition(n))
+    return sp.partition(n)
 
 
-def _op_subsets(data: str, params: dict[str, Any]) -> str:
+def _op_subsets(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "subsets", {"k"})
     k = params.get("k")
     if k is not None:
@@ -1216,29 +2733,29 @@ def _op_subsets(data: str, params: dict[str, Any]) -> str:
         if k < 0:
             raise ValueError("subsets expects non-negative k")
     values = _parse_collection_items(data)
-    return _to_latex(list(iter_subsets(values, k=k)))
+    return list(iter_subsets(values, k=k))
 
 
-def _op_totient(data: str, params: dict[str, Any]) -> str:
+def _op_totient(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "totient", set())
     value = _parse_integer_expression(data, "totient")
-    return _to_latex(sp.totient(value))
+    return sp.totient(value)
 
 
-def _op_mobius(data: str, params: dict[str, Any]) -> str:
+def _op_mobius(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "mobius", set())
     value = _parse_integer_expression(data, "mobius")
-    return _to_latex(sp.mobius(value))
+    return sp.mobius(value)
 
 
-def _op_divisors(data: str, params: dict[str, Any]) -> str:
+def _op_divisors(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "divisors", {"proper"})
     value = _parse_integer_expression(data, "divisors")
     proper = _parse_bool_value(params.get("proper", False), "proper")
-    return _to_latex(sp.divisors(value, proper=proper))
+    return sp.divisors(value, proper=proper)
 
 
-def _op_logic_simplify(data: str, params: dict[str, Any]) -> str:
+def _op_logic_simplify(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "logic_simplify", {"form"})
     form = str(params.get("form", "simplify")).strip().lower()
     if form not in LOGIC_FORMS:
@@ -1246,77 +2763,87 @@ def _op_logic_simplify(data: str, params: dict[str, Any]) -> str:
 
     expression = _sympify_with_locals(data)
     if form == "cnf":
-        return _to_latex(sp.to_cnf(expression, simplify=True))
+        return sp.to_cnf(expression, simplify=True)
     if form == "dnf":
-        return _to_latex(sp.to_dnf(expression, simplify=True))
-    return _to_latex(sp.simplify_logic(expression))
+        return sp.to_dnf(expression, simplify=True)
+    return sp.simplify_logic(expression)
 
 
-def _op_sat(data: str, params: dict[str, Any]) -> str:
+def _op_sat(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "sat", set())
     expression = _sympify_with_locals(data)
-    return _to_latex(sp.satisfiable(expression, all_models=False))
+    return sp.satisfiable(expression, all_models=False)
 
 
-def _op_jordan(data: str, params: dict[str, Any]) -> str:
+def _op_jordan(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "jordan", set())
     matrix = _as_matrix(_parse_expression(data))
     p_matrix, j_matrix = matrix.jordan_form()
-    return _to_latex({"P": p_matrix, "J": j_matrix})
+    return {"P": p_matrix, "J": j_matrix}
 
 
-def _op_svd(data: str, params: dict[str, Any]) -> str:
-    _ensure_allowed_params(params, "svd", set())
+def _op_svd(data: str, params: dict[str, Any]) -> Any:
+    _ensure_allowed_params(params, "svd", {"numeric", "prec"})
     matrix = _as_matrix(_parse_expression(data))
-    u_matrix, s_matrix, v_matrix = matrix.singular_value_decomposition()
-    return _to_latex({"U": u_matrix, "S": s_matrix, "V": v_matrix})
+    numeric, digits = _numeric_linalg_mode("svd", matrix, params)
+    if numeric and matrix.rows and matrix.cols:
+        u_matrix, s_matrix, v_matrix = _NumericLinalg(matrix, digits).svd()
+    else:
+        u_matrix, s_matrix, v_matrix = matrix.singular_value_decomposition()
+    return {"U": u_matrix, "S": s_matrix, "V": v_matrix}
 
 
-def _op_cholesky(data: str, params: dict[str, Any]) -> str:
+def _op_cholesky(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "cholesky", set())
     matrix = _as_matrix(_parse_expression(data))
-    return _to_latex(matrix.cholesky())
+    return matrix.cholesky()
 
 
-def _op_symbol(_: str, params: dict[str, Any]) -> str:
+def _op_symbol(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "symbol", {"name", "assumptions"})
     name = str(params.get("name", "")).strip()
     if name == "":
         raise ValueError("symbol expects: <name> [assumption=bool ...]")
     assumptions = _parse_symbol_assumptions(params)
     symbol = sp.Symbol(name, **assumptions)
-    REGISTERED_SYMBOLS[name] = symbol
-    REGISTERED_SYMBOL_ASSUMPTIONS[name] = assumptions
-    return _to_latex({"name": name, "assumptions": assumptions})
+    with STATE_LOCK:
+        REGISTERED_SYMBOLS[name] = symbol
+        REGISTERED_SYMBOL_ASSUMPTIONS[name] = assumptions
+        _bump_state_version()
+    return {"name": name, "assumptions": assumptions}
 
 
-def _op_symbols(_: str, params: dict[str, Any]) -> str:
+def _op_symbols(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "symbols", set())
-    return _to_latex(REGISTERED_SYMBOL_ASSUMPTIONS)
+    with STATE_LOCK:
+        assumptions = dict(REGISTERED_SYMBOL_ASSUMPTIONS)
+    return assumptions
 
 
-def _op_symbols_reset(_: str, params: dict[str, Any]) -> str:
+def _op_symbols_reset(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "symbols_reset", set())
-    REGISTERED_SYMBOLS.clear()
-    REGISTERED_SYMBOL_ASSUMPTIONS.clear()
-    return _to_latex({"success": True})
+    with STATE_LOCK:
+        REGISTERED_SYMBOLS.clear()
+        REGISTERED_SYMBOL_ASSUMPTIONS.clear()
+        _bump_state_version()
+    return {"success": True}
 
 
-def _op_geometry(data: str, params: dict[str, Any]) -> str:
+def _op_geometry(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "geometry", set())
     entities = _parse_geometry_entities(data, "geometry")
     if len(entities) == 1:
-        return _to_latex(entities[0])
-    return _to_latex(entities)
+        return entities[0]
+    return entities
 
 
-def _op_intersect(data: str, params: dict[str, Any]) -> str:
+def _op_intersect(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "intersect", set())
     left, right = _parse_geometry_entities(data, "intersect", exact_count=2)
-    return _to_latex(intersection(left, right))
+    return intersection(left, right)
 
 
-def _op_tangent(data: str, params: dict[str, Any]) -> str:
+def _op_tangent(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "tangent", set())
     left, right = _parse_geometry_entities(data, "tangent", exact_count=2)
     if hasattr(left, "is_tangent"):
@@ -1326,7 +2853,7 @@ def _op_tangent(data: str, params: dict[str, Any]) -> str:
     raise ValueError("tangent is not supported for the provided geometry objects")
 
 
-def _op_similar(data: str, params: dict[str, Any]) -> str:
+def _op_similar(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "similar", set())
     left, right = _parse_geometry_entities(data, "similar", exact_count=2)
     if hasattr(left, "is_similar"):
@@ -1351,21 +2878,22 @@ def _parse_optics_options(params: dict[str, Any]) -> dict[str, Any]:
     return parsed
 
 
-def _op_units(data: str, params: dict[str, Any]) -> str:
+def _op_units(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "units", {"action", "target"})
     action = str(params.get("action", "")).strip().lower()
     expression = _parse_units_expression(data)
     if action == "simplify":
-        return _to_latex(units_util.quantity_simplify(expression))
+        return _lazy_module("sympy.physics.units.util").quantity_simplify(expression)
     if action == "convert":
         target = params.get("target")
         if target is None:
             raise ValueError("units convert expects target units")
-        return _to_latex(sp_units.convert_to(expression, _parse_units_expression(str(target))))
+        units = _lazy_module("sympy.physics.units")
+        return units.convert_to(expression, _parse_units_expression(str(target)))
     raise ValueError("units expects action: simplify|convert")
 
 
-def _op_mechanics(data: str, params: dict[str, Any]) -> str:
+def _op_mechanics(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "mechanics", {"action", "qs"})
     action = str(params.get("action", "")).strip().lower()
     if action != "euler_lagrange":
@@ -1376,92 +2904,98 @@ def _op_mechanics(data: str, params: dict[str, Any]) -> str:
 
     lagrangian = _parse_expression_with_fallback(data)
     funcs = [_parse_expression_with_fallback(str(item)) for item in qs]
-    return _to_latex(sp.euler_equations(lagrangian, tuple(funcs)))
+    return sp.euler_equations(lagrangian, tuple(funcs))
 
 
-def _op_quantum(data: str, params: dict[str, Any]) -> str:
+def _op_quantum(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "quantum", {"action", "expr2"})
     action = str(params.get("action", "")).strip().lower()
     expression = _parse_expression_with_fallback(data)
+    quantum = _lazy_module("sympy.physics.quantum")
     if action == "dagger":
-        return _to_latex(sp_quantum.Dagger(expression))
+        return quantum.Dagger(expression)
     if action == "commutator":
         expr2 = params.get("expr2")
         if expr2 is None:
             raise ValueError("quantum commutator expects expr2")
         right = _parse_expression_with_fallback(str(expr2))
-        return _to_latex(sp_quantum.Commutator(expression, right).doit())
+        return quantum.Commutator(expression, right).doit()
     raise ValueError("quantum expects action: dagger|commutator")
 
 
-def _op_optics(_: str, params: dict[str, Any]) -> str:
+def _op_optics(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "optics", {"action", "options", "incident", "n1", "n2"})
     action = str(params.get("action", "")).strip().lower()
+    optics = _lazy_module("sympy.physics.optics")
     if action == "lens":
-        return _to_latex(sp_optics.lens_formula(**_parse_optics_options(params)))
+        return optics.lens_formula(**_parse_optics_options(params))
     if action == "mirror":
-        return _to_latex(sp_optics.mirror_formula(**_parse_optics_options(params)))
+        return optics.mirror_formula(**_parse_optics_options(params))
     if action == "refraction":
         if params.get("incident") is None or params.get("n1") is None or params.get("n2") is None:
             raise ValueError("optics refraction expects incident, n1, n2")
         incident = _parse_expression_with_fallback(str(params.get("incident")))
         n1 = _parse_expression_with_fallback(str(params.get("n1")))
         n2 = _parse_expression_with_fallback(str(params.get("n2")))
-        return _to_latex(sp_optics.refraction_angle(incident, n1, n2))
+        return optics.refraction_angle(incident, n1, n2)
     raise ValueError("optics expects action: lens|mirror|refraction")
 
 
-def _op_pauli(data: str, params: dict[str, Any]) -> str:
+def _op_pauli(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "pauli", {"action"})
     action = str(params.get("action", "")).strip().lower()
     if action != "simplify":
         raise ValueError("pauli expects action: simplify")
     expression = _sympify_with_locals(data)
-    return _to_latex(sp_pauli.evaluate_pauli_product(expression))
+    paulialgebra = _lazy_module("sympy.physics.paulialgebra")
+    return paulialgebra.evaluate_pauli_product(expression)
 
 
-def _op_dist(_: str, params: dict[str, Any]) -> str:
+def _op_dist(_: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "dist", {"kind", "name", "args"})
     kind, name, parsed_args = _parse_distribution_args(params)
+    stats = _lazy_module("sympy.stats")
 
     constructors: dict[str, tuple[int, Callable[..., Any]]] = {
-        "normal": (2, sp_stats.Normal),
-        "uniform": (2, sp_stats.Uniform),
-        "bernoulli": (1, sp_stats.Bernoulli),
-        "binomial": (2, sp_stats.Binomial),
-        "hypergeometric": (3, sp_stats.Hypergeometric),
+        "normal": (2, stats.Normal),
+        "uniform": (2, stats.Uniform),
+        "bernoulli": (1, stats.Bernoulli),
+        "binomial": (2, stats.Binomial),
+        "hypergeometric": (3, stats.Hypergeometric),
     }
     expected_arity, constructor = constructors[kind]
     if len(parsed_args) != expected_arity:
         raise ValueError(f"dist {kind} expects {expected_arity} parameter(s)")
 
     random_var = constructor(name, *parsed_args)
-    REGISTERED_RANDOM_VARIABLES[name] = random_var
-    return _to_latex({"name": name, "kind": kind, "rv": random_var})
+    with STATE_LOCK:
+        REGISTERED_RANDOM_VARIABLES[name] = random_var
+        _bump_state_version()
+    return {"name": name, "kind": kind, "rv": random_var}
 
 
-def _op_p(data: str, params: dict[str, Any]) -> str:
+def _op_p(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "p", set())
     expression = _parse_expression_with_fallback(data)
-    return _to_latex(sp_stats.P(expression))
+    return _lazy_module("sympy.stats").P(expression)
 
 
-def _op_e(data: str, params: dict[str, Any]) -> str:
+def _op_e(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "e", set())
     expression = _parse_expression_with_fallback(data)
-    return _to_latex(sp_stats.E(expression))
+    return _lazy_module("sympy.stats").E(expression)
 
 
-def _op_var(data: str, params: dict[str, Any]) -> str:
+def _op_var(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "var", set())
     expression = _parse_expression_with_fallback(data)
-    return _to_latex(sp_stats.variance(expression))
+    return _lazy_module("sympy.stats").variance(expression)
 
 
-def _op_density(data: str, params: dict[str, Any]) -> str:
+def _op_density(data: str, params: dict[str, Any]) -> Any:
     _ensure_allowed_params(params, "density", set())
     expression = _parse_expression_with_fallback(data)
-    return _to_latex(sp_stats.density(expression))
+    return _lazy_module("sympy.stats").density(expression)
 
 
 OP_HANDLERS = {
@@ -1508,6 +3042,7 @@ OP_HANDLERS = {
     "powsimp": _op_powsimp,
     "apart": _op_apart,
     "subs": _op_subs,
+    "eval_grid": _op_eval_grid,
     "solveset": _op_solveset,
     "linsolve": _op_linsolve,
     "nonlinsolve": _op_nonlinsolve,
@@ -1541,15 +3076,734 @@ OP_HANDLERS = {
 }
 
 
-def _dispatch_operation(data: str, op_name: str, params: dict[str, Any]) -> str:
+# What each op accepts from the previous pipeline stage: "expression" or "equation" (one SymPy
+# expression, matrix, or equation), "expressions" or "equations" (one, or a list of them),
+# "collection" (a list, set, or matrix), or "none" (the op reads its selection as text, or
+# ignores it, so it cannot follow another stage).
+OP_STAGE_INPUTS = {
+    **dict.fromkeys(
+        (
+            "sqf", "summation", "product", "totient", "mobius", "divisors", "logic_simplify", "sat",
+            "jordan", "svd", "cholesky", "units", "mechanics", "quantum", "pauli", "p", "e", "var",
+            "density", "simplify", "trigsimp", "ratsimp", "powsimp", "apart", "subs", "eval_grid",
+            "diff", "integrate", "limit", "series", "det", "inv", "transpose", "rank", "eigenvals",
+            "eigenvects", "nullspace", "charpoly", "lu", "qr", "mat_solve", "isprime", "factorint",
+        ),
+        "expression",
+    ),
+    **dict.fromkeys(("solveset", "rsolve", "solve", "nsolve", "dsolve"), "equation"),
+    **dict.fromkeys(("linsolve", "nonlinsolve", "diophantine", "solve_system"), "equations"),
+    **dict.fromkeys(("div", "gcd", "groebner", "resultant", "geometry", "intersect", "tangent", "similar"), "expressions"),
+    "subsets": "collection",
+    **dict.fromkeys(
+        (
+            "binomial", "perm", "comb", "partition", "symbol", "symbols", "symbols_reset", "optics",
+            "dist", "primerange", "perm_group", "prufer", "gray",
+        ),
+        "none",
+    ),
+}
+
+
+def _describe_stage_value(value: Any) -> str:
+    if isinstance(value, (list, tuple, sp.Tuple)):
+        return "a list"
+    if isinstance(value, dict):
+        return "a mapping"
+    if isinstance(value, (set, frozenset, sp.Set)):
+        return "a set"
+    if isinstance(value, bool):
+        return "a truth value"
+    return f"a {type(value).__name__}"
+
+
+def _is_stage_expression(value: Any) -> bool:
+    return isinstance(value, MatrixBase) or (
+        isinstance(value, sp.Basic) and not isinstance(value, (sp.Set, sp.Tuple))
+    )
+
+
+def _stage_input(op_key: str, value: Any) -> Any:
+    """Check the previous pipeline stage's result against what ``op_key`` accepts."""
+    kind = OP_STAGE_INPUTS[op_key]
+    if kind == "none":
+        raise ValueError(f"{op_key} does not take the result of an earlier stage")
+    if kind in ("expression", "equation"):
+        if _is_stage_expression(value):
+            return value
+        raise ValueError(f"{op_key} expects one {kind}, got {_describe_stage_value(value)}")
+    if kind in ("expressions", "equations"):
+        items = list(value) if isinstance(value, (list, tuple, sp.Tuple)) else [value]
+        if items and all(_is_stage_expression(item) for item in items):
+            return items if len(items) > 1 else items[0]
+        raise ValueError(f"{op_key} expects {kind}, got {_describe_stage_value(value)}")
+    if isinstance(value, (list, tuple, set, frozenset, sp.Set, MatrixBase)):
+        return value
+    raise ValueError(f"{op_key} expects a list or set, got {_describe_stage_value(value)}")
+
+
+def _render_operation_result(value: Any) -> str:
+    # Handlers return SymPy objects; a few (truth values, bit strings) return finished text.
+    if isinstance(value, str):
+        return value
+    return _to_latex(value)
+
+
+def _compute_operation(data: Any, op_name: str, params: dict[str, Any]) -> Any:
     op_key = str(op_name).strip().lower()
     if op_key == "":
         raise ValueError("Missing op")
     if op_key not in OP_HANDLERS:
         raise ValueError(f"Unsupported op: {op_key}")
 
-    handler = OP_HANDLERS[op_key]
-    return handler(data, params)
+    if not isinstance(data, str):
+        data = _stage_input(op_key, data)
+    return OP_HANDLERS[op_key](data, params)
+
+
+def _dispatch_operation(data: str, op_name: str, params: dict[str, Any]) -> str:
+    return _render_operation_result(_compute_operation(data, op_name, params))
+
+
+def _parse_pipeline_stages(value: Any) -> list[tuple[str, dict[str, Any]]]:
+    if not isinstance(value, list) or len(value) == 0:
+        raise ValueError("'pipeline' must be a non-empty array")
+
+    stages: list[tuple[str, dict[str, Any]]] = []
+    for index, stage in enumerate(value, start=1):
+        if not isinstance(stage, dict):
+            raise ValueError(f"Pipeline stage {index} must be an object")
+        fields, fields_err = _parse_operation_fields({**stage, "data": None})
+        if fields_err:
+            raise ValueError(f"Pipeline stage {index}: {fields_err}")
+        _, op_name, params = fields
+        op_key = op_name.strip().lower()
+        if op_key in STATE_OPS:
+            raise ValueError(f"Pipeline stage {index}: '{op_key}' changes session state and cannot run in a pipeline")
+        if index > 1 and OP_STAGE_INPUTS.get(op_key) == "none":
+            raise ValueError(f"Pipeline stage {index}: '{op_key}' does not take the result of an earlier stage")
+        stages.append((op_key, params))
+    return stages
+
+
+def _run_pipeline(data: str, stages: list[tuple[str, dict[str, Any]]]) -> tuple[str, dict[str, Any]]:
+    # Intermediate results stay SymPy objects; only the last one is rendered to LaTeX.
+    value: Any = data
+    timings: list[dict[str, Any]] = []
+    for index, (op_name, params) in enumerate(stages, start=1):
+        started = time.perf_counter()
+        try:
+            value = _compute_operation(value, op_name, params)
+        except Exception as exc:
+            raise ValueError(f"Pipeline stage {index} ({op_name}): {exc}") from exc
+        timings.append({"op": op_name, "ms": round((time.perf_counter() - started) * 1000, 3)})
+
+    started = time.perf_counter()
+    rendered = _render_operation_result(value)
+    render_ms = round((time.perf_counter() - started) * 1000, 3)
+    return rendered, {"stages": timings, "render_ms": render_ms}
+
+
+# Ops that edit the session registries stay in the server process, which owns session state.
+STATE_OPS = {"symbol", "symbols", "symbols_reset", "dist"}
+# Work a worker process may be asked to run, by name.
+WORKER_TASKS: dict[str, Callable[..., Any]] = {
+    "op": _dispatch_operation,
+    "pipeline": _run_pipeline,
+}
+_WORKER_READY = "ready"
+
+
+def _operation_worker_main(connection):
+    connection.send(_WORKER_READY)
+    while True:
+        try:
+            state, task, args = connection.recv()
+        except (EOFError, OSError):
+            return
+        if state is not None:
+            _import_session_state(state)
+        _REQUEST_LOCAL.frac_type = None
+        _REQUEST_LOCAL.op_meta = None
+        version = STATE_VERSION
+        before = _parser_state_snapshot()
+        try:
+            reply = (True, WORKER_TASKS[task](*args))
+        except Exception as exc:
+            reply = (False, str(exc))
+        state_delta = _parser_state_delta(before) if STATE_VERSION != version else None
+        connection.send(reply + (state_delta, _REQUEST_LOCAL.op_meta))
+
+
+class _OperationWorker:
+    def __init__(self, context: Any):
+        self.connection, child_connection = context.Pipe()
+        # Not daemonic: budgeted simplify and integrate races start helper processes from the
+        # worker, which daemonic processes may not.  The pool stops and reaps every worker itself.
+        self.process = context.Process(target=_operation_worker_main, args=(child_connection,), daemon=False)
+        self.process.start()
+        child_connection.close()
+        self.ready = False
+        self.state_version: Optional[int] = None
+
+    def wait_until_ready(self):
+        # A freshly spawned worker is still importing sympy; that must not count against a budget.
+        if not self.ready:
+            self.connection.recv()
+            self.ready = True
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class _OperationCancelled(RuntimeError):
+    """Raised for an operation stopped by ``/cancel`` or a newer request in its cancel group."""
+
+
+class _PendingOperation:
+    def __init__(self, request_id: Optional[str], cancel_group: Optional[str]):
+        self.request_id = request_id
+        self.cancel_group = cancel_group
+        self.worker: Optional[_OperationWorker] = None
+        self.cancelled = False
+        # Set on cancel, so a request waiting on an identical one in flight stops waiting.
+        self.wake = threading.Event()
+
+
+class _WorkerPool:
+    """Runs operations in spawned processes that are killed when they overrun their time budget."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.stats = {"tasks": 0, "timeouts": 0, "cancelled": 0, "crashes": 0, "replacements": 0}
+        self._context = multiprocessing.get_context("spawn")
+        self._condition = threading.Condition()
+        # Every live worker, idle or busy, so shutdown can stop and reap them all.
+        self._workers: list[_OperationWorker] = []
+        self._idle = [self._start_worker() for _ in range(size)]
+        # Started ahead of time so a killed worker is replaced without waiting for imports.
+        self._spare = self._start_worker()
+        self._pending: list[_PendingOperation] = []
+        # Workers are not daemonic, so multiprocessing would wait for them at exit; stop them first.
+        atexit.register(self.shutdown)
+
+    def _start_worker(self) -> _OperationWorker:
+        worker = _OperationWorker(self._context)
+        self._workers.append(worker)
+        return worker
+
+    def _acquire(self, pending: _PendingOperation, deadline: Optional[float]) -> Optional[_OperationWorker]:
+        """Wait for an idle worker; ``None`` when cancelled or ``deadline`` passes while queued."""
+        with self._condition:
+            while not self._idle and not pending.cancelled:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            if pending.cancelled:
+                return None
+            pending.worker = self._idle.pop()
+            return pending.worker
+
+    def _release(self, worker: _OperationWorker):
+        with self._condition:
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def _replace(self, worker: _OperationWorker) -> _OperationWorker:
+        worker.stop()
+        with self._condition:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            replacement, self._spare = self._spare, self._start_worker()
+            self.stats["replacements"] += 1
+        return replacement
+
+    def _count(self, name: str):
+        with self._condition:
+            self.stats[name] += 1
+
+    def cancel(self, *, request_id: Optional[str] = None, cancel_group: Optional[str] = None) -> int:
+        """Aborts queued or running operations matching the request id or cancel group."""
+        cancelled = 0
+        with self._condition:
+            for pending in self._pending:
+                if pending.cancelled:
+                    continue
+                if (request_id is not None and pending.request_id == request_id) or (
+                    cancel_group is not None and pending.cancel_group == cancel_group
+                ):
+                    pending.cancelled = True
+                    pending.wake.set()
+                    cancelled += 1
+                    if pending.worker is not None:
+                        pending.worker.process.kill()
+            self.stats["cancelled"] += cancelled
+            self._condition.notify_all()
+        return cancelled
+
+    def run(
+        self,
+        task: str,
+        args: tuple[Any, ...],
+        timeout_ms: Optional[int],
+        *,
+        label: str,
+        request_id: Optional[str] = None,
+        cancel_group: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Run ``task`` in a worker; time spent queued for a worker counts against ``timeout_ms``.
+
+        ``deadline`` (a ``time.monotonic()`` value) overrides the one derived from ``timeout_ms``,
+        which then only names the budget in the timeout message.
+        """
+        if deadline is None and timeout_ms is not None:
+            deadline = time.monotonic() + timeout_ms / 1000
+        pending = _PendingOperation(request_id, cancel_group)
+        with self._condition:
+            self._pending.append(pending)
+        try:
+            return self._run_pending(pending, task, args, timeout_ms, deadline, label)
+        finally:
+            with self._condition:
+                self._pending.remove(pending)
+
+    def _run_pending(
+        self,
+        pending: _PendingOperation,
+        task: str,
+        args: tuple[Any, ...],
+        timeout_ms: Optional[int],
+        deadline: Optional[float],
+        label: str,
+    ) -> Any:
+        cancelled_error = _OperationCancelled(f"Operation '{label}' was cancelled")
+        worker = self._acquire(pending, deadline)
+        if worker is None:
+            if pending.cancelled:
+                raise cancelled_error
+            self._count("timeouts")
+            raise TimeoutError(f"Operation '{label}' exceeded its {timeout_ms} ms time budget while waiting for a worker")
+        if not worker.process.is_alive() and not pending.cancelled:
+            worker = pending.worker = self._replace(worker)
+        self._count("tasks")
+        try:
+            ready_started = time.monotonic()
+            worker.wait_until_ready()
+            if deadline is not None:
+                deadline += time.monotonic() - ready_started
+            state = None if worker.state_version == STATE_VERSION else _export_session_state()
+            worker.connection.send((state, task, args))
+            if state is not None:
+                worker.state_version = state["version"]
+            finished = worker.connection.poll(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            reply = worker.connection.recv() if finished else None
+        except (EOFError, OSError):
+            reply = None
+            if not pending.cancelled:
+                self._count("crashes")
+                self._release(self._replace(worker))
+                raise RuntimeError(f"Operation worker for '{label}' exited unexpectedly; it has been restarted") from None
+        except BaseException:
+            # The worker may still be computing the task it was sent; its reply must not reach
+            # the next request.
+            self._release(self._replace(worker))
+            raise
+
+        with self._condition:
+            pending.worker = None
+        if pending.cancelled:
+            # The worker may have been killed after it replied, so never reuse it.
+            self._release(self._replace(worker))
+            raise cancelled_error
+        if reply is None:
+            self._count("timeouts")
+            self._release(self._replace(worker))
+            raise TimeoutError(f"Operation '{label}' exceeded its {timeout_ms} ms time budget and was stopped")
+
+        ok, result, state_delta, op_meta = reply
+        _REQUEST_LOCAL.op_meta = op_meta
+        if state_delta is not None:
+            # The op assigned a variance; merge it and resync every worker on its next task.
+            _merge_parser_state(state_delta)
+        self._release(worker)
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    def follow(
+        self,
+        flight: "_Flight",
+        timeout_ms: Optional[int],
+        *,
+        label: str,
+        request_id: Optional[str] = None,
+        cancel_group: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ):
+        """Wait for an identical operation another request runs, as if it were this request's own.
+
+        ``/cancel`` and newer requests in ``cancel_group`` reach the wait, and the request's own
+        budget bounds it.
+        """
+        if deadline is None and timeout_ms is not None:
+            deadline = time.monotonic() + timeout_ms / 1000
+        pending = _PendingOperation(request_id, cancel_group)
+        with self._condition:
+            self._pending.append(pending)
+        try:
+            finished = flight.wait(pending.wake, None if deadline is None else max(0.0, deadline - time.monotonic()))
+        finally:
+            with self._condition:
+                self._pending.remove(pending)
+        if pending.cancelled:
+            raise _OperationCancelled(f"Operation '{label}' was cancelled")
+        if not finished:
+            self._count("timeouts")
+            raise TimeoutError(
+                f"Operation '{label}' exceeded its {timeout_ms} ms time budget while waiting for an identical request"
+            )
+
+    def shutdown(self):
+        with self._condition:
+            workers, self._workers, self._idle = self._workers, [], []
+        for worker in workers:
+            worker.stop()
+
+
+_OPERATION_POOL: Optional[_WorkerPool] = None
+_OPERATION_POOL_LOCK = threading.Lock()
+
+
+def _operation_pool() -> _WorkerPool:
+    global _OPERATION_POOL
+    with _OPERATION_POOL_LOCK:
+        if _OPERATION_POOL is None:
+            _OPERATION_POOL = _WorkerPool(OP_WORKERS)
+        return _OPERATION_POOL
+
+
+def _parse_timeout_ms(value: Any) -> Optional[int]:
+    if value is None:
+        return OP_TIMEOUT_MS or None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError("'timeout_ms' must be a positive integer")
+    return value
+
+
+def _parse_optional_string_field(payload: dict[str, Any], name: str) -> Optional[str]:
+    value = payload.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, str) or value.strip() == "":
+        raise ValueError(f"'{name}' must be a non-empty string")
+    return value
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._waiters: list[threading.Event] = []
+
+    def wait(self, wake: threading.Event, timeout: Optional[float]) -> bool:
+        """Wait until the flight is done, ``wake`` is set elsewhere, or ``timeout`` passes; return whether it is done."""
+        self._waiters.append(wake)
+        try:
+            # finish() sets done before waking, so a wake registered too late still sees it.
+            if not self.done.is_set():
+                wake.wait(timeout)
+        finally:
+            self._waiters.remove(wake)
+        return self.done.is_set()
+
+    def finish(self):
+        self.done.set()
+        for wake in list(self._waiters):
+            wake.set()
+
+
+class _SingleFlight:
+    """Lets identical calls that overlap in time share one computation."""
+
+    def __init__(self):
+        self.stats = {"leaders": 0, "coalesced": 0}
+        self._flights: dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self, key: Any, compute: Callable[[], Any], follow: Optional[Callable[[_Flight], None]] = None
+    ) -> tuple[Any, bool]:
+        """Return ``(result, coalesced)``; ``coalesced`` is true when another call computed it.
+
+        A follower waits with ``follow(flight)``, which may raise to give up on its own budget or
+        cancellation (default: wait until done).  A leader that was timed out or cancelled was
+        stopped for its own reasons, so its followers do not inherit that: they compute again.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.stats["leaders"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+
+            if leader:
+                break
+            if follow is None:
+                flight.done.wait()
+            else:
+                follow(flight)
+            if isinstance(flight.error, (TimeoutError, _OperationCancelled)):
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = compute()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.finish()
+        return flight.result, False
+
+
+OPERATION_FLIGHTS = _SingleFlight()
+
+
+# Ops that parse their whole selection as one LaTeX expression (or equation, for the second
+# set); their results can be cached under the parsed form instead of the selection text.
+EXPRESSION_KEY_OPS = {
+    "simplify", "trigsimp", "ratsimp", "powsimp", "apart", "subs", "diff", "integrate", "limit",
+    "series", "summation", "product", "sqf", "det", "inv", "transpose", "rank", "eigenvals",
+    "eigenvects", "nullspace", "charpoly", "lu", "qr", "mat_solve", "jordan", "svd", "cholesky",
+}
+EQUATION_KEY_OPS = {"solve", "solveset", "nsolve"}
+
+_RESULT_CACHE: Optional[_ResultCache] = None
+_RESULT_CACHE_LOCK = threading.Lock()
+# (STATE_VERSION, fingerprint of the session state at that version)
+_STATE_FINGERPRINT: tuple[int, str] = (-1, "")
+
+
+def _result_cache() -> Optional[_ResultCache]:
+    global _RESULT_CACHE
+    if RESULT_CACHE_PATH == "":
+        return None
+    with _RESULT_CACHE_LOCK:
+        if _RESULT_CACHE is None:
+            _RESULT_CACHE = _ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_SIZE)
+        return _RESULT_CACHE
+
+
+def _state_fingerprint() -> str:
+    global _STATE_FINGERPRINT
+    with STATE_LOCK:
+        version, fingerprint = _STATE_FINGERPRINT
+        if version == STATE_VERSION:
+            return fingerprint
+        state = _snapshot_session_state()
+        parts = {
+            "is_real": state["is_real"],
+            "variances": sorted((sp.srepr(key), sp.srepr(value)) for key, value in state["variances"].items()),
+            "parser_variances": None if state["parser_variances"] is None else sorted(
+                (sp.srepr(key), sp.srepr(value)) for key, value in state["parser_variances"].items()
+            ),
+            "parser_var": sorted((str(key), sp.srepr(value)) for key, value in state["parser_var"].items()),
+            "symbol_assumptions": state["symbol_assumptions"],
+            "random_variables": sorted((name, sp.srepr(value)) for name, value in state["random_variables"].items()),
+        }
+        fingerprint = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        _STATE_FINGERPRINT = (STATE_VERSION, fingerprint)
+        return fingerprint
+
+
+def _structural_data_key(data: str, kind: str) -> Optional[str]:
+    if kind == "equation":
+        equation, _ = _parse_equation_or_zero_expression(data)
+        return sp.srepr(equation)
+    if _may_assign_state(data):
+        return None
+    return sp.srepr(_parse_expression(data))
+
+
+def _normalize_selection_text(data: str) -> str:
+    # Spacing inside a line never changes the parse; line breaks separate items for some ops.
+    lines = (" ".join(line.split()) for line in data.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _canonical_data_key(data: str, op_key: str) -> Optional[str]:
+    # Selections of expression/equation ops are keyed on their parsed, substituted SymPy form, so
+    # re-spaced or reordered input (`x^{2}+2x+1`, `2x + x^2 + 1`) shares one result. The text to key
+    # mapping is remembered per state version, so a repeated selection is not parsed again.
+    if op_key in EQUATION_KEY_OPS:
+        kind = "equation"
+    elif op_key in EXPRESSION_KEY_OPS:
+        kind = "expression"
+    else:
+        return _normalize_selection_text(data)
+
+    memo_key = (kind, data, STATE_VERSION)
+    data_key = CANONICAL_KEY_CACHE.get(memo_key, _CACHE_MISS)
+    if data_key is not _CACHE_MISS:
+        if data_key is not None:
+            _sync_frac_type(data)
+        return data_key
+
+    try:
+        data_key = _structural_data_key(data, kind)
+    except Exception:
+        data_key = None
+    CANONICAL_KEY_CACHE.put(memo_key, data_key)
+    return data_key
+
+
+def _result_cache_key(data: str, op_key: str, params: dict[str, Any]) -> Optional[str]:
+    # None marks requests that must not be cached: unknown or session ops, assignments, and
+    # selections whose parse fails (the op reports that error itself).
+    if op_key not in OP_HANDLERS or op_key in STATE_OPS:
+        return None
+    data_key = _canonical_data_key(data, op_key)
+    if data_key is None:
+        return None
+    parts = [
+        RESULT_CACHE_SCHEMA,
+        sp.__version__,
+        op_key,
+        params,
+        data_key,
+        # Rendering follows the selection's (or last seen) \frac macro.
+        getattr(_REQUEST_LOCAL, "frac_type", None) or latex2sympy2.frac_type,
+        _state_fingerprint(),
+    ]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _run_operation(
+    data: str,
+    op_name: str,
+    params: dict[str, Any],
+    timeout_ms: Optional[int],
+    *,
+    request_id: Optional[str] = None,
+    cancel_group: Optional[str] = None,
+    supersede: bool = True,
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """Run one op and return ``(result, meta)``.
+
+    ``meta`` is ``{"cached": True}`` when the result came from a result cache without computing,
+    ``{"coalesced": True}`` when an identical request already in flight computed it, else
+    whatever the op reported with ``_report_op_meta`` (None when it reported nothing).
+    """
+    op_key = str(op_name).strip().lower()
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    cache = _result_cache()
+    use_cache = cache is not None or RESULT_MEMORY_CACHE.max_size > 0
+    cache_key = _result_cache_key(data, op_key, params) if use_cache else None
+    if cache_key is not None:
+        cached = RESULT_MEMORY_CACHE.get(cache_key)
+        if cached is None and cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                RESULT_MEMORY_CACHE.put(cache_key, cached)
+        if cached is not None:
+            return cached, {"cached": True}
+
+    def compute() -> str:
+        if deadline is not None and time.monotonic() >= deadline:
+            # Only after waiting on an identical request that was then stopped for its own reasons.
+            raise TimeoutError(
+                f"Operation '{op_key}' exceeded its {timeout_ms} ms time budget while waiting for an identical request"
+            )
+        result = _run_supervised(
+            "op",
+            (data, op_key, params),
+            timeout_ms,
+            label=op_key,
+            in_server=op_key not in OP_HANDLERS or op_key in STATE_OPS,
+            request_id=request_id,
+            cancel_group=cancel_group,
+            supersede=supersede,
+            deadline=deadline,
+        )
+        # A result cut short by an op's own budget may come out better on a later run.
+        if cache_key is not None and not (_REQUEST_LOCAL.op_meta or {}).get("partial"):
+            RESULT_MEMORY_CACHE.put(cache_key, result)
+            if cache is not None:
+                cache.put(cache_key, result)
+        return result
+
+    _REQUEST_LOCAL.op_meta = None
+    if op_key in STATE_OPS or op_key not in OP_HANDLERS:
+        return compute(), _REQUEST_LOCAL.op_meta
+
+    # Without a result cache key, identical requests are recognized by their normalized text.
+    flight_key = cache_key or (
+        op_key,
+        json.dumps(params, sort_keys=True, default=str),
+        _normalize_selection_text(data),
+        STATE_VERSION,
+    )
+    def follow(flight: _Flight):
+        # Followers stay reachable by /cancel and bounded by their own budget, like queued ops.
+        _operation_pool().follow(
+            flight,
+            timeout_ms,
+            label=op_key,
+            request_id=request_id,
+            cancel_group=cancel_group,
+            deadline=deadline,
+        )
+
+    result, coalesced = OPERATION_FLIGHTS.run(flight_key, compute, follow if OP_WORKERS > 0 else None)
+    return result, {"coalesced": True} if coalesced else _REQUEST_LOCAL.op_meta
+
+
+def _run_supervised(
+    task: str,
+    args: tuple[Any, ...],
+    timeout_ms: Optional[int],
+    *,
+    label: str,
+    in_server: bool = False,
+    request_id: Optional[str] = None,
+    cancel_group: Optional[str] = None,
+    supersede: bool = True,
+    deadline: Optional[float] = None,
+) -> Any:
+    # A new request in a cancel group supersedes whatever that group still has queued or running.
+    if supersede and cancel_group is not None and _OPERATION_POOL is not None:
+        _OPERATION_POOL.cancel(cancel_group=cancel_group)
+
+    if OP_WORKERS <= 0 or in_server:
+        return WORKER_TASKS[task](*args)
+    return _operation_pool().run(
+        task,
+        args,
+        timeout_ms,
+        label=label,
+        request_id=request_id,
+        cancel_group=cancel_group,
+        deadline=deadline,
+    )
+
+
+@app.before_request
+def _reset_request_local():
+    _REQUEST_LOCAL.frac_type = None
+    _REQUEST_LOCAL.op_meta = None
 
 
 @app.route("/")
@@ -1562,14 +3816,33 @@ def health():
     return _success("ok")
 
 
+def _evaluate_latex(data: str) -> str:
+    _sync_frac_type(data)
+    # latex2latex renders with the shared fraction macro; restore this request's choice.
+    # It parses with latex2sympy, so it runs under the state lock like _latex2sympy.
+    with STATE_LOCK:
+        rendered = latex2latex(data)
+    return _apply_request_fraction_macro(rendered)
+
+
 @app.route("/latex", methods=["POST"])
 def get_latex():
     data, err = _get_request_data()
     if err:
         return _error(err)
 
+    if _may_assign_state(data):
+        # latex2sympy writes assignments straight into its variances map.
+        with STATE_LOCK:
+            try:
+                return _success(_evaluate_latex(data))
+            except Exception as exc:  # pragma: no cover - defensive
+                return _error(str(exc))
+            finally:
+                _bump_state_version()
+
     try:
-        return _success(latex2latex(data))
+        return _success(_evaluate_latex(data))
     except Exception as exc:  # pragma: no cover - defensive
         return _error(str(exc))
 
@@ -1581,7 +3854,7 @@ def get_matrix_raw_echelon_form():
         return _error(err)
 
     try:
-        result = latex(_parse_expression(data).rref()[0])
+        result = _render_latex(_parse_expression(data).rref()[0])
         return _success(result)
     except Exception as exc:  # pragma: no cover - defensive
         return _error(str(exc))
@@ -1589,14 +3862,23 @@ def get_matrix_raw_echelon_form():
 
 @app.route("/numerical", methods=["POST"])
 def get_numerical():
-    data, err = _get_request_data()
+    payload, err = _get_request_payload()
+    if err:
+        return _error(err)
+    data, err = _coerce_data_value(payload)
     if err:
         return _error(err)
 
     try:
+        digits = NUMERICAL_DEFAULT_DIGITS
+        if payload.get("prec") is not None:
+            digits = _parse_positive_int(payload.get("prec"), "prec")
+        budget_ms = _parse_simplify_budget(payload.get("budget_ms"))
         expression = _parse_expression(data)
-        result = latex(simplify(expression.doit().doit()).evalf(subs=variances))
-        return _success(result)
+        with STATE_LOCK:
+            values = dict(variances)
+        result, path = _evaluate_numerically(expression, values, digits, budget_ms)
+        return _success(_render_latex(result), meta={"path": path, **(getattr(_REQUEST_LOCAL, "op_meta", None) or {})})
     except Exception as exc:  # pragma: no cover - defensive
         return _error(str(exc))
 
@@ -1608,7 +3890,7 @@ def get_factor():
         return _error(err)
 
     try:
-        result = latex(factor(_parse_expression(data)))
+        result = _render_latex(factor(_parse_expression(data)))
         return _success(result)
     except Exception as exc:  # pragma: no cover - defensive
         return _error(str(exc))
@@ -1621,11 +3903,11 @@ def get_expand():
         return _error(err)
 
     try:
-        result = latex(expand(apart(expand_trig(_parse_expression(data)))))
+        result = _render_latex(expand(apart(expand_trig(_parse_expression(data)))))
         return _success(result)
     except Exception:
         try:
-            result = latex(expand(expand_trig(_parse_expression(data))))
+            result = _render_latex(expand(expand_trig(_parse_expression(data))))
             return _success(result)
         except Exception as exc:  # pragma: no cover - defensive
             return _error(str(exc))
@@ -1637,56 +3919,214 @@ def run_operation():
     if err:
         return _error(err)
 
+    if payload.get("pipeline") is not None:
+        return _run_pipeline_request(payload)
+
+    fields, fields_err = _parse_operation_fields(payload)
+    if fields_err:
+        return _error(fields_err)
+    data, op_name, params = fields
+
+    try:
+        timeout_ms = _parse_timeout_ms(payload.get("timeout_ms"))
+        request_id = _parse_optional_string_field(payload, "request_id")
+        cancel_group = _parse_optional_string_field(payload, "cancel_group")
+        result, meta = _run_operation(
+            data,
+            op_name,
+            params,
+            timeout_ms,
+            request_id=request_id,
+            cancel_group=cancel_group,
+        )
+        return _success(result, meta=meta)
+    except Exception as exc:
+        return _error(str(exc))
+
+
+def _run_pipeline_request(payload: dict[str, Any]):
     data, data_err = _coerce_data_value(payload)
     if data_err:
         return _error(data_err)
 
-    op_name = payload.get("op")
-    if not isinstance(op_name, str) or op_name.strip() == "":
-        return _error("Missing 'op' field")
+    try:
+        stages = _parse_pipeline_stages(payload["pipeline"])
+        timeout_ms = _parse_timeout_ms(payload.get("timeout_ms"))
+        request_id = _parse_optional_string_field(payload, "request_id")
+        cancel_group = _parse_optional_string_field(payload, "cancel_group")
+        result, meta = _run_supervised(
+            "pipeline",
+            (data, stages),
+            timeout_ms,
+            label="pipeline",
+            request_id=request_id,
+            cancel_group=cancel_group,
+        )
+        return _success(result, meta=meta)
+    except Exception as exc:
+        return _error(str(exc))
 
-    params = payload.get("params", {})
-    if params is None:
-        params = {}
-    elif isinstance(params, list):
-        if len(params) == 0:
-            params = {}
-        else:
-            return _error("'params' must be an object")
-    elif not isinstance(params, dict):
-        return _error("'params' must be an object")
+
+def _run_operation_batch(
+    items: list[Any],
+    timeout_ms: Optional[int],
+    *,
+    parallel: bool,
+    request_id: Optional[str],
+    cancel_group: Optional[str],
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = [{"data": "", "error": ""} for _ in items]
+    tasks: list[tuple[int, str, str, dict[str, Any]]] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index]["error"] = "Batch item must be an object"
+            continue
+        fields, fields_err = _parse_operation_fields(item)
+        if fields_err:
+            results[index]["error"] = fields_err
+            continue
+        data, op_name, params = fields
+        if parallel and op_name.strip().lower() in STATE_OPS:
+            results[index]["error"] = f"'{op_name}' changes session state and cannot run in a parallel batch"
+            continue
+        tasks.append((index, data, op_name, params))
+
+    if cancel_group is not None and _OPERATION_POOL is not None:
+        _OPERATION_POOL.cancel(cancel_group=cancel_group)
+
+    def run_tasks(group: list[tuple[int, str, str, dict[str, Any]]]):
+        for index, data, op_name, params in group:
+            try:
+                result, meta = _run_operation(
+                    data,
+                    op_name,
+                    params,
+                    timeout_ms,
+                    request_id=request_id,
+                    cancel_group=cancel_group,
+                    supersede=False,
+                )
+                results[index]["data"] = result
+                results[index].update(meta or {})
+            except Exception as exc:
+                results[index]["error"] = str(exc)
+
+    if not parallel or OP_WORKERS <= 1 or len(tasks) <= 1:
+        # In item order, so session ops apply to the items after them; repeated data hits the parse cache.
+        run_tasks(tasks)
+        return results
+
+    # Items with identical data stay together on one thread, so later ones reuse the first one's parse.
+    groups: dict[str, list[tuple[int, str, str, dict[str, Any]]]] = {}
+    for task in tasks:
+        groups.setdefault(task[1], []).append(task)
+    with ThreadPoolExecutor(max_workers=min(OP_WORKERS, len(groups))) as executor:
+        for future in [executor.submit(run_tasks, group) for group in groups.values()]:
+            future.result()
+    return results
+
+
+@app.route("/op/batch", methods=["POST"])
+def run_operation_batch():
+    payload, err = _get_request_payload()
+    if err:
+        return _error(err)
+
+    items = payload.get("items")
+    if not isinstance(items, list) or len(items) == 0:
+        return _error("'items' must be a non-empty array")
+    parallel = payload.get("parallel", False)
+    if not isinstance(parallel, bool):
+        return _error("'parallel' must be a boolean")
 
     try:
-        result = _dispatch_operation(data, op_name, params)
-        return _success(result)
-    except Exception as exc:
+        timeout_ms = _parse_timeout_ms(payload.get("timeout_ms"))
+        request_id = _parse_optional_string_field(payload, "request_id")
+        cancel_group = _parse_optional_string_field(payload, "cancel_group")
+    except ValueError as exc:
+        return _error(str(exc))
+
+    results = _run_operation_batch(
+        items,
+        timeout_ms,
+        parallel=parallel,
+        request_id=request_id,
+        cancel_group=cancel_group,
+    )
+    return _success(results)
+
+
+@app.route("/cancel", methods=["POST"])
+def cancel_operation():
+    payload, err = _get_request_payload()
+    if err:
+        return _error(err)
+
+    try:
+        request_id = _parse_optional_string_field(payload, "request_id")
+        cancel_group = _parse_optional_string_field(payload, "cancel_group")
+    except ValueError as exc:
         return _error(str(exc))
+    if request_id is None and cancel_group is None:
+        return _error("Missing 'request_id' or 'cancel_group' field")
+
+    cancelled = 0
+    if _OPERATION_POOL is not None:
+        cancelled = _OPERATION_POOL.cancel(request_id=request_id, cancel_group=cancel_group)
+    return _success({"cancelled": cancelled})
+
+
+@app.route("/diagnostics", methods=["GET"])
+def diagnostics():
+    result_cache = _result_cache()
+    return _success({
+        "state_version": STATE_VERSION,
+        "parse_cache": PARSE_CACHE.stats(),
+        "parser_choice_cache": PARSER_CHOICE_CACHE.stats(),
+        "parse_fallback": dict(FALLBACK_STATS),
+        "workers": None if _OPERATION_POOL is None else {"size": _OPERATION_POOL.size, **_OPERATION_POOL.stats},
+        "result_cache": None if result_cache is None else result_cache.stats(),
+        "result_memory_cache": RESULT_MEMORY_CACHE.stats(),
+        "canonical_key_cache": CANONICAL_KEY_CACHE.stats(),
+        "lambdify_cache": LAMBDIFY_REGISTRY.stats(),
+        "single_flight": dict(OPERATION_FLIGHTS.stats),
+        "imports": {
+            "startup_ms": dict(STARTUP_IMPORT_MS),
+            "module_ready_ms": MODULE_READY_MS,
+            "lazy_ms": dict(LAZY_IMPORT_MS),
+        },
+    })
 
 
 @app.route("/variances", methods=["GET"])
 def get_variances():
     result = {}
-    for key in var:
-        result[str(key)] = str(var[key])
+    with STATE_LOCK:
+        for key in var:
+            result[str(key)] = str(var[key])
     return _success(result)
 
 
 @app.route("/reset", methods=["GET"])
 def reset():
-    set_variances({})
     global var
-    var = latex2sympy2.var
-    REGISTERED_SYMBOLS.clear()
-    REGISTERED_SYMBOL_ASSUMPTIONS.clear()
-    REGISTERED_RANDOM_VARIABLES.clear()
+    with STATE_LOCK:
+        set_variances({})
+        var = latex2sympy2.var
+        REGISTERED_SYMBOLS.clear()
+        REGISTERED_SYMBOL_ASSUMPTIONS.clear()
+        REGISTERED_RANDOM_VARIABLES.clear()
+        _bump_state_version()
     return _success({"success": True})
 
 
 @app.route("/complex", methods=["GET"])
 def complex_numbers_toggle():
     global IS_REAL
-    IS_REAL = not IS_REAL
-    set_real(True if IS_REAL else None)
+    with STATE_LOCK:
+        IS_REAL = not IS_REAL
+        set_real(True if IS_REAL else None)
+        _bump_state_version()
     return _success({"success": True, "value": IS_REAL})
 
 
@@ -1706,6 +4146,168 @@ def run_python():
         return _error(str(exc))
 
 
+def _unix_socket_in_use(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _make_http_server(host: str, port: int, mode: str):
+    if mode not in SERVER_MODES:
+        raise ValueError(f"LATEX_SYMPY_SERVER must be one of: {', '.join(SERVER_MODES)}")
+    return make_server(host, port, app, threaded=True)
+
+
+class _JsonRpcStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        reader = self.connection.makefile("r", encoding="utf-8")
+        writer = self.connection.makefile("w", encoding="utf-8")
+        try:
+            _serve_jsonrpc(reader, writer, threads=self.server.jsonrpc_threads)
+        except OSError:
+            pass
+        finally:
+            reader.close()
+            writer.close()
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _make_unix_server(path: str, mode: str):
+    # Clients keep one connection open and send line-delimited JSON-RPC over it, as on stdio;
+    # several clients (editor instances) can be connected at once.
+    if mode not in SERVER_MODES:
+        raise ValueError(f"LATEX_SYMPY_SERVER must be one of: {', '.join(SERVER_MODES)}")
+    if os.path.exists(path):
+        if _unix_socket_in_use(path):
+            raise OSError(f"Unix socket {path} is already served by another process")
+        os.unlink(path)
+    unix_server = _ThreadingUnixServer(path, _JsonRpcStreamHandler)
+    unix_server.jsonrpc_threads = JSONRPC_THREADS
+    return unix_server
+
+
+JSONRPC_PARSE_ERROR = -32700
+JSONRPC_INVALID_REQUEST = -32600
+JSONRPC_METHOD_NOT_FOUND = -32601
+
+
+def _jsonrpc_error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _handle_jsonrpc_line(line: str) -> Optional[dict[str, Any]]:
+    # The method is the HTTP route without its leading slash ("op", "op/batch", "health"), the
+    # params are the route's JSON body, and the result is the route's {"data", "error"} reply.
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return _jsonrpc_error(None, JSONRPC_PARSE_ERROR, "Parse error")
+    if not isinstance(message, dict):
+        return _jsonrpc_error(None, JSONRPC_INVALID_REQUEST, "Request must be an object")
+
+    request_id = message.get("id")
+    method = message.get("method")
+    params = message.get("params")
+    if not isinstance(method, str) or method.strip("/") == "":
+        return _jsonrpc_error(request_id, JSONRPC_INVALID_REQUEST, "'method' must be a non-empty string")
+    if params is not None and not isinstance(params, dict):
+        return _jsonrpc_error(request_id, JSONRPC_INVALID_REQUEST, "'params' must be an object")
+
+    path = "/" + method.strip("/")
+    adapter = app.url_map.bind("localhost")
+    try:
+        rule, _ = adapter.match(path, method="POST" if params is not None else "GET", return_rule=True)
+    except Exception:
+        try:
+            rule, _ = adapter.match(path, method="GET", return_rule=True)
+        except Exception:
+            return _jsonrpc_error(request_id, JSONRPC_METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    http_method = "POST" if "POST" in rule.methods else "GET"
+    with app.test_request_context(path, method=http_method, json=params if http_method == "POST" else None):
+        response = app.full_dispatch_request()
+    result = response.get_json(silent=True)
+    if result is None:
+        result = {"data": response.get_data(as_text=True), "error": ""}
+    if request_id is None:
+        return None
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _serve_jsonrpc(reader, writer, *, threads: int) -> None:
+    # Requests carry ids, so answers are written as they finish, not in arrival order.
+    write_lock = threading.Lock()
+
+    def answer(line: str) -> None:
+        try:
+            reply = _handle_jsonrpc_line(line)
+        except Exception as exc:
+            reply = _jsonrpc_error(None, JSONRPC_INVALID_REQUEST, str(exc))
+        if reply is None:
+            return
+        encoded = json.dumps(reply, separators=(",", ":"))
+        with write_lock:
+            writer.write(encoded + "\n")
+            writer.flush()
+
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="latex-sympy-stdio") as executor:
+        for line in reader:
+            if line.strip():
+                executor.submit(answer, line)
+
+
+def _claim_stdio_streams():
+    # Keep the real stdout for protocol frames; anything else printed (here or by
+    # spawned op workers, which inherit fd 1) goes to stderr instead.
+    sys.stdout.flush()
+    protocol_out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    return sys.stdin, protocol_out
+
+
+# Time from the first dependency import until the server module finished loading.
+MODULE_READY_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 3)
+
+
 if __name__ == "__main__":
-    port = int(os.getenv("LATEX_SYMPY_PORT", "7395"))
-    app.run(host="127.0.0.1", port=port)
+    if TRANSPORT not in TRANSPORTS:
+        raise ValueError(f"LATEX_SYMPY_TRANSPORT must be one of: {', '.join(TRANSPORTS)}")
+    if SERVER_MODE not in SERVER_MODES:
+        raise ValueError(f"LATEX_SYMPY_SERVER must be one of: {', '.join(SERVER_MODES)}")
+    listener = None
+    socket_path = None
+    if TRANSPORT == "http":
+        port = int(os.getenv("LATEX_SYMPY_PORT", "7395"))
+        listener = _make_http_server("127.0.0.1", port, SERVER_MODE)
+    elif TRANSPORT == "unix":
+        socket_path = os.getenv("LATEX_SYMPY_SOCKET", "").strip()
+        if socket_path == "":
+            raise ValueError("LATEX_SYMPY_SOCKET must be set for the unix transport")
+        listener = _make_unix_server(socket_path, SERVER_MODE)
+        # Turn the editor's jobstop() into a normal exit so the socket file is removed.
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    else:
+        stdio_in, stdio_out = _claim_stdio_streams()
+    if SERVER_MODE == "prefork":
+        OP_WORKERS = max(OP_WORKERS, os.cpu_count() or 1)
+    if OP_WORKERS > 0:
+        _operation_pool()
+    if listener is not None:
+        try:
+            listener.serve_forever()
+        finally:
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
+    else:
+        _serve_jsonrpc(stdio_in, stdio_out, threads=JSONRPC_THREADS)
+        if _OPERATION_POOL is not None:
+            _OPERATION_POOL.shutdown()
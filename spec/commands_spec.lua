@@ -16,6 +16,7 @@ local COMMAND_NAMES = {
   "LatexSympyOp",
   "LatexSympyPick",
   "LatexSympyRepeat",
+  "LatexSympyOpLines",
   "LatexSympySolve",
   "LatexSympyDiff",
   "LatexSympyIntegrate",
@@ -135,6 +136,12 @@ describe("operation parsing", function()
         { var = "y", lower = "0", upper = "2" },
       },
     }, integrate_bounds)
+
+    local integrate_race = mod._parse_operation_args_for_tests("integrate", { "x", "strategy=race", "budget_ms=5000" })
+    assert.same({ var = "x", strategy = "race", budget_ms = 5000 }, integrate_race)
+
+    local _, strategy_err = mod._parse_operation_args_for_tests("integrate", { "strategy=fastest" })
+    assert.matches("strategy=default|race", strategy_err, 1, true)
   end)
 
   it("parses limit and series args", function()
@@ -153,6 +160,11 @@ describe("operation parsing", function()
     local simplify_params = mod._parse_operation_args_for_tests("simplify", {})
     assert.same({}, simplify_params)
 
+    local budgeted = mod._parse_operation_args_for_tests("simplify", { "budget_ms=500" })
+    assert.same({ budget_ms = 500 }, budgeted)
+    local _, budget_err = mod._parse_operation_args_for_tests("simplify", { "fast" })
+    assert.matches("simplify expects", budget_err, 1, true)
+
     local apart_params = mod._parse_operation_args_for_tests("apart", { "x" })
     assert.same({ var = "x" }, apart_params)
 
@@ -170,6 +182,18 @@ describe("operation parsing", function()
 
     local nsolve_params = mod._parse_operation_args_for_tests("nsolve", { "x", "1", "2" })
     assert.same({ var = "x", guess = "1", guess2 = "2" }, nsolve_params)
+    assert.same(
+      { var = "x", interval = "[0,10]", starts = 64 },
+      mod._parse_operation_args_for_tests("nsolve", { "x", "interval=[0,10]", "starts=64" })
+    )
+    local _, interval_err = mod._parse_operation_args_for_tests("nsolve", { "x", "1", "interval=[0,1]" })
+    assert.is_truthy(interval_err)
+
+    assert.same({ var = "x", numeric = true }, mod._parse_operation_args_for_tests("solve", { "x", "numeric" }))
+    assert.same(
+      { var = "x", domain = "R", prec = 30 },
+      mod._parse_operation_args_for_tests("solveset", { "x", "R", "prec=30" })
+    )
 
     local dsolve_params = mod._parse_operation_args_for_tests("dsolve", { "y(x)" })
     assert.same({ func = "y(x)" }, dsolve_params)
@@ -247,8 +271,25 @@ describe("operation parsing", function()
     assert.same({}, mod._parse_operation_args_for_tests("sat", {}))
     assert.same({}, mod._parse_operation_args_for_tests("jordan", {}))
     assert.same({}, mod._parse_operation_args_for_tests("svd", {}))
+    assert.same({ numeric = true }, mod._parse_operation_args_for_tests("svd", { "numeric" }))
+    assert.same({ prec = 30 }, mod._parse_operation_args_for_tests("eigenvals", { "prec=30" }))
+    assert.same({ numeric = false }, mod._parse_operation_args_for_tests("eigenvects", { "numeric=false" }))
+    assert.same({ numeric = true, prec = 20 }, mod._parse_operation_args_for_tests("qr", { "numeric", "prec=20" }))
+    local _, prec_err = mod._parse_operation_args_for_tests("qr", { "prec=0" })
+    assert.is_truthy(prec_err:find("positive integer", 1, true))
     assert.same({}, mod._parse_operation_args_for_tests("cholesky", {}))
 
+    assert.same({
+      grid = { { var = "x", values = "0:1:5" }, { var = "y", values = "[1,2]" } },
+      format = "json",
+    }, mod._parse_operation_args_for_tests("eval_grid", { "x=0:1:5", "y=[1,2]", "format=JSON" }))
+    assert.same(
+      { points = "(0,1);(1,2)", vars = { "x", "y" }, backend = "mpmath", prec = 30 },
+      mod._parse_operation_args_for_tests("eval_grid", { "points=(0,1);(1,2)", "vars=x,y", "backend=mpmath", "prec=30" })
+    )
+    local _, grid_err = mod._parse_operation_args_for_tests("eval_grid", { "x=0:1:3", "points=0;1" })
+    assert.is_truthy(grid_err)
+
     assert.same({
       name = "x",
       assumptions = { real = true, nonnegative = false },
@@ -971,3 +1012,80 @@ describe("picker behavior", function()
     assert.is_true(backend == "vim_ui" or backend == "inputlist")
   end)
 end)
+
+describe("unix transport", function()
+  local uv = vim.uv or vim.loop
+  local socket_path
+  local listener
+  local original_system
+
+  before_each(function()
+    package.loaded["latex_sympy"] = nil
+    local mod = require("latex_sympy")
+    mod._reset_state_for_tests()
+    socket_path = vim.fn.tempname() .. ".sock"
+    original_system = vim.system
+  end)
+
+  after_each(function()
+    vim.system = original_system
+    local mod = package.loaded["latex_sympy"]
+    if mod and mod._reset_state_for_tests then
+      mod._reset_state_for_tests()
+    end
+    package.loaded["latex_sympy"] = nil
+    if listener and not listener:is_closing() then
+      listener:close()
+    end
+    listener = nil
+    os.remove(socket_path)
+  end)
+
+  it("sends op requests over the socket instead of curl", function()
+    local methods = {}
+    listener = uv.new_pipe(false)
+    listener:bind(socket_path)
+    listener:listen(8, function()
+      local client = uv.new_pipe(false)
+      listener:accept(client)
+      local partial = ""
+      client:read_start(function(_, chunk)
+        if not chunk then
+          client:close()
+          return
+        end
+        partial = partial .. chunk
+        while partial:find("\n", 1, true) do
+          local line, rest = partial:match("^(.-)\n(.*)$")
+          partial = rest
+          local message = vim.json.decode(line)
+          table.insert(methods, message.method)
+          client:write(vim.json.encode({ jsonrpc = "2.0", id = message.id, result = { data = "x", error = "" } }) .. "\n")
+        end
+      end)
+    end)
+
+    local curl_calls = 0
+    vim.system = function(cmd, opts, on_exit)
+      curl_calls = curl_calls + 1
+      return original_system(cmd, opts, on_exit)
+    end
+
+    local mod = require("latex_sympy")
+    mod.setup({ transport = "unix", socket_path = socket_path })
+
+    local result
+    mod._server_request_for_tests("POST", "/op", { data = "x", op = "simplify", params = {} }, function(data)
+      result = data
+    end, function(err)
+      result = "error: " .. tostring(err)
+    end)
+
+    assert.is_true(vim.wait(2000, function()
+      return result ~= nil
+    end))
+    assert.are.equal("x", result)
+    assert.are.same({ "op" }, methods)
+    assert.are.equal(0, curl_calls)
+  end)
+end)
@@ -38,6 +38,14 @@ describe("latex_sympy defaults and safety", function()
     assert.is_true(cfg.startup_notify_once)
     assert.is_false(cfg.notify_info)
     assert.equals(5000, cfg.timeout_ms)
+    assert.equals(15, cfg.numerical_prec)
+    assert.equals(1, cfg.op_workers)
+    assert.equals(4000, cfg.simplify_budget_ms)
+    assert.equals("threaded", cfg.server_mode)
+    assert.equals("http", cfg.transport)
+    assert.is_nil(cfg.socket_path)
+    assert.is_false(cfg.result_cache)
+    assert.equals(4096, cfg.result_cache_size)
     assert.is_false(cfg.preview_before_apply)
     assert.equals(160, cfg.preview_max_chars)
     assert.is_true(cfg.drop_stale_results)
@@ -47,6 +55,26 @@ describe("latex_sympy defaults and safety", function()
     assert.is_true(cfg.respect_existing_keymaps)
   end)
 
+  it("normalizes transport and reassembles chunked stdio replies", function()
+    local mod = require("latex_sympy")
+    mod.setup({ transport = "stdio" })
+    assert.equals("stdio", mod.get_config().transport)
+    mod.setup({ transport = "unix", socket_path = "/tmp/latex_sympy.sock" })
+    assert.equals("unix", mod.get_config().transport)
+    assert.equals("/tmp/latex_sympy.sock", mod.get_config().socket_path)
+    mod.setup({ transport = "carrier-pigeon", socket_path = false })
+    assert.equals("http", mod.get_config().transport)
+    assert.is_nil(mod.get_config().socket_path)
+
+    local lines, partial = mod._split_rpc_chunks_for_tests("", { '{"id":1' })
+    assert.same({}, lines)
+    assert.equals('{"id":1', partial)
+
+    lines, partial = mod._split_rpc_chunks_for_tests(partial, { ',"result":{}}', '{"id":2}', '{"id"' })
+    assert.same({ '{"id":1,"result":{}}', '{"id":2}' }, lines)
+    assert.equals('{"id"', partial)
+  end)
+
   it("blocks LatexSympyPython by default and avoids server start", function()
     local mod = require("latex_sympy")
     mod.activate_for_tex_buffer(0)
@@ -1,7 +1,16 @@
 import importlib
+import io
+import json
+import logging
 import os
+import socket
 import sys
+import tempfile
+import threading
+import time
 import unittest
+import urllib.request
+from unittest import mock
 
 
 def load_server(enable_python_eval: bool):
@@ -11,6 +20,14 @@ def load_server(enable_python_eval: bool):
     return importlib.import_module("server")
 
 
+def stalled_simplify_ladder(connection, expression):
+    # Stands in for a full simplify that never finishes: only the cheap cancel stage answers.
+    import sympy
+
+    connection.send(("cancel", sympy.cancel(expression)))
+    time.sleep(30)
+
+
 class ServerOperationTests(unittest.TestCase):
     def setUp(self):
         self.server = load_server(False)
@@ -1052,6 +1069,1419 @@ class ServerOperationTests(unittest.TestCase):
         self.assertIn("x", latex_body["data"])
 
 
+class ParseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def parse_cache_stats(self):
+        body = self.client.get("/diagnostics").get_json()
+        self.assertEqual(body["error"], "")
+        return body["data"]["parse_cache"]
+
+    def test_repeated_selection_hits_parse_cache(self):
+        before = self.parse_cache_stats()
+        for _ in range(2):
+            body = self.post_json("/op", {"data": "x^2+2x+1", "op": "simplify"}).get_json()
+            self.assertEqual(body["error"], "")
+        after = self.parse_cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_cached_matrix_is_not_shared_between_requests(self):
+        matrix_text = "\\begin{bmatrix}1 & 2\\\\3 & 4\\end{bmatrix}"
+        first = self.server._parse_expression(matrix_text)
+        first[0, 0] = 99
+        second = self.server._parse_expression(matrix_text)
+        self.assertEqual(second[0, 0], 1)
+
+    def test_state_changes_invalidate_parse_cache(self):
+        simplify_payload = {"data": "\\sqrt{x^2}", "op": "simplify"}
+        generic_body = self.post_json("/op", simplify_payload).get_json()
+        self.assertEqual(generic_body["error"], "")
+
+        self.post_json("/op", {
+            "data": "",
+            "op": "symbol",
+            "params": {"name": "x", "assumptions": {"positive": True}},
+        })
+        positive_body = self.post_json("/op", simplify_payload).get_json()
+        self.assertEqual(positive_body["data"], "x")
+
+        self.post_json("/op", {"data": "", "op": "symbols_reset"})
+        reset_body = self.post_json("/op", simplify_payload).get_json()
+        self.assertEqual(reset_body["data"], generic_body["data"])
+
+    def test_cache_hit_keeps_fraction_macro(self):
+        self.addCleanup(setattr, self.server.latex2sympy2, "frac_type", "\\frac")
+        dfrac_body = self.post_json("/op", {"data": "\\dfrac{x}{2}", "op": "simplify"}).get_json()
+        self.assertIn("\\dfrac", dfrac_body["data"])
+        self.post_json("/op", {"data": "\\frac{y}{3}", "op": "simplify"})
+
+        cached_body = self.post_json("/op", {"data": "\\dfrac{x}{2}", "op": "simplify"}).get_json()
+        self.assertIn("\\dfrac", cached_body["data"])
+
+    def test_fallback_parser_choice_is_remembered(self):
+        payload = {
+            "data": "Derivative(y(x), x) - y(x) = 0",
+            "op": "dsolve",
+            "params": {"func": "y(x)"},
+        }
+        first_body = self.post_json("/op", payload).get_json()
+        self.assertEqual(first_body["error"], "")
+        first_stats = self.client.get("/diagnostics").get_json()["data"]["parse_fallback"]
+        self.assertEqual(first_stats["latex_failures"], 1)
+        self.assertEqual(first_stats["latex_skipped"], 0)
+
+        second_body = self.post_json("/op", payload).get_json()
+        self.assertEqual(second_body["data"], first_body["data"])
+        second_stats = self.client.get("/diagnostics").get_json()["data"]["parse_fallback"]
+        self.assertEqual(second_stats["latex_failures"], 1)
+        self.assertEqual(second_stats["latex_skipped"], 1)
+
+    def test_unparseable_input_is_rejected_without_reparsing(self):
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.server._parse_expression_with_fallback("x +* ")
+        stats = self.server.FALLBACK_STATS
+        self.assertEqual(stats["latex_failures"], 1)
+        self.assertEqual(stats["invalid_skipped"], 1)
+
+    def test_state_substitutions_apply_in_one_pass(self):
+        self.post_json("/latex", {"data": "c = 2"})
+        self.post_json("/op", {
+            "data": "",
+            "op": "symbol",
+            "params": {"name": "x", "assumptions": {"positive": True}},
+        })
+        self.post_json("/op", {
+            "data": "",
+            "op": "dist",
+            "params": {"kind": "normal", "name": "X", "args": ["0", "1"]},
+        })
+
+        combined_body = self.post_json("/op", {"data": "X + \\sqrt{x^2} + c", "op": "simplify"}).get_json()
+        self.assertEqual(combined_body["error"], "")
+        self.assertEqual(combined_body["data"], "x + X + 2")
+
+        derivative_body = self.post_json("/op", {"data": "\\frac{d}{dc} c^3", "op": "simplify"}).get_json()
+        self.assertEqual(derivative_body["data"], "12")
+
+        untouched = self.server._parse_expression("y^2 + 1")
+        self.assertEqual(untouched, self.server.latex2sympy("y^2 + 1"))
+
+    def test_matrix_variables_are_evaluated_after_substitution(self):
+        self.post_json("/latex", {"data": "A = \\begin{bmatrix}1 & 2\\\\ 3 & 4\\end{bmatrix}"})
+
+        inverse_body = self.post_json("/op", {"data": "A^{-1}", "op": "simplify"}).get_json()
+        self.assertEqual(inverse_body["error"], "")
+        self.assertNotIn("^{-1}", inverse_body["data"])
+        self.assertIn("\\frac{3}{2}", inverse_body["data"])
+
+        square_body = self.post_json("/op", {"data": "A^{2}", "op": "simplify"}).get_json()
+        self.assertEqual(square_body["error"], "")
+        self.assertIn("7 & 10", square_body["data"])
+        self.assertIn("15 & 22", square_body["data"])
+
+    def test_lru_cache_evicts_least_recently_used(self):
+        cache = self.server._LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["size"], 2)
+
+
+class LazyImportTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def import_diagnostics(self):
+        body = self.client.get("/diagnostics").get_json()
+        self.assertEqual(body["error"], "")
+        return body["data"]["imports"]
+
+    def test_domain_modules_load_on_first_use(self):
+        imports = self.import_diagnostics()
+        self.assertEqual(imports["lazy_ms"], {})
+        self.assertIn("latex2sympy2", imports["startup_ms"])
+        self.assertGreater(imports["module_ready_ms"], 0)
+
+        units_body = self.client.post("/op", json={
+            "data": "1000*meter",
+            "op": "units",
+            "params": {"action": "convert", "target": "kilometer"},
+        }).get_json()
+        self.assertEqual(units_body["error"], "")
+
+        lazy = self.import_diagnostics()["lazy_ms"]
+        self.assertIn("sympy.physics.units", lazy)
+        self.assertNotIn("sympy.stats", lazy)
+
+    def test_lazy_sympify_locals_resolve_only_when_mentioned(self):
+        plain = self.server._build_sympify_locals("Point(0, 0)")
+        self.assertNotIn("Pauli", plain)
+
+        pauli = self.server._build_sympify_locals("Pauli(1)*Pauli(2)")
+        self.assertIn("Pauli", pauli)
+
+
+class SympifyLocalsTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def test_locals_are_reused_until_registries_change(self):
+        first = self.server._build_sympify_locals("Point(0, 0)")
+        self.assertIs(self.server._build_sympify_locals("Line(Point(0, 0), Point(1, 1))"), first)
+        units = self.server._build_sympify_locals("meter", include_units=True)
+        self.assertIsNot(units, first)
+        self.assertIn("meter", units)
+
+        self.client.post("/op", json={
+            "data": "",
+            "op": "symbol",
+            "params": {"name": "k", "assumptions": {"integer": True}},
+        })
+        updated = self.server._build_sympify_locals("Point(0, 0)")
+        self.assertIsNot(updated, first)
+        self.assertTrue(updated["k"].is_integer)
+
+    def test_locals_are_read_only(self):
+        locals_map = self.server._build_sympify_locals("x")
+        with self.assertRaises(TypeError):
+            locals_map["x"] = 1
+        with self.assertRaises(TypeError):
+            locals_map.pop("Point")
+
+
+class OperationWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.server.OP_WORKERS = 1
+        self.client = self.server.app.test_client()
+        self.addCleanup(self.shutdown_pool)
+
+    def shutdown_pool(self):
+        if self.server._OPERATION_POOL is not None:
+            self.server._OPERATION_POOL.shutdown()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def test_runaway_operation_is_stopped_and_worker_replaced(self):
+        matrix_text = "\\begin{bmatrix}1 & 2\\\\3 & 4\\end{bmatrix}"
+        warm_body = self.post_json("/op", {"data": matrix_text, "op": "det"}).get_json()
+        self.assertEqual(warm_body["data"], "-2")
+
+        semiprime = str((10**18 + 3) * (10**18 + 9) * (10**19 + 51))
+        slow_body = self.post_json("/op", {
+            "data": semiprime,
+            "op": "factorint",
+            "timeout_ms": 300,
+        }).get_json()
+        self.assertIn("300 ms time budget", slow_body["error"])
+
+        next_body = self.post_json("/op", {"data": matrix_text, "op": "det", "timeout_ms": 5000}).get_json()
+        self.assertEqual(next_body["error"], "")
+        self.assertEqual(next_body["data"], "-2")
+
+        workers = self.client.get("/diagnostics").get_json()["data"]["workers"]
+        self.assertEqual(workers["timeouts"], 1)
+        self.assertEqual(workers["replacements"], 1)
+
+    def test_workers_follow_session_state(self):
+        symbol_body = self.post_json("/op", {
+            "data": "",
+            "op": "symbol",
+            "params": {"name": "x", "assumptions": {"positive": True}},
+        }).get_json()
+        self.assertEqual(symbol_body["error"], "")
+
+        sqrt_body = self.post_json("/op", {"data": "\\sqrt{x^2}", "op": "simplify"}).get_json()
+        self.assertEqual(sqrt_body["data"], "x")
+
+        y = self.server.sp.Symbol("y")
+        self.addCleanup(self.server.latex2sympy2.variances.pop, y, None)
+        self.addCleanup(self.server.latex2sympy2.var.pop, "y", None)
+        assign_body = self.post_json("/op", {"data": "y = 5", "op": "simplify"}).get_json()
+        self.assertEqual(assign_body["error"], "")
+        self.assertEqual(self.server.variances[y], 5)
+
+    def test_worker_assignments_merge_without_overwriting_server_state(self):
+        server = self.server
+        y, z = server.sp.symbols("y z")
+        self.addCleanup(server.latex2sympy2.variances.pop, y, None)
+        self.addCleanup(server.REGISTERED_SYMBOLS.pop, "z", None)
+
+        before = server._parser_state_snapshot()
+        server.latex2sympy2.variances[y] = 5
+        delta = server._parser_state_delta(before)
+        self.assertEqual(delta, {"variances": {y: 5}, "var": {}})
+
+        # The server registers a symbol while the op runs; merging the op's delta keeps it.
+        server.latex2sympy2.variances.pop(y)
+        server.REGISTERED_SYMBOLS["z"] = z
+        version = server.STATE_VERSION
+        server._merge_parser_state(delta)
+        self.assertIs(server.REGISTERED_SYMBOLS["z"], z)
+        self.assertEqual(server.variances[y], 5)
+        self.assertGreater(server.STATE_VERSION, version)
+
+    def test_race_report_comes_back_from_the_worker(self):
+        body = self.post_json("/op", {
+            "data": "x e^{x}",
+            "op": "integrate",
+            "params": {"strategy": "race"},
+            "timeout_ms": 60000,
+        }).get_json()
+        self.assertEqual(body["error"], "")
+        self.assertNotIn("\\int", body["data"])
+        race = body["meta"]["race"]
+        self.assertEqual(set(race["methods"]), {"risch", "meijerg", "manual", "heurisch"})
+        self.assertEqual(race["methods"][race["winner"]]["status"], "closed_form")
+
+    def start_request(self, **fields):
+        semiprime = str((10**18 + 3) * (10**18 + 9) * (10**19 + 51))
+        result = {}
+
+        def run():
+            result["body"] = self.server.app.test_client().post("/op", json={
+                "data": semiprime,
+                "op": "factorint",
+                **fields,
+            }).get_json()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread, result
+
+    def start_slow_operation(self, **fields):
+        thread, result = self.start_request(**fields)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            pool = self.server._OPERATION_POOL
+            if pool is not None and any(pending.worker is not None for pending in pool._pending):
+                break
+            time.sleep(0.02)
+        return thread, result
+
+    def test_new_request_in_cancel_group_supersedes_running_one(self):
+        thread, result = self.start_slow_operation(request_id="1", cancel_group="buffer:1")
+
+        started = time.monotonic()
+        body = self.post_json("/op", {
+            "data": "x^2",
+            "op": "diff",
+            "params": {"var": "x"},
+            "request_id": "2",
+            "cancel_group": "buffer:1",
+        }).get_json()
+        self.assertEqual(body["error"], "")
+        self.assertEqual(body["data"], "2 x")
+        self.assertLess(time.monotonic() - started, 10)
+
+        thread.join(timeout=10)
+        self.assertIn("was cancelled", result["body"]["error"])
+        self.assertEqual(self.server._OPERATION_POOL.stats["cancelled"], 1)
+
+    def test_time_queued_for_a_worker_counts_against_the_budget(self):
+        thread, result = self.start_slow_operation(request_id="slow")
+
+        started = time.monotonic()
+        body = self.post_json("/op", {"data": "x^2", "op": "diff", "timeout_ms": 300}).get_json()
+        self.assertIn("300 ms time budget while waiting for a worker", body["error"])
+        self.assertLess(time.monotonic() - started, 5)
+
+        self.post_json("/cancel", {"request_id": "slow"})
+        thread.join(timeout=10)
+        self.assertIn("was cancelled", result["body"]["error"])
+
+    def test_shutdown_stops_and_reaps_busy_workers(self):
+        thread, result = self.start_slow_operation(request_id="slow")
+        pool = self.server._OPERATION_POOL
+        processes = [worker.process for worker in pool._workers]
+        self.assertFalse(any(process.daemon for process in processes))
+
+        pool.shutdown()
+        thread.join(timeout=10)
+        self.assertIn("exited unexpectedly", result["body"]["error"])
+        self.assertTrue(all(process.exitcode is not None for process in processes))
+
+    def test_interrupted_worker_is_replaced_not_reused(self):
+        pool = self.server._operation_pool()
+        worker = pool._idle[0]
+        with mock.patch.object(type(worker.connection), "poll", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                pool.run("op", ("x^2", "diff", {}), None, label="diff")
+        self.assertNotIn(worker, pool._idle)
+        self.assertEqual(pool.stats["replacements"], 1)
+        self.assertEqual(pool.run("op", ("x^2", "diff", {}), 5000, label="diff"), "2 x")
+
+    def start_follower(self, **fields):
+        # Joins the flight of the slow operation started by start_slow_operation.
+        coalesced = self.server.OPERATION_FLIGHTS.stats["coalesced"]
+        thread, result = self.start_request(**fields)
+        deadline = time.monotonic() + 10
+        while self.server.OPERATION_FLIGHTS.stats["coalesced"] == coalesced and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return thread, result
+
+    def test_follower_in_another_cancel_group_recomputes_when_the_leader_is_superseded(self):
+        leader, leader_result = self.start_slow_operation(request_id="1", cancel_group="buffer:1")
+        follower, follower_result = self.start_follower(request_id="2", cancel_group="buffer:2")
+
+        self.post_json("/op", {"data": "x^2", "op": "diff", "request_id": "3", "cancel_group": "buffer:1"})
+        leader.join(timeout=10)
+        self.assertIn("was cancelled", leader_result["body"]["error"])
+
+        # The follower took over as leader instead of inheriting the cancellation.
+        deadline = time.monotonic() + 10
+        pool = self.server._OPERATION_POOL
+        while time.monotonic() < deadline and not any(
+            pending.request_id == "2" and pending.worker is not None for pending in list(pool._pending)
+        ):
+            time.sleep(0.02)
+        self.assertTrue(follower.is_alive())
+
+        self.assertEqual(self.post_json("/cancel", {"request_id": "2"}).get_json()["data"], {"cancelled": 1})
+        follower.join(timeout=10)
+        self.assertIn("was cancelled", follower_result["body"]["error"])
+
+    def test_followers_keep_their_own_budget_and_cancellation(self):
+        leader, leader_result = self.start_slow_operation(request_id="1")
+
+        started = time.monotonic()
+        short_body = self.post_json("/op", {
+            "data": str((10**18 + 3) * (10**18 + 9) * (10**19 + 51)),
+            "op": "factorint",
+            "timeout_ms": 300,
+        }).get_json()
+        self.assertIn("300 ms time budget while waiting for an identical request", short_body["error"])
+        self.assertLess(time.monotonic() - started, 5)
+
+        follower, follower_result = self.start_follower(request_id="2")
+        self.assertEqual(self.post_json("/cancel", {"request_id": "2"}).get_json()["data"], {"cancelled": 1})
+        follower.join(timeout=10)
+        self.assertIn("was cancelled", follower_result["body"]["error"])
+        self.assertTrue(leader.is_alive())
+
+        self.post_json("/cancel", {"request_id": "1"})
+        leader.join(timeout=10)
+        self.assertIn("was cancelled", leader_result["body"]["error"])
+
+    def test_cancel_endpoint_aborts_request_by_id(self):
+        thread, result = self.start_slow_operation(request_id="slow")
+
+        missing_body = self.post_json("/cancel", {}).get_json()
+        self.assertIn("Missing 'request_id'", missing_body["error"])
+
+        cancel_body = self.post_json("/cancel", {"request_id": "slow"}).get_json()
+        self.assertEqual(cancel_body["data"], {"cancelled": 1})
+        thread.join(timeout=10)
+        self.assertIn("was cancelled", result["body"]["error"])
+
+    def test_timeout_ms_is_validated(self):
+        for value in (0, -5, "100", True):
+            body = self.post_json("/op", {"data": "x", "op": "simplify", "timeout_ms": value}).get_json()
+            self.assertIn("'timeout_ms' must be a positive integer", body["error"])
+        self.assertIsNone(self.server._OPERATION_POOL)
+
+
+class BatchOperationTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def shutdown_pool(self):
+        if self.server._OPERATION_POOL is not None:
+            self.server._OPERATION_POOL.shutdown()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def test_batch_returns_results_in_order_with_item_errors(self):
+        body = self.post_json("/op/batch", {"items": [
+            {"data": "x^3", "op": "diff", "params": {"var": "x"}},
+            {"data": "x", "op": "det"},
+            {"data": "x^3", "op": "integrate", "params": {"var": "x"}},
+            {"data": "x"},
+            "not-an-item",
+        ]}).get_json()
+        self.assertEqual(body["error"], "")
+        results = body["data"]
+        self.assertEqual(results[0], {"data": "3 x^{2}", "error": ""})
+        self.assertIn("matrix", results[1]["error"])
+        self.assertEqual(results[2]["data"], "\\frac{x^{4}}{4}")
+        self.assertIn("Missing 'op'", results[3]["error"])
+        self.assertIn("must be an object", results[4]["error"])
+
+        stats = self.server.PARSE_CACHE.stats()
+        self.assertEqual(stats["hits"], 1)
+
+    def test_batch_applies_session_ops_in_order(self):
+        body = self.post_json("/op/batch", {"items": [
+            {"data": "", "op": "symbol", "params": {"name": "x", "assumptions": {"positive": True}}},
+            {"data": "\\sqrt{x^2}", "op": "simplify"},
+        ]}).get_json()
+        self.assertEqual(body["data"][1]["data"], "x")
+
+        parallel_body = self.post_json("/op/batch", {
+            "items": [{"data": "", "op": "symbols_reset"}],
+            "parallel": True,
+        }).get_json()
+        self.assertIn("cannot run in a parallel batch", parallel_body["data"][0]["error"])
+
+    def test_batch_validates_payload(self):
+        self.assertIn("'items'", self.post_json("/op/batch", {"items": []}).get_json()["error"])
+        self.assertIn("'parallel'", self.post_json("/op/batch", {
+            "items": [{"data": "x", "op": "simplify"}],
+            "parallel": "yes",
+        }).get_json()["error"])
+
+    def test_parallel_batch_uses_worker_processes(self):
+        self.server.OP_WORKERS = 2
+        self.addCleanup(self.shutdown_pool)
+        body = self.post_json("/op/batch", {
+            "items": [
+                {"data": "x^2", "op": "diff", "params": {"var": "x"}},
+                {"data": "x^3", "op": "diff", "params": {"var": "x"}},
+                {"data": "x^2", "op": "integrate", "params": {"var": "x"}},
+            ],
+            "parallel": True,
+        }).get_json()
+        self.assertEqual([item["data"] for item in body["data"]], ["2 x", "3 x^{2}", "\\frac{x^{3}}{3}"])
+        self.assertEqual(self.server._OPERATION_POOL.stats["tasks"], 3)
+
+
+class PipelineOperationTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def shutdown_pool(self):
+        if self.server._OPERATION_POOL is not None:
+            self.server._OPERATION_POOL.shutdown()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def test_pipeline_chains_ops_and_reports_stage_timings(self):
+        body = self.post_json("/op", {
+            "data": "x^3-3x",
+            "pipeline": [{"op": "diff", "params": {"var": "x"}}, {"op": "solve"}],
+        }).get_json()
+        self.assertEqual(body["error"], "")
+        self.assertEqual(body["data"], "[-1, 1]")
+        self.assertEqual([stage["op"] for stage in body["meta"]["stages"]], ["diff", "solve"])
+        self.assertTrue(all(stage["ms"] >= 0 for stage in body["meta"]["stages"]))
+        self.assertIn("render_ms", body["meta"])
+
+        subs_body = self.post_json("/op", {
+            "data": "x^2+2x+1",
+            "pipeline": [
+                {"op": "subs", "params": {"assignments": [{"symbol": "x", "value": "y-1"}]}},
+                {"op": "simplify"},
+            ],
+        }).get_json()
+        self.assertEqual(subs_body["data"], "y^{2}")
+
+        single_body = self.post_json("/op", {"data": "x^3", "op": "diff"}).get_json()
+        self.assertNotIn("meta", single_body)
+
+    def test_pipeline_reports_failing_stage(self):
+        body = self.post_json("/op", {
+            "data": "x^2",
+            "pipeline": [{"op": "integrate"}, {"op": "isprime"}],
+        }).get_json()
+        self.assertEqual(body["data"], "")
+        self.assertIn("Pipeline stage 2 (isprime)", body["error"])
+
+        # Stage inputs are checked against what the op accepts instead of retried as LaTeX.
+        roots_body = self.post_json("/op", {
+            "data": "x^2-4",
+            "pipeline": [{"op": "solve"}, {"op": "diff"}],
+        }).get_json()
+        self.assertEqual(roots_body["error"], "Pipeline stage 2 (diff): diff expects one expression, got a list")
+        set_body = self.post_json("/op", {
+            "data": "x^2-4",
+            "pipeline": [{"op": "solveset"}, {"op": "simplify"}],
+        }).get_json()
+        self.assertIn("simplify expects one expression, got a set", set_body["error"])
+        subsets_body = self.post_json("/op", {
+            "data": "x^2-1",
+            "pipeline": [{"op": "solve"}, {"op": "subsets"}],
+        }).get_json()
+        self.assertEqual(subsets_body["error"], "")
+        grid_body = self.post_json("/op", {
+            "data": "x^3",
+            "pipeline": [{"op": "diff"}, {"op": "eval_grid", "params": {"grid": [{"var": "x", "values": "[2]"}]}}],
+        }).get_json()
+        self.assertEqual(grid_body["error"], "")
+        self.assertIn("x & 3 x^{2}", grid_body["data"])
+
+    def test_every_op_declares_its_stage_input(self):
+        self.assertEqual(set(self.server.OP_STAGE_INPUTS), set(self.server.OP_HANDLERS))
+
+    def test_pipeline_validates_stages(self):
+        self.assertIn("'pipeline'", self.post_json("/op", {"data": "x", "pipeline": []}).get_json()["error"])
+        self.assertIn("stage 1 must be an object", self.post_json("/op", {
+            "data": "x",
+            "pipeline": ["diff"],
+        }).get_json()["error"])
+        self.assertIn("Missing 'op'", self.post_json("/op", {
+            "data": "x",
+            "pipeline": [{"params": {}}],
+        }).get_json()["error"])
+        self.assertIn("cannot run in a pipeline", self.post_json("/op", {
+            "data": "",
+            "pipeline": [{"op": "symbols_reset"}],
+        }).get_json()["error"])
+        self.assertIn("'binomial' does not take the result of an earlier stage", self.post_json("/op", {
+            "data": "x",
+            "pipeline": [{"op": "diff"}, {"op": "binomial", "params": {"n": 5, "k": 2}}],
+        }).get_json()["error"])
+
+    def test_pipeline_runs_in_a_worker_process(self):
+        self.server.OP_WORKERS = 1
+        self.addCleanup(self.shutdown_pool)
+        body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}1&2\\\\3&4\\end{bmatrix}",
+            "pipeline": [{"op": "inv"}, {"op": "det"}],
+        }).get_json()
+        self.assertEqual(body["data"], "- \\frac{1}{2}")
+        self.assertEqual(len(body["meta"]["stages"]), 2)
+        self.assertEqual(self.server._OPERATION_POOL.stats["tasks"], 1)
+
+
+class NumericalEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+        self.client.get("/reset")
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload).get_json()
+
+    def test_numeric_input_skips_simplify(self):
+        body = self.post_json("/numerical", {"data": "\\frac{\\sin(1)^2+\\cos(1)^2}{3}"})
+        self.assertEqual(body["data"], "0.333333333333333")
+        self.assertEqual(body["meta"], {"path": "evalf"})
+
+        with mock.patch.object(self.server, "simplify", side_effect=AssertionError("simplify called")):
+            integral = self.post_json("/numerical", {"data": "\\int_0^1 e^{-x^2} dx", "prec": 30})
+        self.assertEqual(integral["data"], "0.746824132812427025399467436132")
+        self.assertEqual(integral["meta"], {"path": "evalf"})
+
+        digits = self.post_json("/numerical", {"data": "2+\\pi", "prec": "20"})
+        self.assertEqual(digits["data"], "5.1415926535897932385")
+
+    def test_symbolic_residue_falls_back(self):
+        limit = self.post_json("/numerical", {"data": "\\lim_{x \\to 0} \\frac{\\sin(x)}{x}"})
+        self.assertEqual(limit["data"], "1.0")
+        self.assertEqual(limit["meta"], {"path": "doit"})
+
+        cancelling = self.post_json("/numerical", {"data": "x^2+2x+1-(x+1)^2"})
+        self.assertEqual(cancelling["data"], "0")
+        self.assertEqual(cancelling["meta"], {"path": "simplify"})
+
+        self.assertIn("prec must be positive", self.post_json("/numerical", {"data": "1", "prec": 0})["error"])
+
+        with mock.patch.object(self.server, "_simplify_ladder", stalled_simplify_ladder):
+            limited = self.post_json("/numerical", {"data": "\\frac{x^2-1}{x-1}-x", "budget_ms": 500})
+        self.assertEqual(limited["data"], "1.0")
+        self.assertEqual(limited["meta"]["path"], "simplify")
+        self.assertEqual(limited["meta"]["simplify"]["status"], "budget_limited")
+
+
+class MatrixFastPathTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def test_rational_fast_path_matches_matrix_methods(self):
+        sp = self.server.sp
+        matrices = [
+            sp.Matrix([[2, -1, 0], [-1, 2, -1], [0, -1, 2]]),
+            sp.Matrix([[sp.Rational(1, 2), 3, -1], [1, 5, -2], [4, 0, sp.Rational(5, 3)]]),
+            sp.Matrix([[1, 2, 3, 4], [2, 4, 6, 8], [0, 1, 0, 1]]),
+        ]
+        for matrix in matrices:
+            self.assertIsNotNone(self.server._rational_domain_matrix(matrix))
+            self.assertEqual(self.server._op_rank(matrix, {}), matrix.rank())
+            if matrix.is_square:
+                self.assertEqual(self.server._op_det(matrix, {}), matrix.det())
+
+    def test_symbolic_and_non_square_matrices_keep_matrix_behavior(self):
+        self.assertIsNone(self.server._rational_domain_matrix(self.server.sp.Matrix([[1, 0.5], [2, 3]])))
+        det_body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}x&1\\\\1&x\\end{bmatrix}",
+            "op": "det",
+        }).get_json()
+        self.assertEqual(det_body["data"], "x^{2} - 1")
+
+        non_square_body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}1&2&3\\\\4&5&6\\end{bmatrix}",
+            "op": "det",
+        }).get_json()
+        self.assertEqual(non_square_body["data"], "")
+
+    def test_mat_solve_sparse_elimination_keeps_output_contract(self):
+        sp = self.server.sp
+        size = 30
+        coefficients = sp.zeros(size, size)
+        for index in range(size):
+            coefficients[index, index] = 2
+            if index > 0:
+                coefficients[index, index - 1] = -1
+            if index < size - 1:
+                coefficients[index, index + 1] = -1
+        rhs = sp.Matrix([index % 3 - 1 for index in range(size)])
+        solution = self.server._op_mat_solve(coefficients.row_join(rhs), {})
+        self.assertEqual(solution, coefficients.gauss_jordan_solve(rhs)[0])
+
+        underdetermined = sp.Matrix([[1, 2, 0, 3], [0, 0, 1, sp.Rational(1, 2)]])
+        result = self.server._op_mat_solve(underdetermined, {})
+        expected_solution, expected_params = underdetermined[:, :-1].gauss_jordan_solve(underdetermined[:, -1])
+        self.assertEqual(result, {"solution": expected_solution, "params": expected_params})
+
+        body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}1&2&3\\\\2&4&6\\end{bmatrix}",
+            "op": "mat_solve",
+        }).get_json()
+        self.assertEqual(
+            body["data"],
+            "{\\mathtt{\\text{params}}: \\begin{bmatrix}\\tau_{0}\\end{bmatrix}, "
+            "\\mathtt{\\text{solution}}: \\begin{bmatrix}3 - 2 \\tau_{0}\\\\\\tau_{0}\\end{bmatrix}}",
+        )
+
+        inconsistent_body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}1&2&3\\\\2&4&7\\end{bmatrix}",
+            "op": "mat_solve",
+        }).get_json()
+        self.assertEqual(inconsistent_body["error"], "mat_solve failed: Linear system has no solution")
+
+    def test_large_integer_rank_uses_fast_path(self):
+        rows = []
+        for i in range(20):
+            rows.append("&".join(str((i * j + i) % 7 - 3) for j in range(20)))
+        latex = "\\begin{bmatrix}" + "\\\\".join(rows) + "\\end{bmatrix}"
+        started = time.perf_counter()
+        body = self.post_json("/op", {"data": latex, "op": "rank"}).get_json()
+        self.assertEqual(body["error"], "")
+        self.assertEqual(body["data"], "5")
+        self.assertLess(time.perf_counter() - started, 5.0)
+
+
+class NumericLinalgTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+        self.sp = self.server.sp
+        # Companion matrix of x^5 - x - 1, whose roots have no radical form.
+        self.quintic = self.sp.Matrix([
+            [0, 0, 0, 0, 1],
+            [1, 0, 0, 0, 1],
+            [0, 1, 0, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 0, 1, 0],
+        ])
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload)
+
+    def assert_close(self, left, right, tolerance=1e-10):
+        self.assertLess((left - right).evalf().norm(), tolerance)
+
+    def test_explicit_numeric_and_precision(self):
+        body = self.post_json("/op", {
+            "data": "\\begin{bmatrix}2&1\\\\1&2\\end{bmatrix}",
+            "op": "eigenvals",
+            "params": {"numeric": "true"},
+        }).get_json()
+        self.assertEqual(body["data"], "{1.0: 1, 3.0: 1}")
+
+        values = self.server._op_eigenvals(self.sp.Matrix([[0, 1], [2, 0]]), {"prec": 40})
+        self.assertEqual(sorted(values.values()), [1, 1])
+        root = max(values)
+        self.assertEqual(root._prec, self.sp.Float(1, 40)._prec)
+        self.assertLess(abs(root - self.sp.sqrt(2)).evalf(50), self.sp.Float("1e-38"))
+
+        rotation = self.server._op_eigenvals(self.sp.Matrix([[0, -1], [1, 0]]), {"numeric": True})
+        self.assertEqual(set(rotation), {self.sp.I * self.sp.Float(1), -self.sp.I * self.sp.Float(1)})
+
+    def test_auto_switch_for_expensive_exact_results(self):
+        numeric = self.server._op_eigenvals(self.quintic, {})
+        self.assertEqual(len(numeric), 5)
+        self.assertTrue(all(value.has(self.sp.Float) for value in numeric))
+        self.assertIn("1.16730397826142", self.server._render_operation_result(numeric))
+
+        exact = self.server._op_eigenvals(self.quintic, {"numeric": False})
+        self.assertTrue(all(isinstance(value, self.sp.CRootOf) for value in exact))
+
+        small = self.post_json("/op", {
+            "data": "\\begin{bmatrix}2 & 0\\\\0 & 3\\end{bmatrix}",
+            "op": "eigenvals",
+        }).get_json()
+        self.assertEqual(small["data"], "{2: 1, 3: 1}")
+
+        vects = self.server._op_eigenvects(self.quintic, {})
+        for value, multiplicity, basis in vects:
+            self.assertEqual(multiplicity, 1)
+            self.assert_close(self.quintic * basis[0], value * basis[0])
+
+    def test_numeric_svd_and_qr_reconstruct_the_matrix(self):
+        matrix = self.sp.Matrix([[4, -2, 7], [1, 5, -3], [-6, 2, 8], [3, 3, 1]])
+        u_matrix, s_matrix, v_matrix = (
+            self.server._op_svd(matrix, {})[key] for key in ("U", "S", "V")
+        )
+        self.assertEqual(s_matrix.shape, (3, 3))
+        self.assert_close(u_matrix * s_matrix * v_matrix.H, matrix)
+
+        q_matrix, r_matrix = self.server._op_qr(matrix, {"numeric": True, "prec": 30})
+        self.assert_close(q_matrix * r_matrix, matrix, 1e-25)
+        self.assertTrue(all(r_matrix[index, index] > 0 for index in range(3)))
+
+        singular = self.server._op_svd(self.sp.Matrix([[1, 2], [2, 4]]), {"numeric": True})
+        self.assertEqual(singular["S"], self.sp.Matrix([[self.sp.Float(5)]]))
+
+    def test_qr_stays_exact_unless_numeric_is_requested(self):
+        matrix = self.sp.Matrix([[2, 1, 0, 0], [1, 2, 1, 0], [0, 1, 2, 1], [0, 0, 1, 2]])
+        q_matrix, r_matrix = self.server._op_qr(matrix, {})
+        self.assertFalse(q_matrix.has(self.sp.Float) or r_matrix.has(self.sp.Float))
+        self.assertEqual(self.sp.simplify(q_matrix * r_matrix - matrix), self.sp.zeros(4, 4))
+        numeric_q, _ = self.server._op_qr(matrix, {"numeric": True})
+        self.assertTrue(numeric_q.has(self.sp.Float))
+
+    def test_mpmath_is_used_without_numpy(self):
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            values = self.server._op_eigenvals(self.quintic, {})
+        self.assertIn("1.16730397826142", self.server._render_operation_result(values))
+
+    def test_numeric_param_validation(self):
+        with self.assertRaisesRegex(ValueError, "prec requires numeric mode"):
+            self.server._op_svd(self.quintic, {"numeric": False, "prec": 20})
+        with self.assertRaisesRegex(ValueError, "prec must be positive"):
+            self.server._op_qr(self.quintic, {"prec": 0})
+        with self.assertRaisesRegex(ValueError, "without free symbols"):
+            self.server._op_eigenvals(self.sp.Matrix([[self.sp.Symbol("x"), 1], [1, 0]]), {"numeric": True})
+        with self.assertRaisesRegex(ValueError, "unexpected params"):
+            self.server._op_eigenvals(self.quintic, {"digits": 5})
+
+
+class EvalGridTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+        self.server.LAMBDIFY_REGISTRY.clear()
+
+    def post_op(self, data, params):
+        return self.client.post("/op", json={"data": data, "op": "eval_grid", "params": params}).get_json()
+
+    def test_grid_table_and_compiled_cache(self):
+        body = self.post_op("x^2+y", {"grid": [{"var": "x", "values": "0:1:3"}, {"var": "y", "values": "[1,2]"}]})
+        self.assertEqual(body["error"], "")
+        self.assertTrue(body["data"].startswith("\\begin{array}{cc|c} x & y & x^2+y \\\\ \\hline 0 & 1 & 1 \\\\"))
+        self.assertIn("0.5 & 2 & 2.25", body["data"])
+
+        params = {"grid": [{"var": "x", "values": "linspace(0,1,200)"}], "format": "json"}
+        self.server._op_eval_grid("\\sin(x)", params)
+        self.server._op_eval_grid("\\sin(x)", params)
+        stats = self.server.LAMBDIFY_REGISTRY.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+        # Without NumPy the mpmath fallback renders the same table.
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            fallback = self.post_op("x^2+y", {"grid": [{"var": "x", "values": "0:1:3"}, {"var": "y", "values": "[1,2]"}]})
+        self.assertEqual(fallback["data"], body["data"])
+
+    def test_points_json_and_mpmath_precision(self):
+        rows = json.loads(self.post_op("\\sqrt{x}", {"points": "-4;0.25", "format": "json"})["data"])
+        self.assertEqual(rows, {"vars": ["x"], "rows": [[-4, {"re": 0, "im": 2}], [0.25, 0.5]]})
+
+        table = self.server._op_eval_grid("\\sin(x) y", {"points": [[2, 1]], "vars": ["y", "x"], "prec": 25})
+        self.assertIn("2 & 1 & 1.682941969615793013305005", table)
+
+        arange = json.loads(self.server._op_eval_grid("2x", {"grid": [{"var": "x", "values": "arange(0,1,0.25)"}], "format": "json"}))
+        self.assertEqual([row[1] for row in arange["rows"]], [0, 0.5, 1, 1.5])
+
+    def test_invalid_requests(self):
+        cases = [
+            ({"grid": [{"var": "x", "values": "0:1:3"}], "points": "1"}, "either 'grid' or 'points'"),
+            ({"grid": [{"var": "x", "values": "0:1:3"}]}, "needs values for: y"),
+            ({"grid": [{"var": "x", "values": "0:1:200"}, {"var": "y", "values": "0:1:200"}]}, "limited to 10000 points"),
+            ({"points": "(1,2)", "backend": "numpy", "prec": 20}, "prec requires the mpmath backend"),
+            ({"points": "(1,2)", "format": "csv"}, "format must be one of"),
+        ]
+        for params, message in cases:
+            self.assertIn(message, self.post_op("x+y", params)["error"])
+
+
+class LambdifyRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.sp = self.server.sp
+
+    def test_nsolve_reuses_compiled_callable(self):
+        registry = self.server.LAMBDIFY_REGISTRY
+        registry.clear()
+        first = self.server._op_nsolve("\\cos(x)=x", {"var": "x", "guess": "1"})
+        second = self.server._op_nsolve("\\cos(x)=x", {"var": "x", "guess": "0", "guess2": "1"})
+        self.assertEqual(self.server._render_operation_result(first), "0.739085133215161")
+        self.assertEqual(first, second)
+        self.assertEqual((registry.stats()["hits"], registry.stats()["misses"]), (1, 1))
+
+        with self.assertRaises(ValueError):
+            self.server._op_nsolve("x+y", {"var": "x", "guess": "1"})
+
+    def test_eviction_respects_byte_cap_and_releases_source(self):
+        x = self.sp.Symbol("x")
+        registry = self.server._LambdifyRegistry(max_size=8, max_bytes=100)
+        first = registry.get(self.sp.sin(x), (x,), "math")
+        self.assertIn(first.__code__.co_filename, self.server.linecache.cache)
+        registry.get(self.sp.cos(x) + x ** 2, (x,), "math")
+        registry.get(self.sp.exp(x) - x, (x,), "math")
+
+        stats = registry.stats()
+        self.assertLessEqual(stats["bytes"], 100)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertNotIn(first.__code__.co_filename, self.server.linecache.cache)
+        self.assertEqual(registry.get(self.sp.exp(x) - x, (x,), "math")(0), 1.0)
+
+        registry = self.server._LambdifyRegistry(max_size=1, max_bytes=10000)
+        registry.get(self.sp.sin(x), (x,), "math")
+        registry.get(self.sp.cos(x), (x,), "math")
+        self.assertEqual(registry.stats()["size"], 1)
+
+
+class NsolveIntervalTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def nsolve(self, data, **params):
+        return self.client.post("/op", json={"data": data, "op": "nsolve", "params": {"var": "x", **params}}).get_json()
+
+    def test_returns_sorted_distinct_roots(self):
+        body = self.nsolve("\\sin(x)", interval="[0,10]")
+        self.assertEqual(body["data"], "[0.0, 3.14159265358979, 6.28318530717959, 9.42477796076938]")
+
+        # Double roots never change sign; the pole of tan at pi/2 is not reported.
+        self.assertEqual(self.nsolve("(x-1)^2(x-2)", interval=[0, 3], starts=5)["data"], "[1.0, 2.0]")
+        self.assertEqual(self.nsolve("\\tan(x)", interval="[1,5]")["data"], "[3.14159265358979]")
+        self.assertEqual(self.nsolve("x^2+1", interval="[-2,2]")["data"], "[]")
+
+    def test_rejects_invalid_interval_requests(self):
+        self.assertIn("either a guess or an interval", self.nsolve("x", interval="[0,1]", guess="1")["error"])
+        self.assertIn("a < b", self.nsolve("x", interval="[1,0]")["error"])
+        self.assertIn("starts must be between", self.nsolve("x", interval="[0,1]", starts=1)["error"])
+
+
+class PolynomialFastPathTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.sp = self.server.sp
+
+    def test_solve_matches_general_solver_without_calling_it(self):
+        x = self.sp.Symbol("x")
+        inputs = ["x^2-2=0", "x^5-x-1", "x^4-10x^2+1", "\\frac{x^3}{2}-\\frac{x}{3}+1", "(x-1)^3(x+2)^2"]
+        expected = [self.sp.solve(self.server._parse_equation_or_zero_expression(data)[1], x) for data in inputs]
+        with mock.patch.object(self.server.sp, "solve", side_effect=AssertionError("general solver called")):
+            for data, roots in zip(inputs, expected):
+                self.assertEqual(self.server._op_solve(data, {"var": "x"}), roots)
+
+        self.assertIsNone(self.server._univariate_polynomial(self.sp.sin(x), x))
+        self.assertIsNone(self.server._univariate_polynomial(x ** 2 - self.sp.sqrt(2), x))
+
+    def test_real_isolation_and_numeric_roots(self):
+        real = self.server._op_solveset("x^3-3x+1", {"domain": "R"})
+        self.assertEqual(len(real), 3)
+        self.assertTrue(all(isinstance(root, self.sp.CRootOf) for root in real))
+
+        numeric = self.server._op_solve("x^5-x-1", {"prec": 20})
+        self.assertEqual(len(numeric), 5)
+        self.assertEqual(str(numeric[0]), "1.1673039782614186843")
+        real_numeric = self.server._op_solveset("x^5-x-1", {"numeric": "true", "domain": "R"})
+        self.assertEqual(self.server._render_operation_result(real_numeric), "\\{1.16730397826142\\}")
+
+        close = self.server._op_nsolve("(x-1)(x-1.000001)", {"var": "x", "interval": "[0,2]", "starts": 4})
+        self.assertEqual(self.server._render_operation_result(close), "[1.0, 1.000001]")
+
+        with self.assertRaises(ValueError):
+            self.server._op_solve("\\sin(x)", {"numeric": True})
+
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_path = os.path.join(cache_dir.name, "results.sqlite3")
+        self.start_server()
+
+    def start_server(self, **settings):
+        self.server = load_server(False)
+        self.server.RESULT_CACHE_PATH = self.cache_path
+        self.server.RESULT_MEMORY_CACHE = self.server._LRUCache(settings.pop("memory_size", 0))
+        for name, value in settings.items():
+            setattr(self.server, name, value)
+        self.client = self.server.app.test_client()
+        self.addCleanup(self.close_cache, self.server)
+
+    def close_cache(self, server):
+        if server._RESULT_CACHE is not None:
+            server._RESULT_CACHE.close()
+            server._RESULT_CACHE = None
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload).get_json()
+
+    def test_results_persist_across_restarts(self):
+        first = self.post_json("/op", {"data": "x^2+2x+1", "op": "integrate"})
+        self.assertEqual(first["error"], "")
+        self.assertNotIn("meta", first)
+
+        self.close_cache(self.server)
+        self.start_server()
+        second = self.post_json("/op", {"data": "2x+x^2+1", "op": "integrate"})
+        self.assertEqual(second["data"], first["data"])
+        self.assertEqual(second["meta"], {"cached": True})
+
+        batch = self.post_json("/op/batch", {"items": [{"data": "x^2+2x+1", "op": "integrate"}]})
+        self.assertTrue(batch["data"][0]["cached"])
+
+        stats = self.client.get("/diagnostics").get_json()
+        self.assertEqual(stats["data"]["result_cache"]["hits"], 2)
+
+    def test_key_follows_params_and_session_state(self):
+        self.post_json("/op", {"data": "\\sqrt{x^2}", "op": "simplify"})
+        self.assertIn("meta", self.post_json("/op", {"data": "\\sqrt{x^2}", "op": "simplify"}))
+        self.assertNotIn("meta", self.post_json("/op", {"data": "x^2", "op": "diff", "params": {"var": "x"}}))
+        self.assertNotIn("meta", self.post_json("/op", {"data": "x^2", "op": "diff", "params": {"var": "y"}}))
+
+        self.post_json("/op", {"data": "", "op": "symbol", "params": {"name": "x", "assumptions": {"positive": True}}})
+        body = self.post_json("/op", {"data": "\\sqrt{x^2}", "op": "simplify"})
+        self.assertNotIn("meta", body)
+        self.assertEqual(body["data"], "x")
+
+        self.post_json("/op", {"data": "x^{3", "op": "diff"})
+        self.assertEqual(self.server._result_cache().stats()["size"], 4)
+
+    def test_cache_evicts_least_recently_used_and_resets_on_schema_change(self):
+        self.close_cache(self.server)
+        self.start_server(RESULT_CACHE_SIZE=2)
+        for exponent in (2, 3):
+            self.post_json("/op", {"data": f"x^{exponent}", "op": "diff"})
+        self.assertIn("meta", self.post_json("/op", {"data": "x^2", "op": "diff"}))
+        self.post_json("/op", {"data": "x^4", "op": "diff"})
+        self.assertIn("meta", self.post_json("/op", {"data": "x^2", "op": "diff"}))
+        self.assertNotIn("meta", self.post_json("/op", {"data": "x^3", "op": "diff"}))
+
+        self.close_cache(self.server)
+        self.start_server(RESULT_CACHE_SCHEMA=self.server.RESULT_CACHE_SCHEMA + 1)
+        self.assertEqual(self.server._result_cache().stats()["size"], 0)
+
+    def test_memory_tier_keys_on_canonical_form_without_reparsing(self):
+        self.close_cache(self.server)
+        self.start_server(RESULT_CACHE_PATH="", memory_size=16)
+        first = self.post_json("/op", {"data": "x^{2}+2x+1", "op": "integrate"})
+        self.assertNotIn("meta", first)
+        for spelling in ("x^2 + 2 x + 1", "2x+x^2+1", "  2x +   x^2+1 "):
+            body = self.post_json("/op", {"data": spelling, "op": "integrate"})
+            self.assertEqual(body, {**first, "meta": {"cached": True}})
+
+        parse_stats = self.server.PARSE_CACHE.stats()
+        self.assertEqual(self.post_json("/op", {"data": "2x+x^2+1", "op": "integrate"})["meta"], {"cached": True})
+        self.assertEqual(self.server.PARSE_CACHE.stats(), parse_stats)
+
+        lines = "Line(Point(0, 0), Point(1, 1)); Line(Point(0, 1), Point(1, 0))"
+        self.assertEqual(self.post_json("/op", {"data": lines, "op": "intersect"})["error"], "")
+        respaced = self.post_json("/op", {"data": "  " + lines.replace(", ", ",  ") + "\n", "op": "intersect"})
+        self.assertEqual(respaced["meta"], {"cached": True})
+
+
+class IntegrateRaceTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def integrate(self, data, **params):
+        return self.client.post("/op", json={"data": data, "op": "integrate", "params": params}).get_json()
+
+    def test_first_closed_form_wins_and_numeric_is_the_fallback(self):
+        body = self.integrate("\\sin(x)^3\\cos(x)^5", strategy="race")
+        self.assertEqual(body["error"], "")
+        self.assertNotIn("\\int", body["data"])
+        race = body["meta"]["race"]
+        self.assertEqual(race["methods"][race["winner"]]["status"], "closed_form")
+        self.assertTrue(all(entry["ms"] >= 0 for entry in race["methods"].values()))
+
+        numeric = self.integrate("x^{x}", strategy="race", lower="0", upper="1")
+        self.assertEqual(numeric["data"], "0.783430510712134")
+        self.assertEqual(numeric["meta"]["race"]["winner"], "numeric")
+        # risch only handles indefinite integrals, so it does not enter definite races.
+        self.assertNotIn("risch", numeric["meta"]["race"]["methods"])
+
+    def test_budget_cancels_every_method(self):
+        body = self.integrate("x^{x}", strategy="race", budget_ms=50)
+        self.assertEqual(body["data"], "\\int x^{x}\\, dx")
+        race = body["meta"]["race"]
+        self.assertIsNone(race["winner"])
+        self.assertTrue(body["meta"]["partial"])
+        self.assertEqual({entry["status"] for entry in race["methods"].values()}, {"cancelled"})
+
+        self.assertIn("only applies to strategy=race", self.integrate("x", budget_ms=50)["error"])
+        self.assertIn("strategy must be one of", self.integrate("x", strategy="fastest")["error"])
+        self.assertNotIn("meta", self.integrate("x"))
+
+
+class SimplifyBudgetTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+        self.client = self.server.app.test_client()
+
+    def simplify(self, data, **params):
+        return self.client.post("/op", json={"data": data, "op": "simplify", "params": params}).get_json()
+
+    def test_deadline_returns_best_cheap_candidate(self):
+        # The helper process runs the stalled ladder, so full simplify never finishes in time.
+        memory_cache = self.server._LRUCache(16)
+        with mock.patch.object(self.server, "_simplify_ladder", stalled_simplify_ladder), \
+                mock.patch.object(self.server, "RESULT_MEMORY_CACHE", memory_cache):
+            started = time.perf_counter()
+            body = self.simplify("\\frac{x^2-1}{x-1}", budget_ms=500)
+            self.assertLess(time.perf_counter() - started, 5)
+            again = self.simplify("\\frac{x^2-1}{x-1}", budget_ms=500)
+        self.assertEqual(body["data"], "x + 1")
+        self.assertEqual(body["meta"], {"simplify": {"status": "budget_limited", "stage": "cancel"}, "partial": True})
+        # Budget-limited results are not cached.
+        self.assertEqual(again, body)
+
+    def test_helper_exits_when_its_requester_goes_away(self):
+        context = self.server._helper_context()
+        connection, process = self.server._start_child(context, stalled_simplify_ladder, self.server.sp.Symbol("x") + 1)
+        self.assertEqual(connection.recv()[0], "cancel")
+        connection.close()
+        process.join(timeout=5)
+        self.assertFalse(process.is_alive())
+
+    def test_full_simplify_within_budget_is_final(self):
+        body = self.simplify("\\sin(x)^2+\\cos(x)^2", budget_ms=60000)
+        self.assertEqual(body["data"], "1")
+        self.assertEqual(body["meta"]["simplify"], {"status": "final", "stage": "simplify"})
+
+        unlimited = self.simplify("\\sin(x)^2+\\cos(x)^2", budget_ms=0)
+        self.assertEqual(unlimited, {"data": "1", "error": ""})
+        self.assertIn("must not be negative", self.simplify("x", budget_ms=-1)["error"])
+
+
+class SingleFlightTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+
+    def test_identical_requests_in_flight_share_one_computation(self):
+        # Takes about two seconds to factor, so the second request arrives while the first runs.
+        semiprime = str(30000000000000002000000000000000033)
+        bodies = []
+
+        def post():
+            client = self.server.app.test_client()
+            bodies.append(client.post("/op", json={"data": semiprime, "op": "factorint"}).get_json())
+
+        threads = [threading.Thread(target=post) for _ in range(2)]
+        threads[0].start()
+        time.sleep(0.2)
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(bodies[0]["data"], bodies[1]["data"])
+        self.assertEqual(sorted("meta" in body for body in bodies), [False, True])
+        self.assertEqual([body.get("meta") for body in bodies if "meta" in body], [{"coalesced": True}])
+        # One computation, not two back to back.
+        self.assertEqual(self.server.OPERATION_FLIGHTS.stats, {"leaders": 1, "coalesced": 1})
+
+        diagnostics = self.server.app.test_client().get("/diagnostics").get_json()["data"]
+        self.assertEqual(diagnostics["single_flight"]["coalesced"], 1)
+
+    def test_followers_share_errors_and_later_calls_recompute(self):
+        flights = self.server._SingleFlight()
+        gate = threading.Event()
+        calls = []
+
+        def failing():
+            calls.append(1)
+            gate.wait(5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def run():
+            try:
+                flights.run("key", failing)
+            except ValueError as exc:
+                errors.append(str(exc))
+
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while flights.stats["coalesced"] < 2:
+            time.sleep(0.01)
+        gate.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ["boom"] * 3)
+        self.assertEqual(len(calls), 1)
+
+        self.assertEqual(flights.run("key", lambda: "fresh"), ("fresh", False))
+
+    def test_followers_recompute_when_the_leader_is_stopped(self):
+        flights = self.server._SingleFlight()
+        gate = threading.Event()
+
+        def timed_out():
+            gate.wait(5)
+            raise TimeoutError("leader budget")
+
+        outcomes = {}
+
+        def lead():
+            try:
+                flights.run("key", timed_out)
+            except TimeoutError as exc:
+                outcomes["leader"] = str(exc)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        while not flights._flights:
+            time.sleep(0.01)
+        follower = threading.Thread(target=lambda: outcomes.update(follower=flights.run("key", lambda: "own run")))
+        follower.start()
+        while flights.stats["coalesced"] < 1:
+            time.sleep(0.01)
+        gate.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(outcomes, {"leader": "leader budget", "follower": ("own run", False)})
+        self.assertEqual(flights.stats, {"leaders": 2, "coalesced": 1})
+
+
+class JsonRpcTransportTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+
+    def serve(self, *messages):
+        lines = [message if isinstance(message, str) else json.dumps(message) for message in messages]
+        writer = io.StringIO()
+        self.server._serve_jsonrpc(io.StringIO("\n".join(lines) + "\n"), writer, threads=4)
+        replies = [json.loads(line) for line in writer.getvalue().splitlines()]
+        return {reply["id"]: reply for reply in replies}
+
+    def test_routes_are_served_as_jsonrpc_methods(self):
+        replies = self.serve(
+            {"jsonrpc": "2.0", "id": 1, "method": "health"},
+            {"jsonrpc": "2.0", "id": 2, "method": "op", "params": {"data": "x^3", "op": "diff"}},
+            {"jsonrpc": "2.0", "id": 3, "method": "op/batch", "params": {"items": [{"data": "x^2", "op": "diff"}]}},
+            {"jsonrpc": "2.0", "id": 4, "method": "op", "params": {"data": "x", "op": "bogus"}},
+            {"jsonrpc": "2.0", "method": "reset"},
+        )
+        self.assertEqual(sorted(replies), [1, 2, 3, 4])
+        self.assertEqual(replies[1]["result"], {"data": "ok", "error": ""})
+        self.assertEqual(replies[2]["result"]["data"], "3 x^{2}")
+        self.assertEqual(replies[3]["result"]["data"], [{"data": "2 x", "error": ""}])
+        self.assertIn("Unsupported op", replies[4]["result"]["error"])
+
+    def test_protocol_errors_use_jsonrpc_error_objects(self):
+        replies = self.serve(
+            {"jsonrpc": "2.0", "id": 1, "method": "nope"},
+            {"jsonrpc": "2.0", "id": 2, "method": "op", "params": ["x"]},
+        )
+        self.assertEqual(replies[1]["error"]["code"], self.server.JSONRPC_METHOD_NOT_FOUND)
+        self.assertEqual(replies[2]["error"]["code"], self.server.JSONRPC_INVALID_REQUEST)
+
+        parse_error = self.serve("{not json")
+        self.assertEqual(parse_error[None]["error"]["code"], self.server.JSONRPC_PARSE_ERROR)
+
+
+    def test_unix_socket_keeps_connections_open_for_several_clients(self):
+        socket_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(socket_dir.cleanup)
+        socket_path = os.path.join(socket_dir.name, "latex_sympy.sock")
+        unix_server = self.server._make_unix_server(socket_path, "threaded")
+        self.addCleanup(unix_server.server_close)
+        serve_thread = threading.Thread(target=unix_server.serve_forever)
+        serve_thread.start()
+        self.addCleanup(serve_thread.join)
+        self.addCleanup(unix_server.shutdown)
+
+        def connect():
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            self.addCleanup(client.close)
+            return client, client.makefile("r", encoding="utf-8")
+
+        def call(client, reader, request_id, method, params=None):
+            message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+            if params is not None:
+                message["params"] = params
+            client.sendall((json.dumps(message) + "\n").encode("utf-8"))
+            return json.loads(reader.readline())
+
+        first, first_reader = connect()
+        second, second_reader = connect()
+        for exponent in (2, 3):
+            reply = call(first, first_reader, exponent, "op", {"data": f"x^{exponent}", "op": "diff"})
+            self.assertEqual(reply["id"], exponent)
+            self.assertEqual(reply["result"]["error"], "")
+        self.assertEqual(call(second, second_reader, 1, "health")["result"]["data"], "ok")
+
+        with self.assertRaises(OSError):
+            self.server._make_unix_server(socket_path, "threaded")
+
+
+class ServingModeTests(unittest.TestCase):
+    def setUp(self):
+        self.server = load_server(False)
+
+    def test_parsing_holds_the_state_lock(self):
+        # Referencing a matrix variable makes latex2sympy write to its variances map mid-parse.
+        client = self.server.app.test_client()
+        client.post("/latex", json={"data": "A = \\begin{bmatrix}1 & 2\\\\ 3 & 4\\end{bmatrix}"})
+        self.addCleanup(client.get, "/reset")
+        parse = self.server.latex2sympy
+        contended = []
+
+        def try_lock():
+            acquired = self.server.STATE_LOCK.acquire(blocking=False)
+            if acquired:
+                self.server.STATE_LOCK.release()
+            contended.append(acquired)
+
+        def checked_parse(text):
+            # Another thread must not get the lock (and snapshot the maps) while this parse runs.
+            probe = threading.Thread(target=try_lock)
+            probe.start()
+            probe.join()
+            return parse(text)
+
+        with mock.patch.object(self.server, "latex2sympy", checked_parse):
+            body = client.post("/op", json={"data": "A^{2}", "op": "simplify"}).get_json()
+        self.assertEqual(body["error"], "")
+        self.assertTrue(contended)
+        self.assertNotIn(True, contended)
+
+    def start_warm_pool(self, size):
+        self.server.OP_WORKERS = size
+        pool = self.server._operation_pool()
+        self.addCleanup(pool.shutdown)
+        for worker in pool._idle + [pool._spare]:
+            worker.wait_until_ready()
+
+    def post_json(self, port, path, payload):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}{path}",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+
+    def get_json(self, port, path):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=30) as response:
+            return json.loads(response.read())
+
+    def start_http_server(self, mode):
+        werkzeug_logger = logging.getLogger("werkzeug")
+        self.addCleanup(werkzeug_logger.setLevel, werkzeug_logger.level)
+        werkzeug_logger.setLevel(logging.ERROR)
+        http_server = self.server._make_http_server("127.0.0.1", 0, mode)
+        serve_thread = threading.Thread(target=http_server.serve_forever)
+        serve_thread.start()
+        self.addCleanup(serve_thread.join)
+        self.addCleanup(http_server.shutdown)
+        return http_server.server_port
+
+    def test_threaded_mode_serves_cheap_requests_during_heavy_op(self):
+        self.start_warm_pool(2)
+        port = self.start_http_server("threaded")
+        matrix_text = "\\begin{bmatrix}1 & 2\\\\3 & 4\\end{bmatrix}"
+        self.assertEqual(self.post_json(port, "/op", {"data": matrix_text, "op": "transpose"})["error"], "")
+
+        semiprime = str((10**18 + 3) * (10**18 + 9) * (10**19 + 51))
+        slow_thread = threading.Thread(target=self.post_json, args=(port, "/op", {
+            "data": semiprime,
+            "op": "factorint",
+            "timeout_ms": 3000,
+        }))
+        slow_thread.start()
+        time.sleep(0.2)
+
+        for _ in range(5):
+            self.assertEqual(self.get_json(port, "/health")["data"], "ok")
+            body = self.post_json(port, "/op", {"data": matrix_text, "op": "transpose"})
+            self.assertEqual(body["error"], "")
+        # Answered while the op is still running, not queued behind it.
+        self.assertTrue(slow_thread.is_alive())
+        slow_thread.join()
+
+    def heavy_ops_elapsed(self, port):
+        # Distinct semiprimes sharing a small factor: each takes factorint a few tenths of a second.
+        small = 100000000003
+        large = [10000000000000061, 10000000000000069, 10000000000000079, 10000000000000099]
+        threads = [
+            threading.Thread(target=self.post_json, args=(port, "/op", {"data": str(small * factor), "op": "factorint"}))
+            for factor in large
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+    @unittest.skipIf((os.cpu_count() or 1) < 2, "needs more than one CPU to run ops in parallel")
+    def test_worker_pool_beats_in_server_threads_on_heavy_ops(self):
+        # The baseline server (app.run) was already threaded but ran ops in its own process,
+        # where concurrent heavy ops share one GIL.
+        baseline_elapsed = self.heavy_ops_elapsed(self.start_http_server("threaded"))
+        self.start_warm_pool(2)
+        pooled_elapsed = self.heavy_ops_elapsed(self.start_http_server("threaded"))
+        self.assertLess(pooled_elapsed, baseline_elapsed * 0.75)
+
+    def test_unknown_server_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.server._make_http_server("127.0.0.1", 0, "gunicorn")
+
+    def test_concurrent_state_changes_stay_consistent(self):
+        client = self.server.app.test_client()
+
+        def register(index):
+            client.post("/op", json={
+                "data": "",
+                "op": "symbol",
+                "params": {"name": f"s{index}", "assumptions": {"positive": True}},
+            })
+
+        threads = [threading.Thread(target=register, args=(index,)) for index in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.server.REGISTERED_SYMBOLS), 20)
+        self.assertEqual(self.server.STATE_VERSION, 20)
+
+
 class PythonEvalGateTests(unittest.TestCase):
     def test_python_endpoint_disabled_by_default(self):
         server = load_server(False)